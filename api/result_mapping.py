@@ -14,8 +14,8 @@ import json
 
 # Try to import mapping libraries with better error handling
 try:
-    import matplotlib.pyplot as plt
     import matplotlib.patches as patches
+    from matplotlib.figure import Figure
     from matplotlib.colors import LinearSegmentedColormap
     MATPLOTLIB_AVAILABLE = True
     print("✅ Matplotlib loaded successfully")
@@ -108,8 +108,10 @@ def create_static_map(coords: list, results: Dict[str, Any]) -> Dict[str, Any]:
         lats = [c[1] for c in coords]
         center_lon, center_lat = np.mean(lons), np.mean(lats)
         
-        # Create figure
-        fig, ax = plt.subplots(1, 1, figsize=(12, 10))
+        # Create figure (not through pyplot, whose global state is not
+        # thread-safe, so maps can render concurrently)
+        fig = Figure(figsize=(12, 10))
+        ax = fig.subplots(1, 1)
         
         # Set up the map area with some padding
         lon_range = max(lons) - min(lons)
@@ -182,10 +184,9 @@ NDRE: {results.get('mean_ndre', 0):.3f}"""
         
         # Convert to base64 string
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+        fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
         buffer.seek(0)
         image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
         
         return {
             "type": "static_map",
@@ -0,0 +1,355 @@
+"""Process-wide HTTP byte-range block cache for remote COG reads."""
+
+import functools
+import io
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+# Bytes per cached block; requests are aligned to this size
+DEFAULT_BLOCK_SIZE = 256 * 1024
+
+# Memory bound of the process-wide cache
+DEFAULT_BLOCK_CACHE_BYTES = 256 * 1024**2
+
+# Seconds before an HTTP range request times out
+DEFAULT_TIMEOUT = 30.0
+
+_default_cache: Optional["BlockCache"] = None
+_default_lock = threading.Lock()
+
+
+def _resource_key(href: str) -> str:
+    """Identity of a remote file; signing tokens in the query are ignored."""
+    return href.split("?", 1)[0]
+
+
+def _runs(indices: Sequence[int]) -> List[Tuple[int, int]]:
+    """Group sorted block indices into (first, last) runs of adjacent blocks."""
+    runs: List[Tuple[int, int]] = []
+    for index in indices:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1] = (runs[-1][0], index)
+        else:
+            runs.append((index, index))
+    return runs
+
+
+class BlockCache:
+    """
+    In-memory LRU cache of aligned byte blocks of remote files.
+
+    Reads are split into ``block_size`` aligned blocks. Missing blocks are
+    fetched with one HTTP range request per run of adjacent blocks, so the
+    many small reads GDAL issues for a COG window become a few large
+    requests, and overlapping windows on the same file reuse blocks. Blocks
+    already being fetched by another thread are waited for rather than
+    requested twice. The cache holds at most ``max_bytes``, evicting the
+    least recently used blocks first.
+    """
+
+    def __init__(
+        self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_bytes: int = DEFAULT_BLOCK_CACHE_BYTES,
+        session: Optional[requests.Session] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """
+        Args:
+            block_size: Bytes per block
+            max_bytes: Memory bound, at least one block
+            session: HTTP session to reuse connections with
+            timeout: Seconds per range request
+        """
+        if block_size < 1 or max_bytes < block_size:
+            raise ValueError("block_size must be positive and fit in max_bytes")
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self.bytes_fetched = 0
+        self._blocks: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._pending: Dict[Tuple[str, int], threading.Event] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _request(self, href: str, start: int, end: int) -> Tuple[bytes, int]:
+        """GET bytes ``start``..``end`` (inclusive); return data and file size."""
+        response = self.session.get(
+            href, headers={"Range": f"bytes={start}-{end}"}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.content
+        if response.status_code == 206:
+            size = int(response.headers["Content-Range"].rsplit("/", 1)[1])
+        else:
+            # Server ignored the range and sent the whole file
+            size = len(data)
+            data = data[start : end + 1]
+        with self._lock:
+            self.requests += 1
+            self.bytes_fetched += len(data)
+        return data, size
+
+    def _fetch_run(self, href: str, first: int, last: int) -> Dict[int, bytes]:
+        """Fetch blocks ``first``..``last`` with one request and store them."""
+        key = _resource_key(href)
+        size = self.block_size
+        data, total = self._request(href, first * size, (last + 1) * size - 1)
+        blocks = {
+            first + i: data[offset : offset + size]
+            for i, offset in enumerate(range(0, len(data), size))
+        }
+        with self._lock:
+            self._sizes[key] = total
+            for index, block in blocks.items():
+                previous = self._blocks.pop((key, index), None)
+                if previous is not None:
+                    self._bytes -= len(previous)
+                self._blocks[(key, index)] = block
+                self._bytes += len(block)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self._bytes -= len(evicted)
+        return blocks
+
+    def _blocks_for(self, href: str, indices: Sequence[int]) -> Dict[int, bytes]:
+        """Return blocks ``indices`` of ``href``, fetching missing runs."""
+        key = _resource_key(href)
+        found: Dict[int, bytes] = {}
+        claimed: List[int] = []
+        waiting: List[Tuple[int, threading.Event]] = []
+        with self._lock:
+            for index in indices:
+                block = self._blocks.get((key, index))
+                if block is not None:
+                    self._blocks.move_to_end((key, index))
+                    found[index] = block
+                    self.hits += 1
+                elif (key, index) in self._pending:
+                    waiting.append((index, self._pending[(key, index)]))
+                    self.hits += 1
+                else:
+                    self._pending[(key, index)] = threading.Event()
+                    claimed.append(index)
+                    self.misses += 1
+        try:
+            for first, last in _runs(claimed):
+                found.update(self._fetch_run(href, first, last))
+        finally:
+            with self._lock:
+                for index in claimed:
+                    self._pending.pop((key, index)).set()
+        for index, event in waiting:
+            event.wait()
+            with self._lock:
+                block = self._blocks.get((key, index))
+            if block is None:
+                # Evicted meanwhile, or the other thread's request failed
+                block = self._fetch_run(href, index, index).get(index, b"")
+            found[index] = block
+        return found
+
+    def size(self, href: str) -> int:
+        """Size in bytes of the remote file, learned from its first block."""
+        key = _resource_key(href)
+        if key not in self._sizes:
+            self._blocks_for(href, [0])
+        return self._sizes[key]
+
+    def read_ranges(self, href: str, ranges: Sequence[Tuple[int, int]]) -> List[bytes]:
+        """
+        Read several (offset, length) byte ranges of ``href``.
+
+        All blocks the ranges touch are resolved together, so adjacent
+        ranges share requests.
+
+        Args:
+            href: URL of the remote file
+            ranges: (offset, length) pairs; ranges are clipped to the file
+
+        Returns:
+            Bytes of each range
+        """
+        size = self.size(href)
+        spans = [(offset, min(offset + length, size)) for offset, length in ranges]
+        indices = sorted(
+            {
+                index
+                for start, end in spans
+                if end > start
+                for index in range(
+                    start // self.block_size, (end - 1) // self.block_size + 1
+                )
+            }
+        )
+        blocks = self._blocks_for(href, indices)
+        result = []
+        for start, end in spans:
+            if end <= start:
+                result.append(b"")
+                continue
+            first = start // self.block_size
+            last = (end - 1) // self.block_size
+            data = b"".join(blocks[index] for index in range(first, last + 1))
+            offset = start - first * self.block_size
+            result.append(data[offset : offset + end - start])
+        return result
+
+    def clear(self) -> None:
+        """Drop all cached blocks and reset the counters."""
+        with self._lock:
+            self._blocks.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.requests = self.bytes_fetched = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes of block data held."""
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts (in blocks), hit ratio, requests and size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "requests": self.requests,
+            "bytes_fetched": self.bytes_fetched,
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class CachedHTTPFile(io.RawIOBase):
+    """Read-only, seekable file object over a remote file in a BlockCache."""
+
+    def __init__(self, cache: BlockCache, href: str):
+        self._cache = cache
+        self._href = href
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._cache.size(self._href)
+        self._position = max(offset, 0)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = max(self._cache.size(self._href) - self._position, 0)
+        data = self._cache.read_ranges(self._href, [(self._position, size)])[0]
+        self._position += len(data)
+        return data
+
+    def get_byte_ranges(self, offsets: Sequence[int], sizes: Sequence[int]) -> list:
+        """Read several ranges at once (GDAL's multi-range read hook)."""
+        return self._cache.read_ranges(self._href, list(zip(offsets, sizes)))
+
+
+@functools.lru_cache(maxsize=None)
+def _opener_class() -> Optional[type]:
+    """
+    rasterio opener serving one URL from a BlockCache (built lazily).
+
+    Returns None, with a warning issued once, on rasterio < 1.4, which has
+    no opener API.
+    """
+    try:
+        from rasterio.abc import MultiByteRangeResourceContainer
+    except ImportError:
+        warnings.warn(
+            "rasterio < 1.4 has no opener API; remote rasters are read "
+            "without the block cache"
+        )
+        return None
+
+    class BlockCacheOpener(MultiByteRangeResourceContainer):
+        # Only the opened URL exists, so GDAL's sidecar probes (.aux.xml,
+        # .msk, ...) fail without a network round trip.
+
+        def __init__(self, cache: BlockCache, href: str):
+            self.cache = cache
+            self.href = href
+
+        def _check(self, path: str) -> None:
+            if path != self.href:
+                raise FileNotFoundError(path)
+
+        def open(self, path: str, mode: str = "rb", **kwargs: Any) -> CachedHTTPFile:
+            self._check(path)
+            return CachedHTTPFile(self.cache, path)
+
+        def size(self, path: str) -> int:
+            self._check(path)
+            return self.cache.size(path)
+
+        def isfile(self, path: str) -> bool:
+            return path == self.href
+
+        def isdir(self, path: str) -> bool:
+            return False
+
+        def ls(self, path: str) -> list:
+            return []
+
+        def mtime(self, path: str) -> int:
+            return 0
+
+        def rm(self, path: str) -> None:
+            raise PermissionError(f"{path} is read-only")
+
+    return BlockCacheOpener
+
+
+def get_block_cache() -> BlockCache:
+    """The process-wide block cache, created on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = BlockCache()
+        return _default_cache
+
+
+def open_raster(href: str, cache: Optional[BlockCache] = None, **kwargs: Any) -> Any:
+    """
+    Open a raster with rasterio, serving remote URLs through a block cache.
+
+    Args:
+        href: Local path or http(s) URL
+        cache: Block cache for remote reads (default: the process-wide one)
+        **kwargs: Passed to ``rasterio.open`` (e.g. ``overview_level``)
+
+    Returns:
+        Open rasterio dataset
+    """
+    import rasterio
+
+    if not href.startswith(("http://", "https://")):
+        return rasterio.open(href, **kwargs)
+    opener_class = _opener_class()
+    if opener_class is None:
+        return rasterio.open(href, **kwargs)
+    opener = opener_class(cache or get_block_cache(), href)
+    return rasterio.open(href, opener=opener, **kwargs)
@@ -0,0 +1,343 @@
+"""Blockwise spectral index processing for rasters larger than memory."""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from sentinel_pipeline.indices import (
+    DNScaling,
+    SpectralIndices,
+    compute_indices,
+    indices_from_dn,
+)
+from sentinel_pipeline.sensors import SensorLike
+
+# Target pixels per processing window when a source has no native tiling
+DEFAULT_BLOCK_PIXELS = 1024 * 1024
+
+BAND_NAMES = ("red", "red_edge", "nir", "swir")
+
+
+class Window(NamedTuple):
+    """Rectangular pixel window within a raster."""
+
+    row_off: int
+    col_off: int
+    height: int
+    width: int
+
+    @property
+    def slices(self) -> Tuple[slice, slice]:
+        """Row and column slices selecting this window from a 2-D array."""
+        return (
+            slice(self.row_off, self.row_off + self.height),
+            slice(self.col_off, self.col_off + self.width),
+        )
+
+
+BlockSink = Callable[[Window, SpectralIndices], None]
+
+
+def aligned_block_shape(
+    native_block_shape: Optional[Tuple[int, int]],
+    target_pixels: int = DEFAULT_BLOCK_PIXELS,
+) -> Tuple[int, int]:
+    """
+    Choose a processing window shape aligned to a raster's internal tiling.
+
+    Windows are whole multiples of the native (e.g. COG) tile shape so every
+    internal tile is decoded exactly once, grown until they hold roughly
+    ``target_pixels`` pixels.
+
+    Args:
+        native_block_shape: Internal (rows, cols) tile shape, or None if unknown
+        target_pixels: Approximate number of pixels per window
+
+    Returns:
+        (rows, cols) window shape
+    """
+    if target_pixels < 1:
+        raise ValueError("target_pixels must be positive")
+    if not native_block_shape:
+        side = max(int(np.sqrt(target_pixels)), 1)
+        return side, side
+
+    tile_rows, tile_cols = native_block_shape
+    if tile_rows == 1:
+        # Striped (untiled) rasters: read whole rows, as many as fit the target
+        return max(target_pixels // tile_cols, 1), tile_cols
+    factor = max(int(np.sqrt(target_pixels / (tile_rows * tile_cols))), 1)
+    return tile_rows * factor, tile_cols * factor
+
+
+def iter_windows(
+    shape: Tuple[int, int], block_shape: Tuple[int, int]
+) -> Iterator[Window]:
+    """
+    Yield windows tiling a raster in row-major order.
+
+    Args:
+        shape: Raster (rows, cols)
+        block_shape: Window (rows, cols); edge windows are clipped
+
+    Yields:
+        Window covering each block
+    """
+    rows, cols = shape
+    block_rows, block_cols = block_shape
+    if block_rows < 1 or block_cols < 1:
+        raise ValueError("block_shape must be positive")
+    for row_off in range(0, rows, block_rows):
+        height = min(block_rows, rows - row_off)
+        for col_off in range(0, cols, block_cols):
+            yield Window(row_off, col_off, height, min(block_cols, cols - col_off))
+
+
+class ArrayBandSource:
+    """Band source over in-memory or memory-mapped 2-D arrays."""
+
+    block_shape: Optional[Tuple[int, int]] = None
+
+    def __init__(
+        self,
+        red: np.ndarray,
+        red_edge: np.ndarray,
+        nir: np.ndarray,
+        swir: np.ndarray,
+    ):
+        self.bands = (red, red_edge, nir, swir)
+        if any(band.shape != red.shape or band.ndim != 2 for band in self.bands):
+            raise ValueError("Bands must be 2-D arrays of the same shape")
+        self.shape: Tuple[int, int] = red.shape
+
+    def read(self, window: Window) -> Tuple[np.ndarray, ...]:
+        """Return (red, red_edge, nir, swir) views for ``window``."""
+        return tuple(band[window.slices] for band in self.bands)
+
+
+class RasterioBandSource:
+    """
+    Band source reading windows from rasterio datasets (e.g. COGs).
+
+    Each band comes from its own file, optionally at a band index within a
+    multi-band file. Dataset handles are opened per thread because rasterio
+    datasets must not be shared across threads; ``close`` closes them all.
+    """
+
+    def __init__(
+        self,
+        paths: Dict[str, str],
+        band_indexes: Optional[Dict[str, int]] = None,
+    ):
+        missing = [name for name in BAND_NAMES if name not in paths]
+        if missing:
+            raise ValueError(f"Missing paths for bands: {missing}")
+        self.paths = paths
+        self.band_indexes = band_indexes or {}
+        self._local = threading.local()
+        self._opened: list = []
+        self._lock = threading.Lock()
+
+        first = self._dataset("nir")
+        self.shape: Tuple[int, int] = (first.height, first.width)
+        self.block_shape: Optional[Tuple[int, int]] = tuple(  # type: ignore
+            first.block_shapes[self.band_indexes.get("nir", 1) - 1]
+        )
+        for name in BAND_NAMES:
+            dataset = self._dataset(name)
+            if (dataset.height, dataset.width) != self.shape:
+                raise ValueError(f"Band {name} does not match the NIR grid")
+
+    def _dataset(self, name: str) -> Any:
+        import rasterio
+
+        handles = getattr(self._local, "handles", None)
+        if handles is None:
+            handles = self._local.handles = {}
+        path = self.paths[name]
+        if path not in handles:
+            handles[path] = rasterio.open(path)
+            with self._lock:
+                self._opened.append(handles[path])
+        return handles[path]
+
+    def read(self, window: Window) -> Tuple[np.ndarray, ...]:
+        """Read (red, red_edge, nir, swir) arrays for ``window``."""
+        from rasterio.windows import Window as RioWindow
+
+        rio_window = RioWindow(
+            window.col_off, window.row_off, window.width, window.height
+        )
+        return tuple(
+            self._dataset(name).read(self.band_indexes.get(name, 1), window=rio_window)
+            for name in BAND_NAMES
+        )
+
+    def close(self) -> None:
+        """Close the datasets opened by every thread."""
+        with self._lock:
+            for dataset in self._opened:
+                dataset.close()
+            self._opened = []
+        self._local = threading.local()
+
+    def __enter__(self) -> "RasterioBandSource":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ArraySink:
+    """Block sink assembling full-size FAI, NDRE and validity arrays."""
+
+    def __init__(
+        self,
+        shape: Tuple[int, int],
+        dtype: Any = np.float32,
+        fai: Optional[np.ndarray] = None,
+        ndre: Optional[np.ndarray] = None,
+        valid: Optional[np.ndarray] = None,
+    ):
+        # Pass np.memmap arrays to stream results to disk instead of RAM
+        self.fai = fai if fai is not None else np.empty(shape, dtype=dtype)
+        self.ndre = ndre if ndre is not None else np.empty(shape, dtype=dtype)
+        self.valid = valid if valid is not None else np.empty(shape, dtype=bool)
+
+    def __call__(self, window: Window, result: SpectralIndices) -> None:
+        rows, cols = window.slices
+        self.fai[rows, cols] = result.fai
+        self.ndre[rows, cols] = result.ndre
+        self.valid[rows, cols] = result.valid
+
+
+class RasterioSink:
+    """
+    Block sink writing FAI and NDRE to a two-band GeoTIFF.
+
+    Invalid pixels are written as NaN. ``profile`` should carry the source
+    grid (``transform``, ``crs``); size, dtype and band count are filled in.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        shape: Tuple[int, int],
+        profile: Optional[Dict[str, Any]] = None,
+        dtype: str = "float32",
+    ):
+        import rasterio
+
+        options = {"driver": "GTiff", "tiled": True, "compress": "deflate"}
+        options.update(profile or {})
+        options.update(
+            height=shape[0], width=shape[1], count=2, dtype=dtype, nodata=np.nan
+        )
+        self.dataset = rasterio.open(path, "w", **options)
+        self.dataset.set_band_description(1, "FAI")
+        self.dataset.set_band_description(2, "NDRE")
+
+    def __call__(self, window: Window, result: SpectralIndices) -> None:
+        from rasterio.windows import Window as RioWindow
+
+        rio_window = RioWindow(
+            window.col_off, window.row_off, window.width, window.height
+        )
+        dtype = self.dataset.dtypes[0]
+        self.dataset.write(result.fai.astype(dtype, copy=False), 1, window=rio_window)
+        self.dataset.write(result.ndre.astype(dtype, copy=False), 2, window=rio_window)
+
+    def close(self) -> None:
+        """Flush and close the output file."""
+        self.dataset.close()
+
+    def __enter__(self) -> "RasterioSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def process_blocks(
+    source: Any,
+    sink: BlockSink,
+    block_shape: Optional[Tuple[int, int]] = None,
+    scaling: Optional[DNScaling] = None,
+    mask_invalid: bool = True,
+    dtype: Any = None,
+    max_workers: int = 1,
+    windows: Optional[Sequence[Window]] = None,
+    sensor: Optional[SensorLike] = None,
+) -> BlockSink:
+    """
+    Compute FAI/NDRE window by window and stream each block into a sink.
+
+    Only ``max_workers`` blocks (plus as many queued) are in memory at a time,
+    so full scenes and mosaics run with bounded memory. Reads and index
+    computation run in worker threads (numpy and GDAL release the GIL); the
+    sink is always called from the calling thread, in window order, so sinks
+    and accumulators need no locking.
+
+    Args:
+        source: Object with ``shape``, ``block_shape`` and ``read(window)``
+            returning (red, red_edge, nir, swir), e.g. ``ArrayBandSource``
+        sink: Callable receiving ``(window, SpectralIndices)`` per block
+        block_shape: Window shape; defaults to ``aligned_block_shape`` of the
+            source's native tiling
+        scaling: DN scaling for integer sources; reflectance assumed if None
+        mask_invalid: Whether to mask out-of-range reflectance as NaN
+        dtype: Compute dtype, resolved as in ``compute_indices``
+        max_workers: Number of worker threads
+        windows: Explicit windows to process instead of the full raster
+        sensor: Sensor whose wavelengths are used for FAI (see
+            ``sentinel_pipeline.sensors``); nominal Sentinel-2 if None
+
+    Returns:
+        The sink, for chaining
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if block_shape is None:
+        block_shape = aligned_block_shape(getattr(source, "block_shape", None))
+    if windows is None:
+        windows = list(iter_windows(source.shape, block_shape))
+
+    def run(window: Window) -> SpectralIndices:
+        bands = source.read(window)
+        if scaling is None:
+            return compute_indices(
+                *bands, mask_invalid=mask_invalid, dtype=dtype, sensor=sensor
+            )
+        return indices_from_dn(
+            *bands, *scaling, mask_invalid=mask_invalid, dtype=dtype, sensor=sensor
+        )
+
+    if max_workers == 1:
+        for window in windows:
+            sink(window, run(window))
+        return sink
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Deque[Tuple[Window, Future]] = deque()
+        for window in windows:
+            pending.append((window, executor.submit(run, window)))
+            if len(pending) >= 2 * max_workers:
+                done_window, future = pending.popleft()
+                sink(done_window, future.result())
+        while pending:
+            done_window, future = pending.popleft()
+            sink(done_window, future.result())
+    return sink
@@ -0,0 +1,183 @@
+"""On-disk cache for downloaded band windows."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Default size bound of a cache directory
+DEFAULT_CACHE_BYTES = 2 * 1024**3
+
+# Eviction trims the cache to this fraction of ``max_bytes``
+_EVICT_TO = 0.9
+
+
+class BandCache:
+    """
+    Content-addressed, size-bounded LRU cache of band windows on disk.
+
+    Entries are addressed by a SHA-256 digest of their request (item id,
+    asset, window, overview level, ...) and stored as compressed ``.npz``
+    files, or ``.json`` for grid metadata. Writes go to a temporary file in
+    the same directory and are published with ``os.replace``, so readers in
+    other threads or processes see either the whole entry or none. Reads
+    touch the file's mtime, and eviction removes the least recently used
+    entries once the directory exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            directory: Cache directory, shared safely between workers
+            max_bytes: Size bound of the directory's entries
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """Digest of the request ``parts`` (JSON-serializable values)."""
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def _entries(self):
+        """Yield (path, size, mtime) of every entry."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith((".npz", ".json")):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _read(self, path: str, load: Any) -> Any:
+        try:
+            value = load(path)
+            os.utime(path)
+        except FileNotFoundError:
+            value = None
+        except (OSError, ValueError):
+            # Unreadable entry: drop it and treat as a miss
+            value = None
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                with self._lock:
+                    self._bytes -= size
+            except OSError:
+                pass
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _write(self, path: str, dump: Any) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump(f)
+            size = os.path.getsize(tmp)
+            with self._lock:
+                # A replaced entry's bytes are no longer held
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        with self._lock:
+            self._bytes += size - replaced
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached array for ``key``, or None on a miss."""
+
+        def load(path: str) -> np.ndarray:
+            with np.load(path) as data:
+                return data["array"]
+
+        return self._read(self._path(key, ".npz"), load)
+
+    def put(self, key: str, array: np.ndarray) -> None:
+        """Store ``array`` under ``key`` (compressed, atomically)."""
+        self._write(
+            self._path(key, ".npz"), lambda f: np.savez_compressed(f, array=array)
+        )
+
+    def get_json(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached JSON metadata for ``key``, or None on a miss."""
+
+        def load(path: str) -> Dict[str, Any]:
+            with open(path) as f:
+                return json.load(f)
+
+        return self._read(self._path(key, ".json"), load)
+
+    def put_json(self, key: str, value: Dict[str, Any]) -> None:
+        """Store JSON-serializable metadata under ``key``."""
+        self._write(
+            self._path(key, ".json"), lambda f: f.write(json.dumps(value).encode())
+        )
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until under the size bound.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * _EVICT_TO
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._bytes = total
+        return removed
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate bytes held, tracked since the last scan."""
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts, hit ratio and size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -4,26 +4,237 @@ Spectral indices for kelp biomass detection and environmental monitoring.
 This module provides vectorized numpy implementations of key spectral indices:
 - FAI (Floating Algae Index): Detects floating algae and kelp biomass
 - NDRE (Normalized Difference Red Edge): Vegetation health and biomass indicator
+
+The index kernels walk the inputs in fixed-size chunks along the leading axis
+and write into preallocated output buffers, so scratch memory stays at a few
+MB regardless of raster size. ``compute_indices`` evaluates FAI, NDRE and the
+validity mask together in a single pass over the bands.
+
+Computation runs in the floating dtype of the inputs (float64 for integer
+inputs) unless a ``dtype`` is given. float32 results agree with float64 to
+within ``FLOAT32_ATOL`` for reflectance inputs in [0, 1], at half the memory.
 """
 
 import warnings
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+from sentinel_pipeline.sensors import (  # noqa: F401 (re-exported)
+    LANDSAT_C2_L2_SCALING,
+    SENTINEL2_L2A_SCALING,
+    DNScaling,
+    Sensor,
+    SensorLike,
+    fai_ratios,
+    get_sensor,
+)
+from sentinel_pipeline.stats import DEFAULT_HISTOGRAM_BINS, IndexStatistics
+
+# Sensor, or one sensor per leading-axis layer of a mixed-sensor stack
+SensorSpec = Union[None, SensorLike, Sequence[SensorLike]]
+
+# Ranges outside which masked index values trigger a warning
+_FAI_EXTREME_RANGE = (-0.5, 1.0)
+_NDRE_EXTREME_RANGE = (-1.1, 1.1)
+
+# Documented absolute agreement between float32 and float64 index values
+FLOAT32_ATOL = 1e-6
+
+# Pixels processed per chunk by the index kernels (2 MiB per float64 buffer)
+DEFAULT_CHUNK_PIXELS = 1 << 18
+
+
+class SpectralIndices(NamedTuple):
+    """FAI, NDRE and pixel validity returned by :func:`compute_indices`."""
+
+    fai: np.ndarray
+    ndre: np.ndarray
+    valid: np.ndarray
+
+
+def _resolve_dtype(
+    dtype: Any, out: Optional[np.ndarray], bands: Tuple[np.ndarray, ...]
+) -> np.dtype:
+    """
+    Pick the floating dtype used for computation and outputs.
+
+    An explicit ``dtype`` wins, then the dtype of a provided ``out`` buffer,
+    then the common floating dtype of the inputs. Integer inputs and float16
+    compute in float64 and float32 respectively.
+    """
+    if dtype is None and out is not None:
+        dtype = out.dtype
+    if dtype is None:
+        dtype = np.result_type(*bands)
+        if not np.issubdtype(dtype, np.floating):
+            return np.dtype(np.float64)
+        return np.promote_types(dtype, np.float32)
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError(f"dtype must be a floating point type, got {dtype}")
+    return dtype
+
+
+def _check_shapes(*bands: np.ndarray) -> None:
+    """Raise ValueError unless all bands share one shape."""
+    if any(band.shape != bands[0].shape for band in bands[1:]):
+        shapes = ", ".join(str(band.shape) for band in bands)
+        raise ValueError(f"Input arrays must have same shape. Got: {shapes}")
+
+
+def _prepare_out(
+    out: Optional[np.ndarray],
+    shape: Tuple[int, ...],
+    dtype: Any,
+    bands: Tuple[np.ndarray, ...],
+    name: str = "out",
+) -> np.ndarray:
+    """Allocate an output buffer or validate a caller-provided one."""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if not isinstance(out, np.ndarray) or out.shape != shape:
+        raise ValueError(f"{name} must be an ndarray of shape {shape}")
+    if out.dtype != np.dtype(dtype):
+        raise ValueError(f"{name} must have dtype {np.dtype(dtype)}, got {out.dtype}")
+    if any(np.may_share_memory(out, band) for band in bands):
+        raise ValueError(f"{name} must not overlap the input bands")
+    return out
+
+
+def _chunks(shape: Tuple[int, ...], chunk_pixels: int) -> Tuple[Tuple[int, ...], List]:
+    """
+    Split the leading axis of ``shape`` into chunks of about ``chunk_pixels``.
+
+    Returns the shape of one full chunk (for sizing scratch buffers) and the
+    indexers selecting each chunk. Slicing the leading axis always yields
+    views, so non-contiguous inputs are never copied.
+    """
+    if not shape:
+        return (), [Ellipsis]
+    row_pixels = max(int(np.prod(shape[1:], dtype=np.int64)), 1)
+    rows = min(max(1, chunk_pixels // row_pixels), max(shape[0], 1))
+    keys = [
+        slice(start, min(start + rows, shape[0])) for start in range(0, shape[0], rows)
+    ]
+    return (rows,) + tuple(shape[1:]), keys
+
+
+def _head(buffer: np.ndarray, key: Any) -> np.ndarray:
+    """View of a scratch buffer sized to match chunk ``key``."""
+    if isinstance(key, slice):
+        return buffer[: key.stop - key.start]
+    return buffer
+
+
+def _ratio_chunk(ratio: Union[float, np.ndarray], key: Any) -> Any:
+    """FAI ratio for chunk ``key``: scalars pass through, per-layer arrays slice."""
+    if isinstance(ratio, np.ndarray):
+        return ratio[key]
+    return ratio
+
+
+def _valid_reflectance(
+    bands: Tuple[np.ndarray, ...], valid: np.ndarray, scratch: np.ndarray
+) -> None:
+    """
+    Write ``0 <= band <= 1`` (for every band) into ``valid``.
+
+    NaN and inf fail both comparisons, so no separate ``isfinite`` pass is
+    needed.
+    """
+    valid.fill(True)
+    for band in bands:
+        np.greater_equal(band, 0, out=scratch)
+        valid &= scratch
+        np.less_equal(band, 1, out=scratch)
+        valid &= scratch
+
+
+def _fai_kernel(
+    nir: np.ndarray,
+    swir: np.ndarray,
+    red: np.ndarray,
+    out: np.ndarray,
+    ratio: Union[float, np.ndarray],
+) -> None:
+    """
+    FAI = NIR - (RED + (SWIR - RED) * ratio), evaluated in place in ``out``.
+
+    ``ratio`` is a scalar or an array broadcasting over ``out`` (one value per
+    leading-axis layer for mixed-sensor stacks).
+    """
+    np.subtract(swir, red, out=out, dtype=out.dtype)
+    np.multiply(out, ratio, out=out, dtype=out.dtype)
+    np.add(out, red, out=out, dtype=out.dtype)
+    np.subtract(nir, out, out=out, dtype=out.dtype)
+
+
+def _ndre_kernel(
+    red_edge: np.ndarray,
+    nir: np.ndarray,
+    out: np.ndarray,
+    denominator: np.ndarray,
+    scratch: np.ndarray,
+) -> None:
+    """NDRE = (NIR - RedEdge) / (NIR + RedEdge), NaN where the sum is zero."""
+    np.add(nir, red_edge, out=denominator, dtype=out.dtype)
+    np.subtract(nir, red_edge, out=out, dtype=out.dtype)
+    np.not_equal(denominator, 0, out=scratch)
+    np.divide(out, denominator, out=out, where=scratch)
+    np.logical_not(scratch, out=scratch)
+    np.copyto(out, np.nan, where=scratch)
+
+
+def _mask_and_count_extreme(
+    values: np.ndarray,
+    valid: np.ndarray,
+    scratch: np.ndarray,
+    extreme_range: Tuple[float, float],
+) -> int:
+    """Set invalid pixels to NaN and count values outside ``extreme_range``."""
+    np.logical_not(valid, out=scratch)
+    np.copyto(values, np.nan, where=scratch)
+    np.less(values, extreme_range[0], out=scratch)
+    n_extreme = int(np.count_nonzero(scratch))
+    np.greater(values, extreme_range[1], out=scratch)
+    return n_extreme + int(np.count_nonzero(scratch))
+
+
+def _warn_fai_extreme(n_extreme: int) -> None:
+    if n_extreme:
+        warnings.warn(f"Found {n_extreme} FAI values outside typical range [-0.5, 1.0]")
+
+
+def _warn_ndre_extreme(n_extreme: int) -> None:
+    if n_extreme:
+        warnings.warn(
+            f"Found {n_extreme} NDRE values outside theoretical range [-1, 1]"
+        )
+
 
 def fai(
-    b8: np.ndarray, b11: np.ndarray, b4: np.ndarray, mask_invalid: bool = True
+    b8: np.ndarray,
+    b11: np.ndarray,
+    b4: np.ndarray,
+    mask_invalid: bool = True,
+    out: Optional[np.ndarray] = None,
+    dtype: Any = None,
+    sensor: SensorSpec = None,
 ) -> np.ndarray:
     """
     Calculate Floating Algae Index (FAI) for kelp biomass detection.
 
     FAI = NIR - (RED + (SWIR - RED) * (λNIR - λRED) / (λSWIR - λRED))
 
-    For Sentinel-2:
+    For Sentinel-2 (the default nominal wavelengths):
     - b8 (NIR): Band 8 (842nm)
     - b11 (SWIR): Band 11 (1610nm)
     - b4 (RED): Band 4 (665nm)
 
+    Other sensors use their own band centres via ``sensor``; for Landsat 8/9
+    pass OLI bands 5 (NIR), 6 (SWIR1) and 4 (red).
+
     Parameters:
     -----------
     b8 : np.ndarray
@@ -34,6 +245,16 @@ def fai(
         Red reflectance values (Band 4)
     mask_invalid : bool, default=True
         Whether to mask invalid values (NaN, inf, negative) as NaN
+    out : np.ndarray, optional
+        Preallocated array of the input shape to write results into
+    dtype : np.dtype, optional
+        Floating dtype for computation and output. Defaults to the inputs'
+        floating dtype (float64 for integer inputs); float32 halves memory
+    sensor : str or sequence of str, optional
+        Sensor key from ``sentinel_pipeline.sensors.SENSORS`` (e.g. "S2A",
+        "L8") selecting the wavelength ratio, or one sensor per layer along
+        the leading axis of a mixed-sensor stack. Defaults to nominal
+        Sentinel-2 wavelengths
 
     Returns:
     --------
@@ -47,62 +268,39 @@ def fai(
     - Values > 0.01 often indicate algae presence
     - Values > 0.05 indicate significant biomass
     """
-    # Ensure inputs are numpy arrays
-    b8 = np.asarray(b8, dtype=np.float64)
-    b11 = np.asarray(b11, dtype=np.float64)
-    b4 = np.asarray(b4, dtype=np.float64)
-
-    # Check array shapes match
-    if not (b8.shape == b11.shape == b4.shape):
-        raise ValueError(
-            f"Input arrays must have same shape. "
-            f"Got: {b8.shape}, {b11.shape}, {b4.shape}"
-        )
-
-    # Sentinel-2 wavelengths (nanometers)
-    lambda_nir = 842.0  # Band 8
-    lambda_swir = 1610.0  # Band 11
-    lambda_red = 665.0  # Band 4
-
-    # Calculate wavelength ratios
-    wl_ratio = (lambda_nir - lambda_red) / (lambda_swir - lambda_red)
-
-    # Vectorized FAI calculation
-    # FAI = NIR - (RED + (SWIR - RED) * wavelength_ratio)
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", RuntimeWarning)
-        fai_values = b8 - (b4 + (b11 - b4) * wl_ratio)
-
-    if mask_invalid:
-        # Mask invalid input values
-        invalid_mask = (
-            ~np.isfinite(b8)
-            | ~np.isfinite(b11)
-            | ~np.isfinite(b4)
-            | (b8 < 0)
-            | (b11 < 0)
-            | (b4 < 0)
-            | (b8 > 1)
-            | (b11 > 1)
-            | (b4 > 1)  # Assuming reflectance [0,1]
-        )
-        fai_values[invalid_mask] = np.nan
-
-        # Warn about extreme values
-        extreme_mask = np.isfinite(fai_values) & (
-            (fai_values < -0.5) | (fai_values > 1.0)
-        )
-        if np.any(extreme_mask):
-            n_extreme = np.sum(extreme_mask)
-            warnings.warn(
-                f"Found {n_extreme} FAI values outside typical range [-0.5, 1.0]"
-            )
-
-    return np.asarray(fai_values, dtype=np.float64)
+    b8, b11, b4 = np.asarray(b8), np.asarray(b11), np.asarray(b4)
+    _check_shapes(b8, b11, b4)
+    dtype = _resolve_dtype(dtype, out, (b8, b11, b4))
+    out = _prepare_out(out, b8.shape, dtype, (b8, b11, b4))
+    ratio = fai_ratios(sensor, b8.shape)
+
+    chunk_shape, keys = _chunks(b8.shape, DEFAULT_CHUNK_PIXELS)
+    valid = np.empty(chunk_shape, dtype=bool)
+    scratch = np.empty(chunk_shape, dtype=bool)
+    n_extreme = 0
+
+    # Zero denominators and NaN/inf inputs are handled explicitly
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for key in keys:
+            out_chunk = out[key]
+            _fai_kernel(b8[key], b11[key], b4[key], out_chunk, _ratio_chunk(ratio, key))
+            if mask_invalid:
+                v, s = _head(valid, key), _head(scratch, key)
+                _valid_reflectance((b8[key], b11[key], b4[key]), v, s)
+                n_extreme += _mask_and_count_extreme(
+                    out_chunk, v, s, _FAI_EXTREME_RANGE
+                )
+
+    _warn_fai_extreme(n_extreme)
+    return out
 
 
 def ndre(
-    red_edge: np.ndarray, nir: np.ndarray, mask_invalid: bool = True
+    red_edge: np.ndarray,
+    nir: np.ndarray,
+    mask_invalid: bool = True,
+    out: Optional[np.ndarray] = None,
+    dtype: Any = None,
 ) -> np.ndarray:
     """
     Calculate Normalized Difference Red Edge (NDRE) index for vegetation health.
@@ -121,6 +319,11 @@ def ndre(
         Near-infrared reflectance values (Band 8 or 8A)
     mask_invalid : bool, default=True
         Whether to mask invalid values as NaN
+    out : np.ndarray, optional
+        Preallocated array of the input shape to write results into
+    dtype : np.dtype, optional
+        Floating dtype for computation and output. Defaults to the inputs'
+        floating dtype (float64 for integer inputs); float32 halves memory
 
     Returns:
     --------
@@ -135,54 +338,268 @@ def ndre(
     - Values > 0.4 indicate dense vegetation/high biomass
     - Negative values may indicate water, bare soil, or stressed vegetation
     """
-    # Ensure inputs are numpy arrays
-    red_edge = np.asarray(red_edge, dtype=np.float64)
-    nir = np.asarray(nir, dtype=np.float64)
+    red_edge, nir = np.asarray(red_edge), np.asarray(nir)
+    _check_shapes(red_edge, nir)
+    dtype = _resolve_dtype(dtype, out, (red_edge, nir))
+    out = _prepare_out(out, nir.shape, dtype, (red_edge, nir))
+
+    chunk_shape, keys = _chunks(nir.shape, DEFAULT_CHUNK_PIXELS)
+    denominator = np.empty(chunk_shape, dtype=dtype)
+    valid = np.empty(chunk_shape, dtype=bool)
+    scratch = np.empty(chunk_shape, dtype=bool)
+    n_extreme = 0
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for key in keys:
+            out_chunk, s = out[key], _head(scratch, key)
+            _ndre_kernel(red_edge[key], nir[key], out_chunk, _head(denominator, key), s)
+            if mask_invalid:
+                v = _head(valid, key)
+                _valid_reflectance((red_edge[key], nir[key]), v, s)
+                n_extreme += _mask_and_count_extreme(
+                    out_chunk, v, s, _NDRE_EXTREME_RANGE
+                )
+
+    _warn_ndre_extreme(n_extreme)
+    return out
+
+
+def compute_indices(
+    red: np.ndarray,
+    red_edge: np.ndarray,
+    nir: np.ndarray,
+    swir: np.ndarray,
+    mask_invalid: bool = True,
+    out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+    chunk_pixels: int = DEFAULT_CHUNK_PIXELS,
+    dtype: Any = None,
+    sensor: SensorSpec = None,
+) -> SpectralIndices:
+    """
+    Compute FAI, NDRE and a validity mask in a single pass over the bands.
 
-    # Check array shapes match
-    if red_edge.shape != nir.shape:
-        raise ValueError(
-            f"Input arrays must have same shape. Got: {red_edge.shape}, {nir.shape}"
-        )
+    Equivalent to calling :func:`fai` and :func:`ndre` separately, but each
+    chunk of every band is read once and all intermediates live in scratch
+    buffers of ``chunk_pixels`` elements. Peak memory is therefore the three
+    output arrays plus a constant of a few MB, which lets full Sentinel-2
+    tiles run on small workers.
 
-    # Vectorized NDRE calculation with zero-division handling
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", RuntimeWarning)
-
-        numerator = nir - red_edge
-        denominator = nir + red_edge
-
-        # Handle division by zero
-        ndre_values = np.where(denominator != 0, numerator / denominator, np.nan)
-        ndre_values = np.asarray(ndre_values, dtype=np.float64)
-
-    if mask_invalid:
-        # Mask invalid input values
-        invalid_mask = (
-            ~np.isfinite(red_edge)
-            | ~np.isfinite(nir)
-            | (red_edge < 0)
-            | (nir < 0)
-            | (red_edge > 1)
-            | (nir > 1)  # Assuming reflectance [0,1]
-        )
-        ndre_values[invalid_mask] = np.nan
+    Parameters:
+    -----------
+    red : np.ndarray
+        Red reflectance (Sentinel-2 Band 4)
+    red_edge : np.ndarray
+        Red edge reflectance (Sentinel-2 Band 5, 6 or 7)
+    nir : np.ndarray
+        Near-infrared reflectance (Sentinel-2 Band 8)
+    swir : np.ndarray
+        Short-wave infrared reflectance (Sentinel-2 Band 11)
+    mask_invalid : bool, default=True
+        Whether to mask pixels with reflectance outside [0, 1] as NaN
+    out : tuple of np.ndarray, optional
+        Preallocated ``(fai, ndre, valid)`` buffers; the first two must share
+        the compute dtype and the last must be bool, all with the input shape
+    chunk_pixels : int, default=DEFAULT_CHUNK_PIXELS
+        Approximate number of pixels processed per chunk
+    dtype : np.dtype, optional
+        Floating dtype for computation and outputs, resolved as in :func:`fai`
+    sensor : str or sequence of str, optional
+        Sensor (or per-layer sensors) for the FAI wavelengths, as in
+        :func:`fai`. Stacks of scenes from different sensors, shaped
+        ``(n_scenes, rows, cols)``, are processed in one call
 
-        # Theoretical bounds check - NDRE should be in [-1, 1]
-        extreme_mask = np.isfinite(ndre_values) & (
-            (ndre_values < -1.1) | (ndre_values > 1.1)
-        )
-        if np.any(extreme_mask):
-            n_extreme = np.sum(extreme_mask)
-            warnings.warn(
-                f"Found {n_extreme} NDRE values outside theoretical range [-1, 1]"
+    Returns:
+    --------
+    SpectralIndices
+        Named tuple ``(fai, ndre, valid)`` where ``valid`` is True for pixels
+        with finite values for both indices
+    """
+    bands = tuple(np.asarray(band) for band in (red, red_edge, nir, swir))
+    return _run_indices(bands, mask_invalid, out, chunk_pixels, dtype, sensor=sensor)
+
+
+def indices_from_dn(
+    red: np.ndarray,
+    red_edge: np.ndarray,
+    nir: np.ndarray,
+    swir: np.ndarray,
+    scale: Optional[float] = None,
+    offset: Optional[float] = None,
+    nodata: Optional[float] = None,
+    mask_invalid: bool = True,
+    out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+    chunk_pixels: int = DEFAULT_CHUNK_PIXELS,
+    dtype: Any = None,
+    sensor: SensorSpec = None,
+) -> SpectralIndices:
+    """
+    Compute FAI, NDRE and validity directly from scaled-integer (DN) bands.
+
+    Reflectance = DN * scale + offset is applied chunk by chunk inside the
+    index pass, so no full-size float copy of any band is ever materialized.
+    Pixels equal to ``nodata`` become NaN before the indices are evaluated.
+
+    Parameters:
+    -----------
+    red, red_edge, nir, swir : np.ndarray
+        Integer DN arrays (typically uint16) for each band, as in
+        :func:`compute_indices`
+    scale : float, optional
+        Multiplicative reflectance scale factor. If omitted, ``sensor`` is
+        required and its ``scaling`` supplies scale, offset and nodata
+        (explicit ``offset``/``nodata`` still take precedence)
+    offset : float, optional
+        Additive reflectance offset; 0.0 when ``scale`` is given
+    nodata : float, optional
+        DN value marking missing pixels
+    mask_invalid : bool, default=True
+        Whether to mask pixels with reflectance outside [0, 1] as NaN
+    out : tuple of np.ndarray, optional
+        Preallocated ``(fai, ndre, valid)`` buffers
+    chunk_pixels : int, default=DEFAULT_CHUNK_PIXELS
+        Approximate number of pixels processed per chunk
+    dtype : np.dtype, optional
+        Floating dtype for computation and outputs. Defaults to the dtype of
+        ``out`` if given, otherwise float32, which already exceeds the
+        precision of 16-bit DNs
+    sensor : str or sequence of str, optional
+        Sensor (or per-layer sensors) for the FAI wavelengths, as in
+        :func:`fai`. When ``scale`` is omitted, every sensor must share
+        one DN scaling
+
+    Returns:
+    --------
+    SpectralIndices
+        Named tuple ``(fai, ndre, valid)``
+
+    Notes:
+    ------
+    Scaling for common products is available as ``LANDSAT_C2_L2_SCALING`` and
+    ``SENTINEL2_L2A_SCALING``, e.g.
+    ``indices_from_dn(red, red_edge, nir, swir, *LANDSAT_C2_L2_SCALING)``.
+    Sentinel-2 scenes from processing baseline 04.00 onwards carry an extra
+    BOA offset of -1000 DN; pass ``offset=-0.1`` for those.
+    """
+    bands = tuple(np.asarray(band) for band in (red, red_edge, nir, swir))
+    if dtype is None and out is None:
+        dtype = np.float32
+    scaling = _resolve_scaling(scale, offset, nodata, sensor)
+    return _run_indices(bands, mask_invalid, out, chunk_pixels, dtype, scaling, sensor)
+
+
+def _resolve_scaling(
+    scale: Optional[float],
+    offset: Optional[float],
+    nodata: Optional[float],
+    sensor: SensorSpec,
+) -> DNScaling:
+    """Explicit DN scaling, or the scaling of ``sensor`` when ``scale`` is None."""
+    if scale is None:
+        if sensor is None:
+            raise ValueError("Pass scale or a sensor with a known DN scaling")
+        sensors = [sensor] if isinstance(sensor, (str, Sensor)) else list(sensor)
+        scalings = {get_sensor(s).scaling for s in sensors}
+        if len(scalings) != 1:
+            raise ValueError("Sensors have different DN scalings; pass scale")
+        default = scalings.pop()
+        scale = default.scale
+        offset = default.offset if offset is None else offset
+        nodata = default.nodata if nodata is None else nodata
+    return DNScaling(scale, 0.0 if offset is None else offset, nodata)
+
+
+def _scale_dn(dn: np.ndarray, out: np.ndarray, scaling: "DNScaling") -> np.ndarray:
+    """Convert one DN chunk to reflectance in the scratch buffer ``out``."""
+    np.multiply(dn, scaling.scale, out=out, dtype=out.dtype)
+    out += scaling.offset
+    if scaling.nodata is not None:
+        np.copyto(out, np.nan, where=dn == scaling.nodata)
+    return out
+
+
+def _run_indices(
+    bands: Tuple[np.ndarray, ...],
+    mask_invalid: bool,
+    out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    chunk_pixels: int,
+    dtype: Any,
+    scaling: Optional["DNScaling"] = None,
+    sensor: SensorSpec = None,
+) -> SpectralIndices:
+    """Shared chunk loop behind :func:`compute_indices` and :func:`indices_from_dn`."""
+    _check_shapes(*bands)
+    if chunk_pixels < 1:
+        raise ValueError("chunk_pixels must be positive")
+    shape = bands[0].shape
+
+    fai_out, ndre_out, valid_out = out if out is not None else (None, None, None)
+    dtype = _resolve_dtype(dtype, fai_out, bands)
+    fai_out = _prepare_out(fai_out, shape, dtype, bands, "fai out")
+    ndre_out = _prepare_out(ndre_out, shape, dtype, bands, "ndre out")
+    valid_out = _prepare_out(valid_out, shape, bool, bands, "valid out")
+    ratio = fai_ratios(sensor, shape)
+
+    chunk_shape, keys = _chunks(shape, chunk_pixels)
+    denominator = np.empty(chunk_shape, dtype=dtype)
+    nir_valid = np.empty(chunk_shape, dtype=bool)
+    band_valid = np.empty(chunk_shape, dtype=bool)
+    scratch = np.empty(chunk_shape, dtype=bool)
+    reflectance = []
+    if scaling is not None:
+        reflectance = [np.empty(chunk_shape, dtype=dtype) for _ in bands]
+    n_fai_extreme = n_ndre_extreme = 0
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for key in keys:
+            if scaling is None:
+                red, red_edge, nir, swir = (band[key] for band in bands)
+            else:
+                red, red_edge, nir, swir = (
+                    _scale_dn(band[key], _head(buffer, key), scaling)
+                    for band, buffer in zip(bands, reflectance)
+                )
+            fai_chunk, ndre_chunk, valid_chunk = (
+                fai_out[key],
+                ndre_out[key],
+                valid_out[key],
             )
+            s = _head(scratch, key)
+
+            _fai_kernel(nir, swir, red, fai_chunk, _ratio_chunk(ratio, key))
+            _ndre_kernel(red_edge, nir, ndre_chunk, _head(denominator, key), s)
+
+            if mask_invalid:
+                # NIR feeds both indices, so its range check is shared
+                nv, bv = _head(nir_valid, key), _head(band_valid, key)
+                _valid_reflectance((nir,), nv, s)
+
+                _valid_reflectance((red, swir), bv, s)
+                bv &= nv
+                n_fai_extreme += _mask_and_count_extreme(
+                    fai_chunk, bv, s, _FAI_EXTREME_RANGE
+                )
+
+                _valid_reflectance((red_edge,), bv, s)
+                bv &= nv
+                n_ndre_extreme += _mask_and_count_extreme(
+                    ndre_chunk, bv, s, _NDRE_EXTREME_RANGE
+                )
 
-    return ndre_values
+            np.isfinite(fai_chunk, out=valid_chunk)
+            np.isfinite(ndre_chunk, out=s)
+            valid_chunk &= s
+
+    _warn_fai_extreme(n_fai_extreme)
+    _warn_ndre_extreme(n_ndre_extreme)
+    return SpectralIndices(fai_out, ndre_out, valid_out)
 
 
 def validate_spectral_index(
-    values: np.ndarray, index_name: str, expected_range: tuple = (-1, 1)
+    values: np.ndarray,
+    index_name: str,
+    expected_range: tuple = (-1, 1),
+    percentiles: Optional[Sequence[float]] = None,
+    histogram_bins: int = DEFAULT_HISTOGRAM_BINS,
 ) -> dict:
     """
     Validate spectral index results and provide statistics.
@@ -195,45 +612,24 @@ def validate_spectral_index(
         Name of the spectral index (for reporting)
     expected_range : tuple
         Expected (min, max) range for the index
+    percentiles : sequence of float, optional
+        Percentiles in [0, 100] to report under "percentiles" (e.g. "p50")
+    histogram_bins : int, default=DEFAULT_HISTOGRAM_BINS
+        Bins over ``expected_range`` used to approximate the percentiles
 
     Returns:
     --------
     dict
         Statistics and validation results
+
+    Notes:
+    ------
+    Statistics are accumulated in one streaming pass without copying the
+    finite values; percentiles come from a histogram sketch filled in the
+    same pass and are accurate to one bin width inside ``expected_range``.
+    Use ``sentinel_pipeline.stats.IndexStatistics`` directly to combine
+    results across blocks, threads or processes.
     """
-    values = np.asarray(values)
-    finite_values = values[np.isfinite(values)]
-
-    if len(finite_values) == 0:
-        return {
-            "index_name": index_name,
-            "total_pixels": values.size,
-            "valid_pixels": 0,
-            "invalid_pixels": values.size,
-            "percent_valid": 0.0,
-            "min_value": np.nan,
-            "max_value": np.nan,
-            "mean_value": np.nan,
-            "std_value": np.nan,
-            "in_expected_range": 0,
-            "percent_in_range": 0.0,
-        }
-
-    # Count values in expected range
-    in_range = np.sum(
-        (finite_values >= expected_range[0]) & (finite_values <= expected_range[1])
-    )
-
-    return {
-        "index_name": index_name,
-        "total_pixels": values.size,
-        "valid_pixels": len(finite_values),
-        "invalid_pixels": values.size - len(finite_values),
-        "percent_valid": 100.0 * len(finite_values) / values.size,
-        "min_value": np.min(finite_values),
-        "max_value": np.max(finite_values),
-        "mean_value": np.mean(finite_values),
-        "std_value": np.std(finite_values),
-        "in_expected_range": in_range,
-        "percent_in_range": 100.0 * in_range / len(finite_values),
-    }
+    bins = histogram_bins if percentiles is not None else 0
+    stats = IndexStatistics(expected_range, bins)
+    return stats.update(values).summary(index_name, percentiles)
@@ -0,0 +1,250 @@
+"""Summed-area tables for constant-time rectangle statistics of index rasters."""
+
+import os
+import tempfile
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (minx, miny, maxx, maxy) in the grid's CRS
+BBox = Tuple[float, float, float, float]
+
+
+def _integral(values: np.ndarray) -> np.ndarray:
+    """Zero-padded 2-D cumulative sum: entry (r, c) sums ``values[:r, :c]``."""
+    table = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=values.dtype)
+    np.cumsum(values, axis=0, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+class SummedAreaTable:
+    """
+    Integral images of one index raster: sum, sum of squares and count.
+
+    Built once in O(pixels), after which the count, mean and variance of
+    any pixel rectangle take four lookups per table, whatever its size.
+    Invalid pixels (masked or non-finite) contribute nothing. Values are
+    shifted by their mean before accumulating, so the sums of squares stay
+    small and variances do not lose precision to cancellation on large
+    rasters.
+    """
+
+    def __init__(
+        self,
+        sums: np.ndarray,
+        squares: np.ndarray,
+        counts: np.ndarray,
+        shift: float = 0.0,
+    ):
+        """
+        Args:
+            sums: Integral image of shifted values, shape (rows + 1, cols + 1)
+            squares: Integral image of squared shifted values
+            counts: Integral image of valid pixels
+            shift: Value subtracted from every pixel before accumulating
+        """
+        if not sums.shape == squares.shape == counts.shape:
+            raise ValueError("Tables must have the same shape")
+        self.sums = sums
+        self.squares = squares
+        self.counts = counts
+        self.shift = float(shift)
+
+    @classmethod
+    def from_values(
+        cls, values: np.ndarray, valid: Optional[np.ndarray] = None
+    ) -> "SummedAreaTable":
+        """
+        Build the tables for a 2-D index raster.
+
+        Args:
+            values: Index values
+            valid: Optional boolean mask of usable pixels; non-finite values
+                are always excluded
+
+        Returns:
+            SummedAreaTable over ``values``
+        """
+        values = np.asarray(values, dtype=np.float64)
+        use = np.isfinite(values)
+        if valid is not None:
+            use &= valid
+        count = int(np.count_nonzero(use))
+        shift = float(np.sum(values, where=use)) / count if count else 0.0
+        shifted = np.where(use, values - shift, 0.0)
+        return cls(
+            _integral(shifted),
+            _integral(shifted * shifted),
+            _integral(use.astype(np.int64)),
+            shift,
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(rows, cols) of the raster the tables cover."""
+        return self.sums.shape[0] - 1, self.sums.shape[1] - 1
+
+    def window_statistics(
+        self,
+        row_start: Any,
+        row_stop: Any,
+        col_start: Any,
+        col_stop: Any,
+    ) -> Dict[str, Any]:
+        """
+        Count, mean and variance of pixel rectangles in O(1) each.
+
+        Bounds are half-open like slices and are clipped to the raster.
+        Arrays of bounds answer many rectangles in one vectorized call.
+
+        Returns:
+            Dictionary with "count", "mean", "variance" and "std"; mean and
+            variance are NaN for rectangles without valid pixels
+        """
+        rows, cols = self.shape
+        r0, r1 = (
+            np.clip(np.asarray(v, dtype=np.intp), 0, rows)
+            for v in (row_start, row_stop)
+        )
+        c0, c1 = (
+            np.clip(np.asarray(v, dtype=np.intp), 0, cols)
+            for v in (col_start, col_stop)
+        )
+        r1, c1 = np.maximum(r1, r0), np.maximum(c1, c0)
+
+        def total(table: np.ndarray) -> np.ndarray:
+            return table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+
+        count = total(self.counts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_shifted = total(self.sums) / count
+            variance = np.maximum(total(self.squares) / count - mean_shifted**2, 0.0)
+        result = {
+            "count": count,
+            "mean": mean_shifted + self.shift,
+            "variance": variance,
+            "std": np.sqrt(variance),
+        }
+        if np.ndim(count) == 0:
+            result = {
+                key: int(value) if key == "count" else float(value)
+                for key, value in result.items()
+            }
+        return result
+
+
+class IndexTables:
+    """
+    Summed-area tables of several indices (e.g. FAI and NDRE) on one grid.
+
+    Holds the grid's affine transform and CRS so map rectangles can be
+    answered directly, and persists to a single ``.npz`` file.
+    """
+
+    def __init__(
+        self,
+        tables: Dict[str, SummedAreaTable],
+        transform: Sequence[float],
+        crs: Optional[str] = None,
+    ):
+        """
+        Args:
+            tables: Index name -> table; all on the same grid
+            transform: Affine transform of the grid (north-up)
+            crs: CRS of the grid, as WKT or "EPSG:xxxx"
+        """
+        self.tables = tables
+        self.transform = tuple(float(v) for v in tuple(transform)[:6])
+        self.crs = crs
+        if self.transform[1] or self.transform[3]:
+            raise ValueError("Rotated grids are not supported")
+
+    @classmethod
+    def from_indices(
+        cls,
+        indices: Dict[str, np.ndarray],
+        transform: Sequence[float],
+        crs: Optional[str] = None,
+        valid: Optional[np.ndarray] = None,
+    ) -> "IndexTables":
+        """Build tables for index rasters sharing one grid and valid mask."""
+        tables = {
+            name: SummedAreaTable.from_values(values, valid)
+            for name, values in indices.items()
+        }
+        return cls(tables, transform, crs)
+
+    def window(self, bbox: BBox) -> Tuple[int, int, int, int]:
+        """Half-open (row_start, row_stop, col_start, col_stop) of ``bbox``."""
+        a, _, c, _, e, f = self.transform
+        minx, miny, maxx, maxy = bbox
+        cols = sorted(((minx - c) / a, (maxx - c) / a))
+        rows = sorted(((miny - f) / e, (maxy - f) / e))
+        # Pixel i is inside when its center i + 0.5 lies within the bounds
+        col_start, col_stop = (int(np.ceil(v - 0.5)) for v in cols)
+        row_start, row_stop = (int(np.ceil(v - 0.5)) for v in rows)
+        return row_start, row_stop, col_start, col_stop
+
+    def covers(self, bbox: BBox) -> bool:
+        """Whether every pixel selected by ``bbox`` lies inside the grid."""
+        row_start, row_stop, col_start, col_stop = self.window(bbox)
+        rows, cols = next(iter(self.tables.values())).shape
+        return (
+            0 <= row_start and row_stop <= rows and 0 <= col_start and col_stop <= cols
+        )
+
+    def query(self, bbox: BBox) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistics of every index over an axis-aligned rectangle.
+
+        Args:
+            bbox: (minx, miny, maxx, maxy) in the grid's CRS
+
+        Returns:
+            Index name -> {"count", "mean", "variance", "std"}
+        """
+        window = self.window(bbox)
+        return {
+            name: table.window_statistics(*window)
+            for name, table in self.tables.items()
+        }
+
+    def save(self, path: str) -> None:
+        """Write the tables to ``path`` (.npz), atomically."""
+        arrays: Dict[str, Any] = {
+            "transform": np.array(self.transform),
+            "crs": np.array(self.crs or ""),
+            "names": np.array(list(self.tables)),
+        }
+        for name, table in self.tables.items():
+            arrays[f"{name}.sums"] = table.sums
+            arrays[f"{name}.squares"] = table.squares
+            arrays[f"{name}.counts"] = table.counts
+            arrays[f"{name}.shift"] = np.array(table.shift)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "IndexTables":
+        """Read tables written by ``save``."""
+        with np.load(path) as data:
+            tables = {
+                str(name): SummedAreaTable(
+                    data[f"{name}.sums"],
+                    data[f"{name}.squares"],
+                    data[f"{name}.counts"],
+                    float(data[f"{name}.shift"]),
+                )
+                for name in data["names"]
+            }
+            crs = str(data["crs"]) or None
+            return cls(tables, data["transform"], crs)
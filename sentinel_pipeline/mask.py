@@ -1,18 +1,283 @@
 """Masking and filtering module for Sentinel Pipeline."""
 
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
+from sentinel_pipeline.tides import HarmonicTidePredictor, TideSeries
 
-def apply_cloud_mask(img: np.ndarray, qa: np.ndarray) -> np.ndarray:
+# Tide API response, a prebuilt series, or an offline harmonic predictor
+TideSource = Union[Dict[str, Any], TideSeries, HarmonicTidePredictor]
+
+# Landsat Collection 2 QA_PIXEL bit positions
+LANDSAT_QA_BITS: Dict[str, int] = {
+    "fill": 0,
+    "dilated_cloud": 1,
+    "cirrus": 2,
+    "cloud": 3,
+    "shadow": 4,
+    "snow": 5,
+    "clear": 6,
+    "water": 7,
+}
+
+# Sentinel-2 L2A scene classification (SCL) classes per flag
+SCL_CLASSES: Dict[str, Tuple[int, ...]] = {
+    "fill": (0,),
+    "saturated": (1,),
+    "dark": (2,),
+    "shadow": (3,),
+    "water": (6,),
+    "unclassified": (7,),
+    "cloud": (8, 9),
+    "cirrus": (10,),
+    "snow": (11,),
+}
+
+# Flags masked when none are given. Water is kept: kelp lives there.
+DEFAULT_MASK_FLAGS: Dict[str, Tuple[str, ...]] = {
+    "landsat": ("fill", "dilated_cloud", "cirrus", "cloud", "shadow", "snow"),
+    "scl": ("fill", "saturated", "shadow", "cloud", "cirrus", "snow"),
+}
+
+# Flags whose masks are grown by ``buffer``: cloud edges and shadows bleed
+# into neighbouring pixels, while fill and snow do not need a margin
+BUFFER_FLAGS: Dict[str, Tuple[str, ...]] = {
+    "landsat": ("dilated_cloud", "cirrus", "cloud", "shadow"),
+    "scl": ("shadow", "cloud", "cirrus"),
+}
+
+# QA pixels decoded per chunk, bounding scratch memory on full scenes
+_MASK_CHUNK_PIXELS = 1 << 20
+
+
+def _qa_chunks(shape: Tuple[int, ...]) -> List[slice]:
+    """Row slices of about ``_MASK_CHUNK_PIXELS`` pixels over a QA raster."""
+    if not shape:
+        return [slice(None)]
+    row_pixels = max(int(np.prod(shape[1:], dtype=np.int64)), 1)
+    rows = max(1, _MASK_CHUNK_PIXELS // row_pixels)
+    return [slice(start, start + rows) for start in range(0, shape[0], rows)]
+
+
+def _resolve_flags(qa_format: str, flags: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    if qa_format not in DEFAULT_MASK_FLAGS:
+        raise ValueError(
+            f"Unknown QA format {qa_format!r}; expected one of "
+            f"{sorted(DEFAULT_MASK_FLAGS)}"
+        )
+    flags = DEFAULT_MASK_FLAGS[qa_format] if flags is None else tuple(flags)
+    known = LANDSAT_QA_BITS if qa_format == "landsat" else SCL_CLASSES
+    unknown = [flag for flag in flags if flag not in known]
+    if unknown:
+        raise ValueError(f"Unknown {qa_format} QA flags: {unknown}")
+    return flags
+
+
+def _or_window(mask: np.ndarray, width: int, backward: bool) -> None:
+    """
+    OR each element with its ``width - 1`` successors (or predecessors).
+
+    Runs of doubling shifts cover the window in O(log width) whole-array
+    passes, so cost is linear in the array size.
+    """
+    span = 1
+    while span < width:
+        step = min(span, width - span)
+        if backward:
+            mask[step:] |= mask[:-step]
+        else:
+            mask[:-step] |= mask[step:]
+        span += step
+
+
+def buffer_mask(
+    mask: np.ndarray,
+    pixels: int,
+    shape: str = "square",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Grow a boolean mask by ``pixels`` in every direction.
+
+    "square" is a separable (2N+1) x (2N+1) dilation done with shifted ORs
+    along each axis; it buffers a full Sentinel-2 tile in a fraction of a
+    second. "disk" buffers by Euclidean distance using a distance transform,
+    evaluated in row blocks with an N-row halo to bound memory.
+
+    Args:
+        mask: 2-D boolean mask, e.g. from ``cloud_mask``
+        pixels: Buffer radius in pixels
+        shape: "square" or "disk"
+        out: Optional boolean output array; may be ``mask`` itself
+
+    Returns:
+        Buffered boolean mask
+
+    Raises:
+        ValueError: If the radius, shape or arrays are invalid
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.ndim != 2:
+        raise ValueError("mask must be 2-D")
+    if pixels < 0:
+        raise ValueError("pixels must be non-negative")
+    if shape not in ("square", "disk"):
+        raise ValueError(f"Unknown buffer shape {shape!r}; expected 'square' or 'disk'")
+    if out is None:
+        out = np.empty(mask.shape, dtype=bool)
+    elif out.shape != mask.shape or out.dtype != bool:
+        raise ValueError(f"out must be a boolean array of shape {mask.shape}")
+
+    if shape == "square" or pixels == 0:
+        if out is not mask:
+            np.copyto(out, mask)
+        for axis in (0, 1):
+            view = np.moveaxis(out, axis, 0)
+            _or_window(view, pixels + 1, backward=False)
+            _or_window(view, pixels + 1, backward=True)
+        return out
+
+    # scipy is only needed here; the API deployment does not install it
+    from scipy import ndimage
+
+    if np.shares_memory(out, mask):
+        mask = mask.copy()
+    rows = mask.shape[0]
+    block_rows = max(_MASK_CHUNK_PIXELS // max(mask.shape[1], 1), 1)
+    for start in range(0, rows, block_rows):
+        stop = min(start + block_rows, rows)
+        lo, hi = max(start - pixels, 0), min(stop + pixels, rows)
+        window = mask[lo:hi]
+        if not window.any():
+            out[start:stop] = False
+            continue
+        distance = ndimage.distance_transform_edt(~window)
+        np.less_equal(distance[start - lo : stop - lo], pixels, out=out[start:stop])
+    return out
+
+
+def cloud_mask(
+    qa: np.ndarray,
+    qa_format: str = "landsat",
+    flags: Optional[Iterable[str]] = None,
+    out: Optional[np.ndarray] = None,
+    buffer: int = 0,
+    buffer_shape: str = "square",
+) -> np.ndarray:
+    """
+    Decode a QA band into a boolean mask of pixels to discard.
+
+    Landsat QA_PIXEL flags are combined into one bitmask and tested with a
+    single ``bitwise_and`` per chunk; Sentinel-2 SCL classes go through a
+    256-entry lookup table. Scratch memory is bounded by the chunk size.
+
+    Args:
+        qa: Landsat QA_PIXEL (uint16) or Sentinel-2 SCL (uint8) array
+        qa_format: "landsat" or "scl"
+        flags: Flags to mask (keys of ``LANDSAT_QA_BITS`` or ``SCL_CLASSES``);
+            defaults to ``DEFAULT_MASK_FLAGS[qa_format]``
+        out: Optional preallocated boolean array of ``qa.shape``
+        buffer: Pixels by which to grow the selected ``BUFFER_FLAGS`` (cloud
+            and shadow) before combining with the other flags
+        buffer_shape: "square" or "disk", see ``buffer_mask``
+
+    Returns:
+        Boolean array, True where any selected flag is set (or, with a
+        buffer, lies within ``buffer`` pixels of a cloud or shadow)
+
+    Raises:
+        ValueError: If the format, a flag or ``out`` is invalid
+    """
+    flags = _resolve_flags(qa_format, flags)
+    qa = np.asarray(qa)
+    if not np.issubdtype(qa.dtype, np.integer):
+        raise ValueError(f"QA array must have an integer dtype, got {qa.dtype}")
+    if out is None:
+        out = np.empty(qa.shape, dtype=bool)
+    elif out.shape != qa.shape or out.dtype != bool:
+        raise ValueError(f"out must be a boolean array of shape {qa.shape}")
+
+    if qa_format == "landsat":
+        bits = 0
+        for flag in flags:
+            bits |= 1 << LANDSAT_QA_BITS[flag]
+        scratch = np.empty((min(_MASK_CHUNK_PIXELS, max(qa.size, 1)),), dtype=qa.dtype)
+        for key in _qa_chunks(qa.shape):
+            chunk = qa[key]
+            tmp = scratch[: chunk.size].reshape(chunk.shape)
+            np.bitwise_and(chunk, bits, out=tmp)
+            np.not_equal(tmp, 0, out=out[key])
+    else:
+        lut = np.zeros(256, dtype=bool)
+        for flag in flags:
+            lut[list(SCL_CLASSES[flag])] = True
+        # mode="clip" writes straight into ``out``; values > 255 hit lut[255]
+        for key in _qa_chunks(qa.shape):
+            np.take(lut, qa[key], out=out[key], mode="clip")
+
+    buffered = [flag for flag in BUFFER_FLAGS[qa_format] if flag in flags]
+    if buffer and buffered:
+        halo = cloud_mask(qa, qa_format, buffered)
+        out |= buffer_mask(halo, buffer, buffer_shape, out=halo)
+    return out
+
+
+def decode_qa_flags(
+    qa: np.ndarray,
+    qa_format: str = "landsat",
+    flags: Optional[Iterable[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Decode each QA flag into its own boolean array.
+
+    Args:
+        qa: Landsat QA_PIXEL or Sentinel-2 SCL array
+        qa_format: "landsat" or "scl"
+        flags: Flags to decode; defaults to every flag of the format
+
+    Returns:
+        Mapping of flag name to boolean array
+    """
+    known = LANDSAT_QA_BITS if qa_format == "landsat" else SCL_CLASSES
+    flags = _resolve_flags(qa_format, known if flags is None else flags)
+    return {flag: cloud_mask(qa, qa_format, (flag,)) for flag in flags}
+
+
+def apply_cloud_mask(
+    img: np.ndarray,
+    qa: np.ndarray,
+    qa_format: str = "landsat",
+    flags: Optional[Iterable[str]] = None,
+    in_place: bool = False,
+    fill_value: Optional[float] = None,
+    buffer: int = 0,
+    buffer_shape: str = "square",
+) -> np.ndarray:
     """
     Apply cloud mask to satellite image using quality assessment data.
 
+    By default the image is not copied: the result is a masked array whose
+    data is ``img`` itself; only the boolean mask is expanded across bands
+    (a writable copy, so the result supports ordinary item assignment).
+    Use ``.filled()`` for a plain array. With
+    ``in_place=True`` masked pixels are overwritten in ``img`` and ``img`` is
+    returned.
+
     Args:
-        img: Input satellite image array
-        qa: Quality assessment array with cloud information
+        img: Input satellite image array, (rows, cols) or (rows, cols, bands)
+        qa: Quality assessment array with cloud information, (rows, cols)
+        qa_format: "landsat" for QA_PIXEL bit flags or "scl" for Sentinel-2
+            scene classification
+        flags: QA flags to mask; defaults to ``DEFAULT_MASK_FLAGS[qa_format]``
+        in_place: Overwrite masked pixels in ``img`` instead of returning a
+            masked view
+        fill_value: Value written when ``in_place`` is True; NaN for floating
+            images, 0 otherwise
+        buffer: Pixels by which to grow cloud and shadow masks, see
+            ``cloud_mask``
+        buffer_shape: "square" or "disk"
 
     Returns:
         Masked image array with clouds removed/masked
@@ -23,34 +288,100 @@ def apply_cloud_mask(img: np.ndarray, qa: np.ndarray) -> np.ndarray:
     if img.shape[:2] != qa.shape[:2]:
         raise ValueError("Image and QA arrays must have compatible spatial dimensions")
 
-    # TODO: Implement cloud masking logic
-    # Placeholder: return copy of original image
-    return img.copy()
+    if qa.ndim != 2:
+        raise ValueError("QA array must be 2-D")
+
+    mask = cloud_mask(qa, qa_format, flags, buffer=buffer, buffer_shape=buffer_shape)
+    # Trailing unit axes broadcast the 2-D mask across bands
+    band_mask = mask.reshape(mask.shape + (1,) * (img.ndim - 2))
+
+    if in_place:
+        if fill_value is None:
+            fill_value = np.nan if np.issubdtype(img.dtype, np.floating) else 0
+        np.copyto(img, fill_value, where=band_mask)
+        return img
+
+    # The data stays a view; the mask is copied (1 byte per element) because
+    # a broadcast view is read-only and would reject assignments
+    return np.ma.MaskedArray(
+        img, mask=np.broadcast_to(band_mask, img.shape).copy(), copy=False
+    )
+
+
+def _passes_tide(
+    heights: np.ndarray, min_height: Optional[float], max_height: Optional[float]
+) -> np.ndarray:
+    passed = np.ones(heights.shape, dtype=bool)
+    if min_height is not None:
+        passed &= heights >= min_height
+    if max_height is not None:
+        passed &= heights <= max_height
+    return passed
+
 
+def _tide_series(
+    tide_json: TideSource,
+) -> Union[TideSeries, HarmonicTidePredictor]:
+    if isinstance(tide_json, (TideSeries, HarmonicTidePredictor)):
+        return tide_json
+    return TideSeries.from_json(tide_json)
 
-def filter_by_tide(scene_datetime: datetime, tide_json: Dict[str, Any]) -> bool:
+
+def filter_by_tide(
+    scene_datetime: datetime,
+    tide_json: TideSource,
+    min_height: Optional[float] = None,
+    max_height: Optional[float] = None,
+) -> bool:
     """
     Filter scenes based on tide conditions.
 
+    The tide height at the scene time is interpolated from the tide data.
+    Pass a prebuilt ``TideSeries`` when filtering many scenes against the
+    same data, or use ``filter_by_tide_many``.
+
     Args:
-        scene_datetime: Datetime of the satellite scene
-        tide_json: JSON response from tide API containing tide data
+        scene_datetime: Datetime of the satellite scene (naive means UTC)
+        tide_json: JSON response from tide API containing tide data, or a
+            ``TideSeries`` built from it, or a ``HarmonicTidePredictor`` to
+            filter offline
+        min_height: Lowest acceptable tide height, if any
+        max_height: Highest acceptable tide height, if any (e.g. low-tide
+            imaging of kelp canopy)
 
     Returns:
-        True if scene passes tide filter, False otherwise
+        True if scene passes tide filter, False otherwise. Scenes outside the
+        tide data fail any height threshold; without thresholds every scene
+        passes
 
     Raises:
         KeyError: If required tide data is missing from JSON
         ValueError: If tide data format is invalid
     """
-    try:
-        # TODO: Implement tide filtering logic
-        # Check if tide_json has required fields
-        if "data" not in tide_json:
-            raise KeyError("Missing 'data' field in tide JSON")
+    series = _tide_series(tide_json)
+    height = series.height_at(scene_datetime)
+    return bool(_passes_tide(height, min_height, max_height))
+
+
+def filter_by_tide_many(
+    scene_datetimes: Any,
+    tide_json: TideSource,
+    min_height: Optional[float] = None,
+    max_height: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Evaluate the tide filter for many candidate scenes in one call.
 
-        # Placeholder: return True for now
-        return True
+    Args:
+        scene_datetimes: Iterable of datetimes/ISO strings or a datetime64
+            array
+        tide_json: Tide API response, ``TideSeries`` or
+            ``HarmonicTidePredictor``
+        min_height: Lowest acceptable tide height, if any
+        max_height: Highest acceptable tide height, if any
 
-    except (KeyError, ValueError) as e:
-        raise e
+    Returns:
+        Boolean array, True for scenes passing the filter
+    """
+    series = _tide_series(tide_json)
+    return _passes_tide(series.height_at(scene_datetimes), min_height, max_height)
@@ -0,0 +1,187 @@
+"""
+Sensor registry: band mappings, wavelengths and scaling per mission.
+
+FAI interpolates a baseline between the red and SWIR bands, so its
+wavelength ratio depends on each instrument's band centres. The registry
+precomputes that ratio for Sentinel-2A/B and Landsat 8/9 so one index kernel
+serves every mission, including mixed-sensor stacks.
+"""
+
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class DNScaling(NamedTuple):
+    """Linear DN-to-reflectance scaling: reflectance = DN * scale + offset."""
+
+    scale: float
+    offset: float = 0.0
+    nodata: Optional[float] = None
+
+
+# Surface reflectance scaling for Landsat Collection 2 Level-2 products
+LANDSAT_C2_L2_SCALING = DNScaling(scale=0.0000275, offset=-0.2, nodata=0)
+
+# Surface reflectance scaling for Sentinel-2 L2A products
+SENTINEL2_L2A_SCALING = DNScaling(scale=1 / 10000, offset=0.0, nodata=0)
+
+
+class Sensor(NamedTuple):
+    """Band layout and constants for one instrument."""
+
+    name: str
+    platform: str
+    # Band role ("red", "red_edge", "nir", "swir", "qa") -> STAC asset key
+    assets: Dict[str, str]
+    # Band role -> centre wavelength (nm)
+    wavelengths: Dict[str, float]
+    scaling: DNScaling
+    # (λNIR - λRED) / (λSWIR - λRED), precomputed for FAI
+    fai_ratio: float
+    # True when the sensor has no red-edge band and "red_edge" maps to a
+    # substitute band (NDRE then behaves like a red/NIR normalized difference)
+    red_edge_substitute: bool = False
+
+
+def _sensor(
+    name: str,
+    platform: str,
+    assets: Dict[str, str],
+    wavelengths: Dict[str, float],
+    scaling: DNScaling,
+    red_edge_substitute: bool = False,
+) -> Sensor:
+    ratio = (wavelengths["nir"] - wavelengths["red"]) / (
+        wavelengths["swir"] - wavelengths["red"]
+    )
+    return Sensor(
+        name, platform, assets, wavelengths, scaling, ratio, red_edge_substitute
+    )
+
+
+_S2_ASSETS = {
+    "red": "B04",
+    "red_edge": "B05",
+    "nir": "B08",
+    "swir": "B11",
+    "qa": "SCL",
+}
+_LANDSAT_ASSETS = {
+    "red": "red",
+    "red_edge": "red",
+    "nir": "nir08",
+    "swir": "swir16",
+    "qa": "qa_pixel",
+}
+
+SENSORS: Dict[str, Sensor] = {
+    # Nominal Sentinel-2 centres, the historical default of ``fai``
+    "S2": _sensor(
+        "S2",
+        "sentinel-2",
+        _S2_ASSETS,
+        {"red": 665.0, "red_edge": 705.0, "nir": 842.0, "swir": 1610.0},
+        SENTINEL2_L2A_SCALING,
+    ),
+    "S2A": _sensor(
+        "S2A",
+        "sentinel-2a",
+        _S2_ASSETS,
+        {"red": 664.6, "red_edge": 704.1, "nir": 832.8, "swir": 1613.7},
+        SENTINEL2_L2A_SCALING,
+    ),
+    "S2B": _sensor(
+        "S2B",
+        "sentinel-2b",
+        _S2_ASSETS,
+        {"red": 664.9, "red_edge": 703.8, "nir": 832.9, "swir": 1610.4},
+        SENTINEL2_L2A_SCALING,
+    ),
+    "L8": _sensor(
+        "L8",
+        "landsat-8",
+        _LANDSAT_ASSETS,
+        {"red": 654.6, "red_edge": 654.6, "nir": 864.7, "swir": 1608.9},
+        LANDSAT_C2_L2_SCALING,
+        red_edge_substitute=True,
+    ),
+    "L9": _sensor(
+        "L9",
+        "landsat-9",
+        _LANDSAT_ASSETS,
+        {"red": 654.6, "red_edge": 654.6, "nir": 864.6, "swir": 1608.5},
+        LANDSAT_C2_L2_SCALING,
+        red_edge_substitute=True,
+    ),
+}
+
+DEFAULT_SENSOR = "S2"
+
+# Alternative spellings (STAC ``platform`` values, Landsat product prefixes)
+_ALIASES = {
+    "SENTINEL-2": "S2",
+    "SENTINEL-2A": "S2A",
+    "SENTINEL-2B": "S2B",
+    "LANDSAT-8": "L8",
+    "LANDSAT_8": "L8",
+    "LC08": "L8",
+    "LANDSAT-9": "L9",
+    "LANDSAT_9": "L9",
+    "LC09": "L9",
+}
+
+SensorLike = Union[str, Sensor]
+
+
+def get_sensor(sensor: SensorLike) -> Sensor:
+    """
+    Look up a sensor by registry key, platform name or product prefix.
+
+    Args:
+        sensor: e.g. "S2A", "sentinel-2b", "landsat-8", "LC09", or a Sensor
+
+    Returns:
+        The registered Sensor
+
+    Raises:
+        KeyError: If the sensor is unknown
+    """
+    if isinstance(sensor, Sensor):
+        return sensor
+    key = str(sensor).strip().upper()
+    key = _ALIASES.get(key, key)
+    if key not in SENSORS:
+        raise KeyError(
+            f"Unknown sensor {sensor!r}. Known sensors: {', '.join(SENSORS)}"
+        )
+    return SENSORS[key]
+
+
+def fai_ratios(
+    sensor: Union[None, SensorLike, Sequence[SensorLike]],
+    shape: Tuple[int, ...],
+) -> Union[float, np.ndarray]:
+    """
+    Resolve the FAI wavelength ratio for an input of ``shape``.
+
+    Args:
+        sensor: None for the default sensor, one sensor, or one sensor per
+            layer along the leading axis of a mixed-sensor stack
+        shape: Shape of the band arrays
+
+    Returns:
+        A float, or an array broadcastable against ``shape`` holding one ratio
+        per leading-axis layer
+    """
+    if sensor is None:
+        return SENSORS[DEFAULT_SENSOR].fai_ratio
+    if isinstance(sensor, (str, Sensor)):
+        return get_sensor(sensor).fai_ratio
+    ratios = np.array([get_sensor(s).fai_ratio for s in sensor], dtype=np.float64)
+    if not shape or len(ratios) != shape[0]:
+        raise ValueError(
+            "A per-layer sensor list needs one entry per leading-axis layer; "
+            f"got {len(ratios)} sensors for shape {shape}"
+        )
+    return ratios.reshape((-1,) + (1,) * (len(shape) - 1))
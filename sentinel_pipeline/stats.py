@@ -0,0 +1,466 @@
+"""Streaming, mergeable statistics for spectral index rasters."""
+
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Pixels reduced per chunk; bounds the temporaries created by ``update``
+_CHUNK_PIXELS = 1 << 18
+
+# Default number of histogram bins for percentile sketches
+DEFAULT_HISTOGRAM_BINS = 1000
+
+
+class IndexHistogram:
+    """
+    Fixed-bin histogram sketch for approximate percentiles.
+
+    Bins span ``value_range`` evenly, with one underflow and one overflow bin
+    bounded by the exact minimum and maximum seen. Building is a single
+    streaming pass, histograms with equal bins merge by adding counts, and a
+    percentile query costs O(bins). Inside ``value_range`` the error of any
+    percentile is at most one bin width.
+    """
+
+    def __init__(
+        self,
+        value_range: Tuple[float, float] = (-1, 1),
+        bins: int = DEFAULT_HISTOGRAM_BINS,
+    ):
+        low, high = float(value_range[0]), float(value_range[1])
+        if not high > low:
+            raise ValueError("value_range must be increasing")
+        if bins < 1:
+            raise ValueError("bins must be positive")
+        self.value_range = (low, high)
+        self.bins = int(bins)
+        # counts[0] is underflow, counts[-1] overflow
+        self.counts = np.zeros(self.bins + 2, dtype=np.int64)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> int:
+        """Number of finite values added."""
+        return int(self.counts.sum())
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Edges of the in-range bins (length ``bins + 1``)."""
+        return np.linspace(self.value_range[0], self.value_range[1], self.bins + 1)
+
+    def update(self, values: np.ndarray) -> "IndexHistogram":
+        """
+        Add a block of values; NaN and inf are ignored.
+
+        Returns:
+            self, for chaining
+        """
+        flat = np.asarray(values).reshape(-1)
+        for start in range(0, flat.size, _CHUNK_PIXELS):
+            chunk = flat[start : start + _CHUNK_PIXELS]
+            self._add_finite(chunk[np.isfinite(chunk)])
+        return self
+
+    def _add_finite(self, finite: np.ndarray) -> None:
+        """Bin values already known to be finite."""
+        if finite.size == 0:
+            return
+        low, high = self.value_range
+        index = np.subtract(finite, low, dtype=np.float64)
+        index *= self.bins / (high - low)
+        np.floor(index, out=index)
+        np.clip(index, 0, self.bins - 1, out=index)
+        index += 1
+        index[finite < low] = 0
+        index[finite > high] = self.bins + 1
+        self.counts += np.bincount(index.astype(np.intp), minlength=self.bins + 2)
+        self.min = min(self.min, float(finite.min()))
+        self.max = max(self.max, float(finite.max()))
+
+    def merge(self, other: "IndexHistogram") -> "IndexHistogram":
+        """Add another histogram with identical bins into this one."""
+        if (other.value_range, other.bins) != (self.value_range, self.bins):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, q: Union[float, Sequence[float]]) -> Union[float, np.ndarray]:
+        """
+        Approximate percentiles, interpolating linearly within bins.
+
+        Args:
+            q: Percentile or sequence of percentiles in [0, 100], as for
+                ``np.percentile``
+
+        Returns:
+            Percentile value(s); NaN if the histogram is empty
+        """
+        q_array = np.asarray(q, dtype=np.float64)
+        if np.any((q_array < 0) | (q_array > 100)):
+            raise ValueError("Percentiles must be in the range [0, 100]")
+        total = self.count
+        if total == 0:
+            empty = np.full(q_array.shape, np.nan)
+            return float(empty) if empty.ndim == 0 else empty
+
+        low, high = self.value_range
+        lower = np.concatenate(([min(self.min, low)], self.edges[:-1], [high]))
+        upper = np.concatenate(([low], self.edges[1:], [max(self.max, high)]))
+
+        cumulative = np.cumsum(self.counts)
+        rank = q_array / 100.0 * total
+        k = np.minimum(np.searchsorted(cumulative, rank, side="left"), self.bins + 1)
+        in_bin = self.counts[k]
+        fraction = np.divide(
+            rank - (cumulative[k] - in_bin),
+            in_bin,
+            out=np.zeros_like(rank),
+            where=in_bin > 0,
+        )
+        result = np.clip(
+            lower[k] + fraction * (upper[k] - lower[k]), self.min, self.max
+        )
+        return float(result) if result.ndim == 0 else result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the histogram (e.g. to send between processes)."""
+        return {
+            "value_range": list(self.value_range),
+            "bins": self.bins,
+            "counts": self.counts.tolist(),
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "IndexHistogram":
+        """Rebuild a histogram from ``to_dict`` output."""
+        histogram = cls(tuple(state["value_range"]), state["bins"])
+        histogram.counts[:] = state["counts"]
+        if histogram.count:
+            histogram.min = float(state["min"])
+            histogram.max = float(state["max"])
+        return histogram
+
+
+def percentile_stretch(
+    band: np.ndarray,
+    lower: float = 2,
+    upper: float = 98,
+    valid: Optional[np.ndarray] = None,
+    bins: int = 4096,
+    fill: Optional[float] = 0.0,
+) -> np.ndarray:
+    """
+    Contrast-stretch a band to [0, 1] between two approximate percentiles.
+
+    Replaces ``np.percentile`` (which sorts every pixel) with a histogram over
+    the band's own value range. The band is reduced in chunks, so apart from
+    the output only chunk-sized temporaries are allocated. The stretch limits
+    are accurate to 1/``bins`` of that range, far below display precision.
+
+    Args:
+        band: Band array
+        lower: Lower percentile mapped to 0
+        upper: Upper percentile mapped to 1
+        valid: Optional boolean mask of usable pixels; non-finite pixels are
+            always excluded
+        bins: Number of histogram bins
+        fill: Value for unusable pixels; None stretches them like the rest
+            (NaN stays NaN), as a plain ``np.clip`` stretch would
+
+    Returns:
+        Array in [0, 1] (float32 for float32 or small-integer bands, float64
+        otherwise). A band without usable pixels is returned unchanged (as
+        float).
+    """
+    band = np.asarray(band)
+    dtype = np.result_type(band.dtype, np.float32)
+    flat = band.reshape(-1)
+    flat_valid = None if valid is None else np.asarray(valid).reshape(-1)
+
+    def chunks():
+        for start in range(0, flat.size, _CHUNK_PIXELS):
+            chunk = flat[start : start + _CHUNK_PIXELS]
+            use = np.isfinite(chunk)
+            if flat_valid is not None:
+                use &= flat_valid[start : start + _CHUNK_PIXELS]
+            yield start, chunk, use
+
+    low, high = np.inf, -np.inf
+    for _, chunk, use in chunks():
+        low = min(low, float(np.min(chunk, where=use, initial=np.inf)))
+        high = max(high, float(np.max(chunk, where=use, initial=-np.inf)))
+    if low > high:
+        return band.astype(dtype)
+    if high == low:
+        return np.zeros(band.shape, dtype=dtype)
+
+    histogram = IndexHistogram((low, high), bins)
+    for _, chunk, use in chunks():
+        histogram._add_finite(chunk[use])
+    p_low, p_high = histogram.percentile([lower, upper])
+    if p_high <= p_low:
+        p_high = p_low + (high - low) / bins
+
+    result = np.empty(flat.size, dtype=dtype)
+    for start, chunk, use in chunks():
+        out = result[start : start + chunk.size]
+        np.subtract(chunk, p_low, out=out, dtype=dtype)
+        out /= p_high - p_low
+        np.clip(out, 0, 1, out=out)
+        if fill is not None:
+            out[~use] = fill
+    return result.reshape(band.shape)
+
+
+class IndexStatistics:
+    """
+    One-pass accumulator of counts, extrema and moments for index values.
+
+    Moments use Welford/Chan updates, so partial accumulators built over
+    blocks, threads or processes combine exactly with ``merge`` without ever
+    holding the full index array. Non-finite values count towards
+    ``total_pixels`` only. Instances pickle cleanly, and ``to_dict`` /
+    ``from_dict`` round-trip through JSON.
+
+    With ``histogram_bins`` set, an ``IndexHistogram`` over ``expected_range``
+    is filled in the same pass so ``summary`` can report percentiles.
+    """
+
+    def __init__(
+        self,
+        expected_range: Tuple[float, float] = (-1, 1),
+        histogram_bins: int = 0,
+    ):
+        self.expected_range = (float(expected_range[0]), float(expected_range[1]))
+        self.histogram = (
+            IndexHistogram(self.expected_range, histogram_bins)
+            if histogram_bins
+            else None
+        )
+        self.total = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.in_range = 0
+
+    def update(self, values: np.ndarray) -> "IndexStatistics":
+        """
+        Add a block of index values.
+
+        Args:
+            values: Array of any shape; NaN and inf are treated as invalid
+
+        Returns:
+            self, for chaining
+        """
+        # A view for contiguous input; strided input is copied once here
+        flat = np.asarray(values).reshape(-1)
+        self.total += flat.size
+        low, high = self.expected_range
+        finite = np.empty(min(flat.size, _CHUNK_PIXELS), dtype=bool)
+        deviation = np.empty(finite.shape, dtype=np.float64)
+
+        for start in range(0, flat.size, _CHUNK_PIXELS):
+            chunk = flat[start : start + _CHUNK_PIXELS]
+            mask, dev = finite[: chunk.size], deviation[: chunk.size]
+            np.isfinite(chunk, out=mask)
+            n = int(np.count_nonzero(mask))
+            if n == 0:
+                continue
+
+            mean = float(np.sum(chunk, where=mask, dtype=np.float64)) / n
+            np.subtract(chunk, mean, out=dev, dtype=np.float64)
+            np.multiply(dev, dev, out=dev)
+            m2 = float(np.sum(dev, where=mask))
+            chunk_min = float(np.min(chunk, where=mask, initial=np.inf))
+            chunk_max = float(np.max(chunk, where=mask, initial=-np.inf))
+            in_range = int(np.count_nonzero((chunk >= low) & (chunk <= high)))
+            if self.histogram is not None:
+                self.histogram._add_finite(chunk[mask])
+
+            self._combine(n, mean, m2, chunk_min, chunk_max, in_range)
+        return self
+
+    def merge(self, other: "IndexStatistics") -> "IndexStatistics":
+        """
+        Fold another accumulator into this one (Chan et al. parallel update).
+
+        Args:
+            other: Accumulator built with the same ``expected_range``
+
+        Returns:
+            self, for chaining
+        """
+        if other.expected_range != self.expected_range:
+            raise ValueError("Cannot merge statistics with different expected ranges")
+        if (self.histogram is None) != (other.histogram is None):
+            raise ValueError("Cannot merge statistics with and without histograms")
+        if self.histogram is not None:
+            self.histogram.merge(other.histogram)
+        self.total += other.total
+        if other.count:
+            self._combine(
+                other.count, other.mean, other.m2, other.min, other.max, other.in_range
+            )
+        return self
+
+    @classmethod
+    def combine(
+        cls,
+        parts: Iterable["IndexStatistics"],
+        expected_range: Optional[Tuple[float, float]] = None,
+    ) -> "IndexStatistics":
+        """Merge many partial accumulators into a new one."""
+        parts = list(parts)
+        if expected_range is None:
+            expected_range = parts[0].expected_range if parts else (-1, 1)
+        bins = parts[0].histogram.bins if parts and parts[0].histogram else 0
+        result = cls(expected_range, bins)
+        for part in parts:
+            result.merge(part)
+        return result
+
+    def _combine(
+        self,
+        n: int,
+        mean: float,
+        m2: float,
+        minimum: float,
+        maximum: float,
+        in_range: int,
+    ) -> None:
+        if self.count == 0:
+            self.count, self.mean, self.m2 = n, mean, m2
+        else:
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean += delta * n / total
+            self.m2 += m2 + delta * delta * self.count * n / total
+            self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+        self.in_range += in_range
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the valid values (NaN if there are none)."""
+        return self.m2 / self.count if self.count else np.nan
+
+    def summary(
+        self, index_name: str, percentiles: Optional[Sequence[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Report statistics in the format of ``validate_spectral_index``.
+
+        Args:
+            index_name: Name of the spectral index (for reporting)
+            percentiles: Percentiles in [0, 100] to report under
+                "percentiles", keyed like "p50"; needs ``histogram_bins``
+
+        Returns:
+            Statistics and validation results
+        """
+        result = self._summary(index_name)
+        if percentiles is not None:
+            if self.histogram is None:
+                raise ValueError("Percentiles require histogram_bins to be set")
+            values = np.atleast_1d(self.histogram.percentile(percentiles))
+            result["percentiles"] = {
+                f"p{p:g}": float(value) for p, value in zip(percentiles, values)
+            }
+        return result
+
+    def _summary(self, index_name: str) -> Dict[str, Any]:
+        if self.count == 0:
+            return {
+                "index_name": index_name,
+                "total_pixels": self.total,
+                "valid_pixels": 0,
+                "invalid_pixels": self.total,
+                "percent_valid": 0.0,
+                "min_value": np.nan,
+                "max_value": np.nan,
+                "mean_value": np.nan,
+                "std_value": np.nan,
+                "in_expected_range": 0,
+                "percent_in_range": 0.0,
+            }
+
+        return {
+            "index_name": index_name,
+            "total_pixels": self.total,
+            "valid_pixels": self.count,
+            "invalid_pixels": self.total - self.count,
+            "percent_valid": 100.0 * self.count / self.total,
+            "min_value": self.min,
+            "max_value": self.max,
+            "mean_value": self.mean,
+            "std_value": float(np.sqrt(self.variance)),
+            "in_expected_range": self.in_range,
+            "percent_in_range": 100.0 * self.in_range / self.count,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the accumulator state (e.g. to send between processes)."""
+        return {
+            "expected_range": list(self.expected_range),
+            "histogram": self.histogram.to_dict() if self.histogram else None,
+            "total": self.total,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "in_range": self.in_range,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "IndexStatistics":
+        """Rebuild an accumulator from ``to_dict`` output."""
+        stats = cls(tuple(state["expected_range"]))
+        if state.get("histogram"):
+            stats.histogram = IndexHistogram.from_dict(state["histogram"])
+        stats.total = int(state["total"])
+        stats.count = int(state["count"])
+        stats.mean = float(state["mean"])
+        stats.m2 = float(state["m2"])
+        if stats.count:
+            stats.min = float(state["min"])
+            stats.max = float(state["max"])
+        stats.in_range = int(state["in_range"])
+        return stats
+
+
+class BlockStatistics:
+    """
+    Block sink accumulating FAI and NDRE statistics.
+
+    Pass an instance as the sink of ``sentinel_pipeline.blocks.process_blocks``
+    to get scene statistics without keeping the index rasters.
+    """
+
+    def __init__(
+        self,
+        fai_range: Tuple[float, float] = (-0.5, 1.0),
+        ndre_range: Tuple[float, float] = (-1, 1),
+        histogram_bins: int = 0,
+    ):
+        self.fai = IndexStatistics(fai_range, histogram_bins)
+        self.ndre = IndexStatistics(ndre_range, histogram_bins)
+
+    def __call__(self, window: Any, result: Any) -> None:
+        self.fai.update(result.fai)
+        self.ndre.update(result.ndre)
+
+    def merge(self, other: "BlockStatistics") -> "BlockStatistics":
+        """Fold another block accumulator into this one."""
+        self.fai.merge(other.fai)
+        self.ndre.merge(other.ndre)
+        return self
@@ -0,0 +1,226 @@
+"""Tests for the HTTP byte-range block cache."""
+
+import functools
+import http.server
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline import blockcache
+from sentinel_pipeline.blockcache import BlockCache, open_raster
+
+rasterio = pytest.importorskip("rasterio")
+from rasterio.transform import from_origin  # noqa: E402
+
+
+class CountingHandler(http.server.SimpleHTTPRequestHandler):
+    """Single-range file handler recording each request's Range header."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.ranges.append(self.headers.get("Range"))
+        time.sleep(self.server.delay)
+        path = self.translate_path(self.path)
+        header = self.headers.get("Range")
+        if not header or not os.path.isfile(path):
+            return super().do_GET()
+        with open(path, "rb") as f:
+            data = f.read()
+        start, _, end = header.replace("bytes=", "").partition("-")
+        start, end = int(start), min(int(end or len(data) - 1), len(data) - 1)
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(data[start : end + 1])
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve ``tmp_path`` over HTTP in a background thread."""
+    payload = bytes(range(256)) * 64  # 16 KiB
+    (tmp_path / "blob.bin").write_bytes(payload)
+    data = np.arange(256 * 256, dtype=np.uint16).reshape(256, 256)
+    profile = {
+        "driver": "GTiff",
+        "height": 256,
+        "width": 256,
+        "count": 1,
+        "dtype": "uint16",
+        "crs": "EPSG:32610",
+        "transform": from_origin(500000.0, 5400000.0, 10.0, 10.0),
+        "tiled": True,
+        "blockxsize": 64,
+        "blockysize": 64,
+    }
+    with rasterio.open(tmp_path / "band.tif", "w", **profile) as dst:
+        dst.write(data, 1)
+
+    handler = functools.partial(CountingHandler, directory=str(tmp_path))
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.ranges = []
+    httpd.delay = 0
+    httpd.payload = payload
+    httpd.data = data
+    httpd.base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestBlockCache:
+    """Test cases for BlockCache."""
+
+    def test_read_ranges(self, server):
+        """Test ranges match the file, including ones crossing blocks."""
+        cache = BlockCache(block_size=1000)
+        url = f"{server.base}/blob.bin"
+
+        result = cache.read_ranges(url, [(0, 10), (990, 30), (16380, 100)])
+
+        assert result == [
+            server.payload[0:10],
+            server.payload[990:1020],
+            server.payload[16380:],
+        ]
+        assert cache.size(url) == len(server.payload)
+
+    def test_adjacent_blocks_coalesced(self, server):
+        """Test a run of missing blocks is fetched with one request."""
+        cache = BlockCache(block_size=1000)
+        url = f"{server.base}/blob.bin"
+        cache.size(url)
+        server.ranges.clear()
+
+        data = cache.read_ranges(url, [(1000, 2500), (3500, 2000), (9000, 100)])
+
+        assert data[0] == server.payload[1000:3500]
+        assert server.ranges == ["bytes=1000-5999", "bytes=9000-9999"]
+
+    def test_overlapping_reads_reuse_blocks(self, server):
+        """Test overlapping reads only fetch blocks not yet cached."""
+        cache = BlockCache(block_size=1000)
+        url = f"{server.base}/blob.bin"
+        cache.read_ranges(url, [(0, 3000)])
+        server.ranges.clear()
+        hits = cache.hits
+
+        cache.read_ranges(url, [(2500, 2000)])
+
+        assert server.ranges == ["bytes=3000-4999"]
+        assert cache.hits == hits + 1
+        assert 0 < cache.stats()["hit_ratio"] < 1
+
+    def test_signed_urls_share_blocks(self, server):
+        """Test URLs differing only in their query string share blocks."""
+        cache = BlockCache(block_size=1000)
+        cache.read_ranges(f"{server.base}/blob.bin?sig=a", [(0, 2000)])
+        server.ranges.clear()
+
+        data = cache.read_ranges(f"{server.base}/blob.bin?sig=b", [(0, 2000)])
+
+        assert data == [server.payload[:2000]]
+        assert server.ranges == []
+
+    def test_byte_based_eviction(self, server):
+        """Test the least recently used blocks are evicted past max_bytes."""
+        cache = BlockCache(block_size=1000, max_bytes=3000)
+        url = f"{server.base}/blob.bin"
+        cache.read_ranges(url, [(0, 3000)])
+        cache.read_ranges(url, [(0, 10)])  # block 0 is now most recent
+        cache.read_ranges(url, [(5000, 10)])
+
+        assert cache.size_bytes <= 3000
+        server.ranges.clear()
+        cache.read_ranges(url, [(0, 10)])
+        assert server.ranges == []
+        cache.read_ranges(url, [(1000, 10)])
+        assert server.ranges == ["bytes=1000-1999"]
+
+    def test_concurrent_reads_single_flight(self, server):
+        """Test concurrent reads of the same blocks issue one request."""
+        cache = BlockCache(block_size=1000)
+        url = f"{server.base}/blob.bin"
+        cache.size(url)
+        server.ranges.clear()
+        server.delay = 0.1
+        results = []
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.read_ranges(url, [(4000, 500)]))
+            )
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert server.ranges == ["bytes=4000-4999"]
+        assert all(r == [server.payload[4000:4500]] for r in results)
+
+    def test_invalid_sizes(self):
+        """Test max_bytes must hold at least one block."""
+        with pytest.raises(ValueError):
+            BlockCache(block_size=1000, max_bytes=10)
+
+
+class TestOpenRaster:
+    """Test cases for rasterio reads through the block cache."""
+
+    def test_window_matches_local_read(self, server):
+        """Test a remote window read equals the source data."""
+        cache = BlockCache(block_size=4096)
+
+        with open_raster(f"{server.base}/band.tif?sig=x", cache=cache) as src:
+            window = src.read(1, window=((64, 128), (0, 128)))
+
+        np.testing.assert_array_equal(window, server.data[64:128, 0:128])
+        assert cache.stats()["requests"] < 10
+
+    def test_overlapping_windows_hit_cache(self, server):
+        """Test reopening the scene for an overlapping AOI reuses blocks."""
+        cache = BlockCache(block_size=4096)
+        url = f"{server.base}/band.tif"
+        with open_raster(url, cache=cache) as src:
+            src.read(1, window=((0, 128), (0, 128)))
+        requests_before = cache.requests
+
+        with open_raster(url, cache=cache) as src:
+            window = src.read(1, window=((64, 128), (64, 128)))
+
+        np.testing.assert_array_equal(window, server.data[64:128, 64:128])
+        assert cache.requests == requests_before
+        assert cache.stats()["hit_ratio"] > 0.5
+
+    def test_local_paths_bypass_cache(self, server, tmp_path):
+        """Test local files are opened directly."""
+        cache = BlockCache()
+
+        with open_raster(str(tmp_path / "band.tif"), cache=cache) as src:
+            src.read(1)
+
+        assert cache.stats()["requests"] == 0
+
+    def test_falls_back_without_opener_api(self, monkeypatch):
+        """Test rasterio < 1.4 opens URLs directly with a warning."""
+        monkeypatch.setitem(sys.modules, "rasterio.abc", None)
+        monkeypatch.setattr(rasterio, "open", MagicMock())
+        blockcache._opener_class.cache_clear()
+        try:
+            with pytest.warns(UserWarning, match="opener API"):
+                open_raster("https://example.com/band.tif", cache=BlockCache())
+        finally:
+            blockcache._opener_class.cache_clear()
+
+        rasterio.open.assert_called_once_with("https://example.com/band.tif")
@@ -0,0 +1,170 @@
+"""Tests for the blockwise processing module."""
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.blocks import (
+    ArrayBandSource,
+    ArraySink,
+    RasterioBandSource,
+    RasterioSink,
+    Window,
+    aligned_block_shape,
+    iter_windows,
+    process_blocks,
+)
+from sentinel_pipeline.indices import SENTINEL2_L2A_SCALING, compute_indices
+
+
+@pytest.fixture
+def bands():
+    """Random reflectance bands with an awkward (non-multiple) shape."""
+    rng = np.random.default_rng(11)
+    shape = (103, 77)
+    return tuple(rng.uniform(0.0, 0.6, shape) for _ in range(4))
+
+
+class TestWindows:
+    """Test cases for window iteration and alignment."""
+
+    def test_iter_windows_covers_raster_once(self):
+        """Test windows tile the raster without gaps or overlap."""
+        coverage = np.zeros((103, 77), dtype=int)
+
+        for window in iter_windows(coverage.shape, (32, 20)):
+            coverage[window.slices] += 1
+
+        assert np.all(coverage == 1)
+
+    def test_iter_windows_clips_edges(self):
+        """Test edge windows are clipped to the raster."""
+        windows = list(iter_windows((10, 10), (4, 6)))
+
+        assert len(windows) == 6
+        assert windows[-1] == Window(8, 6, 2, 4)
+
+    def test_iter_windows_invalid_block(self):
+        """Test non-positive block shapes raise ValueError."""
+        with pytest.raises(ValueError):
+            list(iter_windows((10, 10), (0, 5)))
+
+    def test_aligned_block_shape(self):
+        """Test windows are multiples of the native tile shape."""
+        assert aligned_block_shape((512, 512), target_pixels=1024 * 1024) == (
+            1024,
+            1024,
+        )
+        assert aligned_block_shape((256, 512), target_pixels=1000) == (256, 512)
+        assert aligned_block_shape((1, 1000), target_pixels=50_000) == (50, 1000)
+        assert aligned_block_shape(None, target_pixels=10_000) == (100, 100)
+
+
+class TestProcessBlocks:
+    """Test cases for blockwise FAI/NDRE processing."""
+
+    def test_matches_whole_array(self, bands):
+        """Test blockwise results equal whole-array computation."""
+        expected = compute_indices(*bands)
+        source = ArrayBandSource(*bands)
+
+        sink = process_blocks(source, ArraySink(source.shape, np.float64), (16, 24))
+
+        np.testing.assert_array_equal(sink.fai, expected.fai)
+        np.testing.assert_array_equal(sink.ndre, expected.ndre)
+        np.testing.assert_array_equal(sink.valid, expected.valid)
+
+    def test_parallel_matches_serial(self, bands):
+        """Test threaded processing gives identical results in window order."""
+        source = ArrayBandSource(*bands)
+        seen = []
+
+        def record(window, result):
+            seen.append(window)
+
+        serial = process_blocks(source, ArraySink(source.shape), (10, 10))
+        parallel = process_blocks(
+            source, ArraySink(source.shape), (10, 10), max_workers=4
+        )
+        process_blocks(source, record, (10, 10), max_workers=3)
+
+        np.testing.assert_array_equal(serial.fai, parallel.fai)
+        np.testing.assert_array_equal(serial.ndre, parallel.ndre)
+        assert seen == list(iter_windows(source.shape, (10, 10)))
+
+    def test_dn_scaling(self, bands):
+        """Test integer DN sources are scaled per block."""
+        # Keep DNs above the Sentinel-2 nodata value of 0
+        dn = tuple(np.round(band * 10000).astype(np.uint16) + 1 for band in bands)
+        expected = compute_indices(*(band / 10000 for band in dn), dtype=np.float32)
+        source = ArrayBandSource(*dn)
+
+        sink = process_blocks(
+            source, ArraySink(source.shape), (32, 32), scaling=SENTINEL2_L2A_SCALING
+        )
+
+        np.testing.assert_allclose(sink.fai, expected.fai, atol=1e-6)
+        np.testing.assert_array_equal(sink.valid, expected.valid)
+
+    def test_accumulator_sink(self, bands):
+        """Test a sink can reduce blocks without storing full outputs."""
+        totals = {"valid": 0}
+
+        def count_valid(window, result):
+            totals["valid"] += int(result.valid.sum())
+
+        process_blocks(ArrayBandSource(*bands), count_valid, (20, 20))
+
+        assert totals["valid"] == compute_indices(*bands).valid.sum()
+
+    def test_source_shape_mismatch(self, bands):
+        """Test mismatched band shapes are rejected."""
+        with pytest.raises(ValueError, match="same shape"):
+            ArrayBandSource(bands[0], bands[1], bands[2], bands[3][:-1])
+
+
+class TestRasterioBlocks:
+    """Test cases for reading and writing tiled GeoTIFFs."""
+
+    @pytest.fixture
+    def band_paths(self, tmp_path, bands):
+        """Write each band to a tiled GeoTIFF with 16x16 internal tiles."""
+        rasterio = pytest.importorskip("rasterio")
+        paths = {}
+        profile = {
+            "driver": "GTiff",
+            "height": bands[0].shape[0],
+            "width": bands[0].shape[1],
+            "count": 1,
+            "dtype": "float64",
+            "tiled": True,
+            "blockxsize": 16,
+            "blockysize": 16,
+        }
+        for name, band in zip(("red", "red_edge", "nir", "swir"), bands):
+            path = tmp_path / f"{name}.tif"
+            with rasterio.open(path, "w", **profile) as dst:
+                dst.write(band, 1)
+            paths[name] = str(path)
+        return paths
+
+    def test_rasterio_source_to_sink(self, tmp_path, bands, band_paths):
+        """Test COG-aligned reading and GeoTIFF output round trip."""
+        import rasterio
+
+        expected = compute_indices(*bands)
+        out_path = tmp_path / "indices.tif"
+
+        with RasterioBandSource(band_paths) as source:
+            assert source.block_shape == (16, 16)
+            with RasterioSink(str(out_path), source.shape) as sink:
+                process_blocks(source, sink, max_workers=2)
+
+        with rasterio.open(out_path) as src:
+            np.testing.assert_array_equal(src.read(1), expected.fai.astype("f4"))
+            np.testing.assert_array_equal(src.read(2), expected.ndre.astype("f4"))
+
+    def test_rasterio_source_missing_band(self, band_paths):
+        """Test missing band paths raise ValueError."""
+        del band_paths["swir"]
+        with pytest.raises(ValueError, match="swir"):
+            RasterioBandSource(band_paths)
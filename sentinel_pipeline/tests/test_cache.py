@@ -0,0 +1,116 @@
+"""Tests for the on-disk band window cache."""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.cache import BandCache
+
+
+def entry_files(cache):
+    """All files under the cache directory."""
+    return [
+        os.path.join(root, name)
+        for root, _, files in os.walk(cache.directory)
+        for name in files
+    ]
+
+
+class TestBandCache:
+    """Test cases for BandCache."""
+
+    def test_round_trip(self, tmp_path):
+        """Test arrays and metadata round trip and count hits/misses."""
+        cache = BandCache(str(tmp_path))
+        array = np.arange(100, dtype=np.uint16).reshape(10, 10)
+        key = cache.key("LC08_X", "red", [0, 0, 10, 10], None)
+
+        assert cache.get(key) is None
+        cache.put(key, array)
+        cache.put_json(key, {"shape": [10, 10]})
+
+        np.testing.assert_array_equal(cache.get(key), array)
+        assert cache.get_json(key) == {"shape": [10, 10]}
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_key_is_canonical(self):
+        """Test keys depend only on the request contents."""
+        assert BandCache.key("a", {"x": 1, "y": 2}) == BandCache.key(
+            "a", {"y": 2, "x": 1}
+        )
+        assert BandCache.key("a", 1) != BandCache.key("a", 2)
+
+    def test_lru_eviction(self, tmp_path):
+        """Test the least recently used entries are evicted first."""
+        array = np.random.default_rng(0).integers(0, 60000, 5000, dtype=np.uint16)
+        probe = BandCache(str(tmp_path / "probe"))
+        probe.put("probe", array)
+        entry_size = probe.size_bytes
+
+        cache = BandCache(str(tmp_path / "cache"), max_bytes=int(entry_size * 3.5))
+        for i, key in enumerate(("a", "b", "c")):
+            cache.put(key, array)
+            os.utime(cache._path(key, ".npz"), (1000 + i, 1000 + i))
+        assert cache.get("a") is not None  # "a" becomes most recent
+
+        cache.put("d", array)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("d") is not None
+        assert cache.size_bytes <= cache.max_bytes
+
+    def test_replacing_a_key_keeps_size(self, tmp_path):
+        """Test re-putting a key does not count its old bytes twice."""
+        cache = BandCache(str(tmp_path))
+        array = np.random.default_rng(1).integers(0, 60000, 5000, dtype=np.uint16)
+
+        for _ in range(5):
+            cache.put("k", array)
+            cache.put_json("k", {"shape": [5000]})
+
+        on_disk = sum(os.path.getsize(path) for path in entry_files(cache))
+        assert cache.size_bytes == on_disk
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test a new instance sees entries and their size."""
+        BandCache(str(tmp_path)).put("k", np.ones(10))
+
+        reopened = BandCache(str(tmp_path))
+
+        assert reopened.size_bytes > 0
+        np.testing.assert_array_equal(reopened.get("k"), np.ones(10))
+
+    def test_concurrent_writers(self, tmp_path):
+        """Test concurrent puts of one key leave a single complete entry."""
+        cache = BandCache(str(tmp_path))
+        array = np.arange(10000, dtype=np.float32)
+
+        threads = [
+            threading.Thread(target=cache.put, args=("same", array)) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [f for f in entry_files(cache) if f.endswith(".tmp")] == []
+        np.testing.assert_array_equal(cache.get("same"), array)
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Test unreadable entries are dropped and treated as misses."""
+        cache = BandCache(str(tmp_path))
+        cache.put("k", np.ones(3))
+        with open(cache._path("k", ".npz"), "wb") as f:
+            f.write(b"not an npz")
+
+        assert cache.get("k") is None
+        assert not os.path.exists(cache._path("k", ".npz"))
+
+    def test_invalid_size(self, tmp_path):
+        """Test a non-positive size bound is rejected."""
+        with pytest.raises(ValueError):
+            BandCache(str(tmp_path), max_bytes=0)
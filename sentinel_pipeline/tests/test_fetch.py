@@ -1,29 +1,233 @@
 """Tests for the fetch module."""
 
+import functools
+import http.server
+import multiprocessing
+import os
+
+import numpy as np
 import pytest
 
-from sentinel_pipeline.fetch import fetch_data, validate_source
+from sentinel_pipeline import fetch
+from sentinel_pipeline.cache import BandCache
+from sentinel_pipeline.fetch import (
+    SOURCE_BACKENDS,
+    COGDirectorySource,
+    SourceCapabilities,
+    STACSource,
+    SyntheticSource,
+    fetch_data,
+    get_source,
+    read_bands,
+    register_source,
+    validate_source,
+)
+
+rasterio = pytest.importorskip("rasterio")
+from rasterio.transform import from_origin  # noqa: E402
+
+
+def write_band(path, data, resolution, origin=(500000.0, 5400000.0)):
+    """Write a single-band tiled GeoTIFF in UTM zone 10N."""
+    profile = {
+        "driver": "GTiff",
+        "height": data.shape[0],
+        "width": data.shape[1],
+        "count": 1,
+        "dtype": data.dtype,
+        "crs": "EPSG:32610",
+        "transform": from_origin(*origin, resolution, resolution),
+        "tiled": True,
+        "blockxsize": 16,
+        "blockysize": 16,
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data, 1)
+
+
+@pytest.fixture
+def band_dir(tmp_path):
+    """10 m red/nir and 20 m swir bands covering the same 640 m square."""
+    fine = np.arange(64 * 64, dtype=np.uint16).reshape(64, 64)
+    coarse = np.arange(32 * 32, dtype=np.uint16).reshape(32, 32)
+    write_band(tmp_path / "red.tif", fine, 10.0)
+    write_band(tmp_path / "nir.tif", fine + 1, 10.0)
+    write_band(tmp_path / "swir.tif", coarse, 20.0)
+    return tmp_path
+
+
+class RangeHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler with single-range GET support, as COG reads need."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        path = self.translate_path(self.path)
+        if not header or not os.path.isfile(path):
+            return super().do_GET()
+        with open(path, "rb") as f:
+            data = f.read()
+        start, _, end = header.replace("bytes=", "").partition("-")
+        start, end = int(start), min(int(end or len(data) - 1), len(data) - 1)
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(data[start : end + 1])
+
+
+def serve_directory(directory, ports):
+    """Serve ``directory`` and report the bound port through ``ports``."""
+    handler = functools.partial(RangeHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+@pytest.fixture
+def http_base(band_dir):
+    """Serve ``band_dir`` over HTTP from a separate process.
+
+    GDAL holds the GIL while opening a dataset, so an in-process server
+    thread could never answer its requests.
+    """
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve_directory, args=(str(band_dir), ports), daemon=True
+    )
+    process.start()
+    yield f"http://127.0.0.1:{ports.get(timeout=10)}"
+    process.terminate()
+    process.join()
 
 
 class TestFetchData:
     """Test cases for fetch_data function."""
 
-    def test_fetch_data_not_implemented(self):
-        """Test that fetch_data raises NotImplementedError."""
-        with pytest.raises(NotImplementedError):
-            fetch_data("test_source")
+    def test_fetch_full_extent(self, band_dir):
+        """Test all bands are returned on the reference grid."""
+        result = fetch_data(str(band_dir), bands=["red", "nir", "swir"])
+
+        assert result["shape"] == (64, 64)
+        assert set(result["bands"]) == {"red", "nir", "swir"}
+        assert all(band.shape == (64, 64) for band in result["bands"].values())
+        np.testing.assert_array_equal(
+            result["bands"]["nir"], result["bands"]["red"] + 1
+        )
+
+    def test_fetch_bbox_window(self, band_dir):
+        """Test a bbox reads the matching window from every band."""
+        bbox = (500100.0, 5399700.0, 500300.0, 5399900.0)
+
+        result = fetch_data(str(band_dir), bands=["red", "swir"], bbox=bbox)
+
+        # Rows 10-30, cols 10-30 of the 10 m grid
+        assert result["shape"] == (20, 20)
+        red = result["bands"]["red"]
+        assert red[0, 0] == 10 * 64 + 10
+        # The 20 m band is upsampled: each coarse pixel covers 2x2 fine pixels
+        swir = result["bands"]["swir"]
+        assert swir[0, 0] == swir[1, 1] == 5 * 32 + 5
+        assert result["bounds"] == pytest.approx(bbox)
+
+    def test_fetch_reference_band_sets_grid(self, band_dir):
+        """Test choosing a coarse reference band downsamples finer bands."""
+        result = fetch_data(str(band_dir), bands=["red", "swir"], reference="swir")
+
+        assert result["shape"] == (32, 32)
+        assert result["resolution"] == (20.0, 20.0)
+
+    def test_fetch_over_http(self, band_dir, http_base):
+        """Test COGs served over HTTP read the same as local files."""
+        local = fetch_data(str(band_dir), bands=["red", "swir"])
+        remote = fetch_data(http_base, bands=["red", "swir"])
+
+        for name in ("red", "swir"):
+            np.testing.assert_array_equal(remote["bands"][name], local["bands"][name])
+
+    def test_fetch_retries_transient_errors(self, band_dir, monkeypatch):
+        """Test a band read is retried after a transient failure."""
+        original = fetch._read_band
+        calls = {"n": 0}
+
+        def flaky(href, grid, resampling, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise OSError("connection reset")
+            return original(href, grid, resampling, **kwargs)
+
+        monkeypatch.setattr(fetch, "_read_band", flaky)
+
+        result = fetch_data(str(band_dir), bands=["red"], retry_delay=0)
+
+        assert calls["n"] == 2
+        assert result["bands"]["red"].shape == (64, 64)
+
+    def test_fetch_missing_band_raises(self, band_dir):
+        """Test bands that cannot be read raise OSError after retries."""
+        with pytest.raises(OSError, match="after 2 attempts"):
+            read_bands(
+                {"red": str(band_dir / "red.tif"), "blue": str(band_dir / "x.tif")},
+                retries=2,
+                retry_delay=0,
+            )
 
-    def test_fetch_data_with_kwargs(self):
-        """Test fetch_data with additional keyword arguments."""
-        with pytest.raises(NotImplementedError):
-            fetch_data("test_source", param1="value1", param2="value2")
+    def test_fetch_overview_level(self, tmp_path):
+        """Test reading from an overview returns the reduced grid."""
+        data = np.arange(128 * 128, dtype=np.uint16).reshape(128, 128)
+        write_band(tmp_path / "red.tif", data, 10.0)
+        with rasterio.open(tmp_path / "red.tif", "r+") as dst:
+            dst.build_overviews([2, 4])
+
+        result = fetch_data(str(tmp_path), bands=["red"], overview_level=0)
+
+        assert result["shape"] == (64, 64)
+        assert result["resolution"] == (20.0, 20.0)
+
+    def test_cached_fetch_skips_io(self, band_dir, tmp_path, monkeypatch):
+        """Test a repeated window is served from the cache without I/O."""
+        cache = BandCache(str(tmp_path / "cache"))
+        bbox = (500100.0, 5399700.0, 500300.0, 5399900.0)
+        first = fetch_data(str(band_dir), bands=["red", "swir"], bbox=bbox, cache=cache)
+
+        def no_io(*args, **kwargs):
+            raise AssertionError("raster opened on a warm cache")
+
+        monkeypatch.setattr(fetch, "_open", no_io)
+        second = fetch_data(
+            str(band_dir), bands=["red", "swir"], bbox=bbox, cache=cache
+        )
+
+        for name in ("red", "swir"):
+            np.testing.assert_array_equal(second["bands"][name], first["bands"][name])
+        assert second["transform"] == first["transform"]
+        assert second["crs"] == first["crs"]
+        assert cache.hits == 3
+
+    def test_cache_ignores_signing_tokens(self, band_dir, tmp_path):
+        """Test hrefs differing only in their query string share entries."""
+        cache = BandCache(str(tmp_path / "cache"))
+        href = str(band_dir / "red.tif")
+        read_bands({"red": href}, cache=cache)
+        misses = cache.misses
+
+        assert fetch._band_identity(href + "?sig=abc", "red", None) == href
+        read_bands({"red": href}, cache=cache)
+        assert cache.misses == misses
+
+    def test_fetch_data_requires_bands(self):
+        """Test fetch_data without bands raises ValueError."""
+        with pytest.raises(ValueError, match="bands"):
+            fetch_data("test_source")
 
 
 class TestValidateSource:
     """Test cases for validate_source function."""
 
     def test_validate_source_returns_false(self):
-        """Test that validate_source returns False by default."""
+        """Test that unknown sources are rejected."""
         result = validate_source("test_source")
         assert result is False
 
@@ -31,3 +235,90 @@ class TestValidateSource:
         """Test validate_source with empty string."""
         result = validate_source("")
         assert result is False
+
+    def test_validate_known_sources(self, band_dir):
+        """Test directories, URLs and registered backends are accepted."""
+        assert validate_source(str(band_dir))
+        assert validate_source(f"cog:{band_dir}")
+        assert validate_source("https://example.com/scene")
+        assert validate_source("stac")
+        assert validate_source("synthetic:")
+        assert not validate_source("stac:ftp://example.com")
+
+
+class TestSourceRegistry:
+    """Test cases for source backends and their capabilities."""
+
+    def test_get_source_dispatch(self, band_dir):
+        """Test source strings resolve to the right backends."""
+        assert isinstance(get_source(str(band_dir)), COGDirectorySource)
+        assert isinstance(get_source("stac:https://example.com/v1"), STACSource)
+        assert get_source("stac").location.startswith("https://planetarycomputer")
+        assert isinstance(get_source("synthetic"), SyntheticSource)
+
+    def test_capabilities_declared(self, band_dir):
+        """Test every backend declares capabilities."""
+        local = get_source(str(band_dir)).capabilities
+        remote = get_source("https://example.com/scene").capabilities
+
+        assert isinstance(local, SourceCapabilities)
+        assert local.windowed_reads and not local.remote
+        assert remote.remote and remote.max_concurrency <= local.max_concurrency
+        assert not SyntheticSource.capabilities.overviews
+
+    def test_fetch_reports_capabilities(self, band_dir):
+        """Test fetch_data caps concurrency and reports capabilities."""
+        result = fetch_data(str(band_dir), bands=["red"], max_workers=100)
+
+        assert result["capabilities"]["remote"] is False
+        assert result["source"] == str(band_dir)
+
+    def test_synthetic_windows_consistent(self):
+        """Test synthetic windows equal the same window of a full read."""
+        full = fetch_data("synthetic", bands=["red", "nir"])
+        bbox = (500100.0, 5399500.0, 500400.0, 5399900.0)
+
+        window = fetch_data("synthetic", bands=["red", "nir"], bbox=bbox)
+
+        assert window["shape"] == (40, 30)
+        for name in ("red", "nir"):
+            np.testing.assert_array_equal(
+                window["bands"][name], full["bands"][name][10:50, 10:40]
+            )
+        assert not np.array_equal(full["bands"]["red"], full["bands"]["nir"])
+
+    def test_stac_item_roles(self, band_dir):
+        """Test STAC items map sensor band roles to assets."""
+        item = {
+            "id": "LC08_TEST",
+            "properties": {"platform": "landsat-8"},
+            "assets": {
+                "red": {"href": str(band_dir / "red.tif")},
+                "nir08": {"href": str(band_dir / "nir.tif")},
+            },
+        }
+
+        result = fetch_data("stac", bands=["red", "nir"], item=item)
+
+        assert result["item_id"] == "LC08_TEST"
+        np.testing.assert_array_equal(
+            result["bands"]["nir"], result["bands"]["red"] + 1
+        )
+        with pytest.raises(ValueError, match="no assets"):
+            fetch_data("stac", bands=["swir"], item=item)
+
+    def test_register_custom_backend(self, monkeypatch):
+        """Test third-party backends can be registered."""
+
+        class ZeroSource(SyntheticSource):
+            name = "zeros"
+
+            def _band(self, name, rows, cols):
+                return np.zeros((len(rows), len(cols)), dtype=np.uint16)
+
+        monkeypatch.setitem(SOURCE_BACKENDS, "zeros", SOURCE_BACKENDS["synthetic"])
+        register_source("zeros", ZeroSource)
+
+        result = fetch_data("zeros:", bands=["red"])
+
+        assert not result["bands"]["red"].any()
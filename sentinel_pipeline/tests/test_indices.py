@@ -9,12 +9,22 @@ Tests cover:
 - Vectorization performance
 """
 
+import tracemalloc
 import warnings
 
 import numpy as np
 import pytest
 
-from sentinel_pipeline.indices import fai, ndre, validate_spectral_index
+from sentinel_pipeline.indices import (
+    FLOAT32_ATOL,
+    LANDSAT_C2_L2_SCALING,
+    SENTINEL2_L2A_SCALING,
+    compute_indices,
+    fai,
+    indices_from_dn,
+    ndre,
+    validate_spectral_index,
+)
 
 
 class TestFAI:
@@ -300,6 +310,295 @@ class TestNDRE:
         assert np.all(np.abs(result) <= 1.0)
 
 
+class TestComputeIndices:
+    """Tests for the fused single-pass index engine."""
+
+    @pytest.fixture
+    def bands(self):
+        """Random reflectance bands with a few invalid pixels."""
+        rng = np.random.default_rng(0)
+        shape = (37, 23)
+        red = rng.uniform(0.02, 0.4, shape)
+        red_edge = rng.uniform(0.05, 0.4, shape)
+        nir = rng.uniform(0.1, 0.7, shape)
+        swir = rng.uniform(0.01, 0.3, shape)
+        red[0, 0] = np.nan
+        red_edge[1, 1] = -0.1
+        nir[2, 2] = 1.5
+        swir[3, 3] = np.inf
+        return red, red_edge, nir, swir
+
+    def test_matches_separate_functions(self, bands):
+        """Test fused results equal fai() and ndre() computed separately."""
+        red, red_edge, nir, swir = bands
+
+        result = compute_indices(red, red_edge, nir, swir)
+
+        np.testing.assert_array_equal(result.fai, fai(nir, swir, red))
+        np.testing.assert_array_equal(result.ndre, ndre(red_edge, nir))
+        expected_valid = np.isfinite(result.fai) & np.isfinite(result.ndre)
+        np.testing.assert_array_equal(result.valid, expected_valid)
+        assert not result.valid[0, 0]
+        assert not result.valid[1, 1]
+        assert not result.valid[2, 2]
+        assert not result.valid[3, 3]
+        assert result.valid.sum() == result.valid.size - 4
+
+    def test_chunk_size_does_not_change_result(self, bands):
+        """Test that tiny chunks give identical results to one chunk."""
+        whole = compute_indices(*bands, chunk_pixels=10**9)
+        chunked = compute_indices(*bands, chunk_pixels=7)
+
+        for a, b in zip(whole, chunked):
+            np.testing.assert_array_equal(a, b)
+
+    def test_writes_into_preallocated_buffers(self, bands):
+        """Test that results are written into caller-provided buffers."""
+        shape = bands[0].shape
+        buffers = (
+            np.empty(shape, dtype=np.float64),
+            np.empty(shape, dtype=np.float64),
+            np.empty(shape, dtype=bool),
+        )
+
+        result = compute_indices(*bands, out=buffers)
+
+        for returned, provided in zip(result, buffers):
+            assert returned is provided
+
+    def test_fai_ndre_out_parameter(self, bands):
+        """Test the out parameter of fai() and ndre()."""
+        red, red_edge, nir, swir = bands
+        buffer = np.empty(red.shape)
+
+        assert fai(nir, swir, red, out=buffer) is buffer
+        assert ndre(red_edge, nir, out=buffer) is buffer
+
+    def test_out_validation(self, bands):
+        """Test that unusable output buffers are rejected."""
+        red, red_edge, nir, swir = bands
+
+        with pytest.raises(ValueError, match="shape"):
+            fai(nir, swir, red, out=np.empty((2, 2)))
+        with pytest.raises(ValueError, match="dtype"):
+            ndre(red_edge, nir, out=np.empty(red.shape, dtype=np.int32))
+        with pytest.raises(ValueError, match="overlap"):
+            fai(nir, swir, red, out=nir)
+
+    def test_non_contiguous_and_scalar_inputs(self, bands):
+        """Test strided views and 0-d inputs are handled."""
+        red, red_edge, nir, swir = (band[::2, ::3] for band in bands)
+        result = compute_indices(red, red_edge, nir, swir, chunk_pixels=5)
+        np.testing.assert_array_equal(result.fai, fai(nir, swir, red))
+
+        scalar = compute_indices(0.1, 0.15, 0.3, 0.05)
+        assert scalar.fai.shape == ()
+        assert bool(scalar.valid)
+
+    def test_shape_mismatch_error(self, bands):
+        """Test that mismatched band shapes raise ValueError."""
+        red, red_edge, nir, swir = bands
+        with pytest.raises(ValueError, match="same shape"):
+            compute_indices(red, red_edge, nir, swir[:-1])
+
+    def test_no_runtime_warnings(self, bands):
+        """Test zero sums and NaN/inf inputs do not emit RuntimeWarning."""
+        red, red_edge, nir, swir = bands
+        red_edge[4, 4] = nir[4, 4] = 0.0
+        nir[5, 5], red_edge[5, 5] = np.inf, -np.inf
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            result = compute_indices(red, red_edge, nir, swir)
+            fai(nir, swir, red)
+            ndre(red_edge, nir, mask_invalid=False)
+
+        assert np.isnan(result.ndre[4, 4]) and np.isnan(result.ndre[5, 5])
+
+    def test_bounded_scratch_memory(self):
+        """Test that scratch memory stays well below one band's size."""
+        shape = (2000, 1000)
+        rng = np.random.default_rng(1)
+        bands = [rng.uniform(0.01, 0.5, shape) for _ in range(4)]
+        out = (np.empty(shape), np.empty(shape), np.empty(shape, dtype=bool))
+        band_bytes = bands[0].nbytes
+
+        tracemalloc.start()
+        try:
+            compute_indices(*bands, out=out)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < band_bytes / 2
+
+
+class TestComputeDtype:
+    """Tests for float32 / input-preserving compute dtypes."""
+
+    @pytest.fixture
+    def bands(self):
+        """Realistic reflectance bands in float64, with invalid pixels."""
+        rng = np.random.default_rng(7)
+        shape = (64, 48)
+        red = rng.uniform(0.0, 0.4, shape)
+        red_edge = rng.uniform(0.0, 0.5, shape)
+        nir = rng.uniform(0.0, 0.9, shape)
+        swir = rng.uniform(0.0, 0.3, shape)
+        red[5, 5] = np.nan
+        nir[6, 6] = 1.2
+        red_edge[7, 7] = 0.0
+        nir[7, 7] = 0.0
+        return red, red_edge, nir, swir
+
+    def test_float32_inputs_preserve_dtype(self, bands):
+        """Test float32 inputs compute and return float32."""
+        red, red_edge, nir, swir = (band.astype(np.float32) for band in bands)
+
+        assert fai(nir, swir, red).dtype == np.float32
+        assert ndre(red_edge, nir).dtype == np.float32
+        result = compute_indices(red, red_edge, nir, swir)
+        assert result.fai.dtype == np.float32
+        assert result.ndre.dtype == np.float32
+
+    def test_integer_inputs_default_to_float64(self):
+        """Test integer inputs compute in float64."""
+        result = fai(np.array([1]), np.array([0]), np.array([0]))
+        assert result.dtype == np.float64
+
+    def test_float32_parity_with_float64(self, bands):
+        """Test float32 results match float64 within FLOAT32_ATOL."""
+        red, red_edge, nir, swir = bands
+
+        ref = compute_indices(red, red_edge, nir, swir, dtype=np.float64)
+        f32 = compute_indices(red, red_edge, nir, swir, dtype=np.float32)
+
+        np.testing.assert_array_equal(f32.valid, ref.valid)
+        np.testing.assert_allclose(f32.fai, ref.fai, rtol=0, atol=FLOAT32_ATOL)
+        np.testing.assert_allclose(f32.ndre, ref.ndre, rtol=0, atol=FLOAT32_ATOL)
+
+        np.testing.assert_allclose(
+            fai(nir, swir, red, dtype=np.float32), ref.fai, rtol=0, atol=FLOAT32_ATOL
+        )
+        np.testing.assert_allclose(
+            ndre(red_edge, nir, dtype=np.float32), ref.ndre, rtol=0, atol=FLOAT32_ATOL
+        )
+
+    def test_out_buffer_sets_dtype(self, bands):
+        """Test that a float32 out buffer selects float32 computation."""
+        red, _, nir, swir = bands
+        buffer = np.empty(red.shape, dtype=np.float32)
+
+        assert fai(nir, swir, red, out=buffer) is buffer
+
+    def test_non_float_dtype_rejected(self, bands):
+        """Test that integer compute dtypes raise ValueError."""
+        red, red_edge, nir, swir = bands
+        with pytest.raises(ValueError, match="floating point"):
+            compute_indices(red, red_edge, nir, swir, dtype=np.int16)
+
+
+class TestIndicesFromDN:
+    """Tests for the scaled-integer (DN) input path."""
+
+    @pytest.fixture
+    def landsat_dn(self):
+        """Landsat C2 L2 style uint16 DNs with a nodata pixel."""
+        rng = np.random.default_rng(3)
+        shape = (40, 30)
+        # DNs spanning roughly 0.0-0.6 reflectance after scaling
+        bands = [rng.integers(7273, 29091, shape, dtype=np.uint16) for _ in range(4)]
+        bands[2][0, 0] = 0
+        return bands
+
+    def test_landsat_matches_float_reflectance(self, landsat_dn):
+        """Test DN path matches indices computed on float reflectance."""
+        scale, offset, _ = LANDSAT_C2_L2_SCALING
+        reflectance = [band * scale + offset for band in landsat_dn]
+        reflectance[2][0, 0] = np.nan
+
+        expected = compute_indices(*reflectance)
+        result = indices_from_dn(*landsat_dn, *LANDSAT_C2_L2_SCALING)
+
+        assert result.fai.dtype == np.float32
+        np.testing.assert_array_equal(result.valid, expected.valid)
+        np.testing.assert_allclose(result.fai, expected.fai, rtol=0, atol=FLOAT32_ATOL)
+        np.testing.assert_allclose(
+            result.ndre, expected.ndre, rtol=0, atol=FLOAT32_ATOL
+        )
+
+    def test_nodata_pixels_invalid(self, landsat_dn):
+        """Test nodata DNs are NaN even without range masking."""
+        result = indices_from_dn(
+            *landsat_dn, *LANDSAT_C2_L2_SCALING, mask_invalid=False
+        )
+
+        assert not result.valid[0, 0]
+        assert np.isnan(result.fai[0, 0])
+        assert np.isnan(result.ndre[0, 0])
+        assert result.valid.sum() == result.valid.size - 1
+
+    def test_scaling_from_sensor(self, landsat_dn):
+        """Test an omitted scale uses the sensor's DN scaling."""
+        explicit = indices_from_dn(
+            *landsat_dn, *LANDSAT_C2_L2_SCALING, sensor="landsat-8"
+        )
+        result = indices_from_dn(*landsat_dn, sensor="landsat-8")
+        mixed = indices_from_dn(*landsat_dn, sensor=["L8", "L9"] * 20)
+
+        np.testing.assert_array_equal(result.fai, explicit.fai)
+        np.testing.assert_array_equal(result.valid, explicit.valid)
+        assert mixed.valid.sum() == explicit.valid.sum()
+        with pytest.raises(ValueError):
+            indices_from_dn(*landsat_dn)
+        with pytest.raises(ValueError, match="different DN scalings"):
+            indices_from_dn(*landsat_dn, sensor=["L8", "S2"] * 20)
+
+    def test_sentinel2_scaling(self):
+        """Test Sentinel-2 L2A DNs scale by 1/10000."""
+        red = np.array([1000], dtype=np.uint16)
+        red_edge = np.array([1500], dtype=np.uint16)
+        nir = np.array([3000], dtype=np.uint16)
+        swir = np.array([500], dtype=np.uint16)
+
+        result = indices_from_dn(
+            red, red_edge, nir, swir, *SENTINEL2_L2A_SCALING, dtype=np.float64
+        )
+
+        np.testing.assert_allclose(result.fai, fai([0.3], [0.05], [0.1]))
+        np.testing.assert_allclose(result.ndre, ndre([0.15], [0.3]))
+
+    def test_out_buffer_dtype_used(self, landsat_dn):
+        """Test float64 out buffers select float64 computation."""
+        shape = landsat_dn[0].shape
+        out = (np.empty(shape), np.empty(shape), np.empty(shape, dtype=bool))
+
+        result = indices_from_dn(*landsat_dn, *LANDSAT_C2_L2_SCALING, out=out)
+
+        assert result.fai is out[0]
+
+    def test_no_float_copy_of_bands(self):
+        """Test scratch memory stays below one float32 band."""
+        shape = (4000, 1000)
+        rng = np.random.default_rng(4)
+        bands = [rng.integers(1, 10000, shape, dtype=np.uint16) for _ in range(4)]
+        out = (
+            np.empty(shape, dtype=np.float32),
+            np.empty(shape, dtype=np.float32),
+            np.empty(shape, dtype=bool),
+        )
+        float_band_bytes = bands[0].size * 4
+
+        tracemalloc.start()
+        try:
+            indices_from_dn(*bands, *SENTINEL2_L2A_SCALING, out=out)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < float_band_bytes / 2
+
+
 class TestValidateSpectralIndex:
     """Tests for spectral index validation function."""
 
@@ -0,0 +1,125 @@
+"""Tests for summed-area tables."""
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.integral import IndexTables, SummedAreaTable
+
+
+@pytest.fixture
+def raster():
+    """Index raster with NaNs and a valid mask."""
+    rng = np.random.default_rng(7)
+    values = rng.normal(0.05, 0.02, (60, 80))
+    values[5:10, 5:10] = np.nan
+    valid = rng.random((60, 80)) > 0.2
+    return values, valid
+
+
+class TestSummedAreaTable:
+    """Test cases for SummedAreaTable."""
+
+    def test_window_matches_direct(self, raster):
+        """Test window statistics equal those of the selected pixels."""
+        values, valid = raster
+        table = SummedAreaTable.from_values(values, valid)
+
+        result = table.window_statistics(3, 40, 2, 71)
+
+        window = values[3:40, 2:71][valid[3:40, 2:71]]
+        window = window[np.isfinite(window)]
+        assert result["count"] == window.size
+        assert result["mean"] == pytest.approx(window.mean(), rel=1e-12)
+        assert result["variance"] == pytest.approx(window.var(), rel=1e-9)
+
+    def test_vectorized_windows(self, raster):
+        """Test many rectangles are answered in one call."""
+        values, valid = raster
+        table = SummedAreaTable.from_values(values, valid)
+        starts = np.array([0, 10, 20])
+
+        result = table.window_statistics(starts, starts + 15, starts, starts + 30)
+
+        for i, start in enumerate(starts):
+            single = table.window_statistics(start, start + 15, start, start + 30)
+            assert result["count"][i] == single["count"]
+            assert result["mean"][i] == pytest.approx(single["mean"])
+
+    def test_empty_and_clipped_windows(self, raster):
+        """Test windows outside the raster are clipped or empty."""
+        values, _ = raster
+        table = SummedAreaTable.from_values(values)
+
+        clipped = table.window_statistics(-10, 100, -10, 100)
+        empty = table.window_statistics(70, 90, 0, 10)
+
+        assert clipped["count"] == np.isfinite(values).sum()
+        assert empty["count"] == 0
+        assert np.isnan(empty["mean"])
+
+    def test_precision_with_large_offset(self):
+        """Test variances stay accurate for values far from zero."""
+        rng = np.random.default_rng(0)
+        values = 1000.0 + rng.normal(0, 1e-3, (500, 500))
+        table = SummedAreaTable.from_values(values)
+
+        result = table.window_statistics(0, 500, 0, 500)
+
+        assert result["variance"] == pytest.approx(values.var(), rel=1e-6)
+
+
+class TestIndexTables:
+    """Test cases for IndexTables."""
+
+    def test_bbox_query(self, raster):
+        """Test map rectangles select pixels whose centers they contain."""
+        values, valid = raster
+        transform = (30.0, 0.0, 470000.0, 0.0, -30.0, 5365000.0)
+        tables = IndexTables.from_indices(
+            {"fai": values, "ndre": values * 2}, transform, "EPSG:32610", valid
+        )
+
+        # Columns 10-20, rows 5-15
+        result = tables.query((470300.0, 5364550.0, 470600.0, 5364850.0))
+
+        window = values[5:15, 10:20][valid[5:15, 10:20]]
+        window = window[np.isfinite(window)]
+        assert tables.window((470300.0, 5364550.0, 470600.0, 5364850.0)) == (
+            5,
+            15,
+            10,
+            20,
+        )
+        assert result["fai"]["count"] == window.size
+        assert result["ndre"]["mean"] == pytest.approx(2 * window.mean())
+
+    def test_covers(self, raster):
+        """Test rectangles reaching past the grid are not covered."""
+        values, _ = raster
+        transform = (30.0, 0.0, 0.0, 0.0, -30.0, 0.0)
+        tables = IndexTables.from_indices({"fai": values}, transform)
+
+        assert tables.covers((300.0, -900.0, 600.0, -300.0))
+        assert not tables.covers((-300.0, -900.0, 600.0, -300.0))
+        assert not tables.covers((300.0, -2000.0, 600.0, -300.0))
+
+    def test_save_load_round_trip(self, raster, tmp_path):
+        """Test persisted tables answer queries identically."""
+        values, valid = raster
+        transform = (30.0, 0.0, 0.0, 0.0, -30.0, 0.0)
+        tables = IndexTables.from_indices({"fai": values}, transform, None, valid)
+        path = str(tmp_path / "scene.npz")
+
+        tables.save(path)
+        loaded = IndexTables.load(path)
+
+        assert loaded.crs is None
+        assert loaded.transform == tables.transform
+        bbox = (100.0, -900.0, 1500.0, -200.0)
+        assert loaded.query(bbox) == tables.query(bbox)
+
+    def test_rotated_grid_rejected(self):
+        """Test rotated transforms raise ValueError."""
+        table = SummedAreaTable.from_values(np.zeros((2, 2)))
+        with pytest.raises(ValueError):
+            IndexTables({"fai": table}, (1.0, 0.5, 0.0, 0.0, -1.0, 0.0))
@@ -1,12 +1,22 @@
 """Tests for the mask module."""
 
-from datetime import datetime
+import subprocess
+import sys
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
 import numpy as np
 import pytest
 
-from sentinel_pipeline.mask import apply_cloud_mask, filter_by_tide
+from sentinel_pipeline.mask import (
+    apply_cloud_mask,
+    buffer_mask,
+    cloud_mask,
+    decode_qa_flags,
+    filter_by_tide,
+    filter_by_tide_many,
+)
+from sentinel_pipeline.tides import TideSeries
 
 
 class TestApplyCloudMask:
@@ -21,7 +31,9 @@ class TestApplyCloudMask:
 
         assert result.shape == img.shape
         assert isinstance(result, np.ndarray)
-        np.testing.assert_array_equal(result, img)  # Placeholder returns copy
+        np.testing.assert_array_equal(result.data, img)
+        expected = (qa & 0b111111) != 0  # fill, dilated cloud ... snow
+        np.testing.assert_array_equal(result.mask[..., 0], expected)
 
     def test_apply_cloud_mask_different_shapes(self):
         """Test cloud mask with incompatible array shapes."""
@@ -41,6 +53,211 @@ class TestApplyCloudMask:
         assert result.shape == img.shape
         assert result.dtype == img.dtype
 
+    def test_apply_cloud_mask_is_a_view(self):
+        """Test the default result shares memory with the image."""
+        img = np.random.rand(30, 40, 4)
+        qa = np.zeros((30, 40), dtype=np.uint16)
+        qa[5, 7] = 1 << 3  # cloud
+
+        result = apply_cloud_mask(img, qa)
+
+        assert np.shares_memory(result.data, img)
+        assert result.mask[5, 7].all()
+        assert result.mask.sum() == 4
+        assert np.isnan(result.filled(np.nan)[5, 7]).all()
+
+    def test_apply_cloud_mask_is_writable(self):
+        """Test values and mask entries of the result can be assigned."""
+        img = np.random.rand(30, 40, 4)
+        qa = np.zeros((30, 40), dtype=np.uint16)
+        qa[:10, :] = 1 << 3  # cloud
+
+        result = apply_cloud_mask(img, qa)
+        result[20, 20, 0] = 5.0
+        result[25, 25, 1] = np.ma.masked
+
+        assert img[20, 20, 0] == 5.0
+        assert result.mask[25, 25, 1] and not result.mask[25, 25, 0]
+        assert result.mask[0, 0].all()
+
+    def test_apply_cloud_mask_in_place(self):
+        """Test in-place masking overwrites masked pixels in every band."""
+        img = np.ones((20, 20, 3), dtype=np.float32)
+        qa = np.zeros((20, 20), dtype=np.uint16)
+        qa[:2] = 1 << 4  # cloud shadow
+
+        result = apply_cloud_mask(img, qa, in_place=True)
+
+        assert result is img
+        assert np.isnan(img[:2]).all()
+        assert np.all(img[2:] == 1)
+
+    def test_apply_cloud_mask_in_place_integer(self):
+        """Test integer images are filled with 0 or a given fill value."""
+        img = np.full((4, 4), 500, dtype=np.uint16)
+        qa = np.zeros((4, 4), dtype=np.uint16)
+        qa[0, 0] = 1  # fill
+
+        apply_cloud_mask(img, qa, in_place=True)
+        assert img[0, 0] == 0
+
+        qa[0, 1] = 1 << 2  # cirrus
+        apply_cloud_mask(img, qa, in_place=True, fill_value=65535)
+        assert img[0, 1] == 65535
+
+    def test_landsat_flag_selection(self):
+        """Test configurable Landsat flag sets."""
+        qa = np.array([[1 << 7, 1 << 3], [1 << 5, 1 << 6]], dtype=np.uint16)
+
+        default = cloud_mask(qa)
+        water = cloud_mask(qa, flags=["water"])
+
+        np.testing.assert_array_equal(default, [[False, True], [True, False]])
+        np.testing.assert_array_equal(water, [[True, False], [False, False]])
+
+    def test_scl_lookup(self):
+        """Test Sentinel-2 SCL classes are masked through the lookup table."""
+        scl = np.arange(12, dtype=np.uint8).reshape(3, 4)
+
+        mask = cloud_mask(scl, "scl")
+        cirrus = cloud_mask(scl, "scl", flags=["cirrus"])
+
+        assert sorted(scl[mask]) == [0, 1, 3, 8, 9, 10, 11]
+        assert scl[cirrus].tolist() == [10]
+
+    def test_decode_qa_flags(self):
+        """Test per-flag decoding matches the individual bits."""
+        qa = np.random.default_rng(0).integers(0, 1 << 16, (50, 60), dtype=np.uint16)
+
+        decoded = decode_qa_flags(qa)
+
+        for flag, bit in (("cloud", 3), ("shadow", 4), ("water", 7)):
+            np.testing.assert_array_equal(decoded[flag], (qa >> bit) & 1 == 1)
+
+    def test_unknown_flag_or_format(self):
+        """Test invalid flags and QA formats raise ValueError."""
+        qa = np.zeros((2, 2), dtype=np.uint16)
+
+        with pytest.raises(ValueError, match="Unknown landsat QA flags"):
+            cloud_mask(qa, flags=["haze"])
+        with pytest.raises(ValueError, match="Unknown QA format"):
+            cloud_mask(qa, "modis")
+
+    @pytest.mark.slow
+    def test_full_scene_benchmark(self):
+        """Test full-scene masking is fast and allocates only the 2-D mask."""
+        import time
+        import tracemalloc
+
+        rng = np.random.default_rng(1)
+        shape = (7800, 7700)  # Landsat scene size
+        qa = rng.integers(0, 1 << 16, shape, dtype=np.uint16)
+        img = np.zeros(shape + (2,), dtype=np.float32)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        apply_cloud_mask(img, qa, in_place=True)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Boolean mask plus one chunk of scratch, no copy of the image
+        assert peak < qa.size + 8 * 2**20
+        assert elapsed < 5.0
+        assert np.isnan(img[..., 1]).mean() == pytest.approx(63 / 64, abs=0.01)
+
+
+class TestBufferMask:
+    """Test cases for cloud/shadow buffer dilation."""
+
+    @pytest.fixture
+    def sparse_mask(self):
+        """Sparse random mask with pixels on the edges."""
+        mask = np.random.default_rng(3).random((120, 90)) < 0.005
+        mask[0, 0] = mask[-1, 45] = True
+        return mask
+
+    @pytest.mark.parametrize("pixels", [0, 1, 4, 9])
+    def test_square_matches_binary_dilation(self, sparse_mask, pixels):
+        """Test the separable square buffer equals scipy binary dilation."""
+        from scipy import ndimage
+
+        structure = np.ones((2 * pixels + 1,) * 2, dtype=bool)
+        expected = ndimage.binary_dilation(sparse_mask, structure)
+
+        np.testing.assert_array_equal(buffer_mask(sparse_mask, pixels), expected)
+
+    def test_disk_matches_distance(self, sparse_mask, monkeypatch):
+        """Test the disk buffer is exact across row-block boundaries."""
+        from scipy import ndimage
+
+        monkeypatch.setattr("sentinel_pipeline.mask._MASK_CHUNK_PIXELS", 90 * 7)
+        expected = ndimage.distance_transform_edt(~sparse_mask) <= 5
+
+        np.testing.assert_array_equal(buffer_mask(sparse_mask, 5, "disk"), expected)
+
+    def test_in_place_output(self, sparse_mask):
+        """Test buffering into the input array."""
+        expected = buffer_mask(sparse_mask, 2)
+        mask = sparse_mask.copy()
+
+        assert buffer_mask(mask, 2, out=mask) is mask
+        np.testing.assert_array_equal(mask, expected)
+
+    def test_buffer_only_grows_cloud_and_shadow(self):
+        """Test buffers apply to cloud/shadow flags but not fill."""
+        qa = np.zeros((20, 20), dtype=np.uint16)
+        qa[5, 5] = 1 << 3  # cloud
+        qa[15, 15] = 1  # fill
+
+        mask = cloud_mask(qa, buffer=2)
+
+        assert mask[3:8, 3:8].all()
+        assert mask.sum() == 25 + 1
+
+    def test_apply_cloud_mask_with_buffer(self):
+        """Test apply_cloud_mask passes the buffer through."""
+        img = np.ones((10, 10, 2))
+        scl = np.full((10, 10), 6, dtype=np.uint8)
+        scl[5, 5] = 9  # high-probability cloud
+
+        result = apply_cloud_mask(img, scl, "scl", buffer=1, buffer_shape="disk")
+
+        assert result.mask[..., 0].sum() == 5
+
+    def test_invalid_buffer(self, sparse_mask):
+        """Test invalid radius and shape raise ValueError."""
+        with pytest.raises(ValueError):
+            buffer_mask(sparse_mask, -1)
+        with pytest.raises(ValueError, match="buffer shape"):
+            buffer_mask(sparse_mask, 1, "hexagon")
+
+    @pytest.mark.slow
+    def test_full_tile_benchmark(self):
+        """Test a full Sentinel-2 tile is buffered in about a second."""
+        import time
+
+        mask = np.random.default_rng(4).random((10980, 10980)) < 0.001
+
+        start = time.perf_counter()
+        buffer_mask(mask, 5, out=mask)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 2.0
+        assert mask.mean() > 0.05
+
+    def test_square_buffer_without_scipy(self):
+        """Test the module and square buffers work when scipy is missing."""
+        code = (
+            "import sys; sys.modules['scipy'] = None\n"
+            "import numpy as np\n"
+            "from sentinel_pipeline.mask import cloud_mask\n"
+            "qa = np.zeros((9, 9), dtype=np.uint16); qa[4, 4] = 1 << 3\n"
+            "assert cloud_mask(qa, 'landsat', buffer=1).sum() == 9\n"
+        )
+
+        subprocess.run([sys.executable, "-c", code], check=True)
+
 
 class TestFilterByTide:
     """Test cases for filter_by_tide function."""
@@ -73,7 +290,7 @@ class TestFilterByTide:
         result = filter_by_tide(scene_datetime, mock_tide_response)
 
         assert isinstance(result, bool)
-        assert result is True  # Placeholder implementation returns True
+        assert result is True  # No height thresholds given
 
     def test_filter_by_tide_missing_data_field(self, mock_invalid_tide_response):
         """Test tide filter with missing data field."""
@@ -89,7 +306,7 @@ class TestFilterByTide:
 
         result = filter_by_tide(scene_datetime, empty_response)
 
-        assert result is True  # Placeholder implementation
+        assert result is True  # Nothing to filter against
 
     @patch("sentinel_pipeline.mask.datetime")
     def test_filter_by_tide_with_mocked_datetime(
@@ -116,6 +333,39 @@ class TestFilterByTide:
             result = filter_by_tide(dt, mock_tide_response)
             assert isinstance(result, bool)
 
+    def test_filter_by_tide_thresholds(self, mock_tide_response):
+        """Test height thresholds against the interpolated tide."""
+        # Halfway between 2.5 m at 12:00 and 0.8 m at 18:30
+        scene_datetime = datetime(2023, 10, 15, 15, 15, 0)
+
+        assert filter_by_tide(scene_datetime, mock_tide_response, max_height=1.7)
+        assert not filter_by_tide(scene_datetime, mock_tide_response, max_height=1.6)
+        assert filter_by_tide(scene_datetime, mock_tide_response, min_height=1.6)
+
+    def test_filter_by_tide_outside_data(self, mock_tide_response):
+        """Test scenes outside the tide data fail height thresholds."""
+        scene_datetime = datetime(2023, 10, 16, 12, 0, 0)
+
+        assert not filter_by_tide(scene_datetime, mock_tide_response, max_height=5)
+
+    def test_filter_by_tide_invalid_entry(self):
+        """Test malformed tide entries raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid tide data"):
+            filter_by_tide(datetime(2023, 10, 15), {"data": [{"height": 1.0}]})
+
+    def test_filter_by_tide_many(self, mock_tide_response):
+        """Test vectorized filtering matches per-scene filtering."""
+        series = TideSeries.from_json(mock_tide_response)
+        scenes = [
+            datetime(2023, 10, 15, 11) + timedelta(minutes=10 * i) for i in range(50)
+        ]
+
+        result = filter_by_tide_many(scenes, series, max_height=1.5)
+
+        expected = [filter_by_tide(t, series, max_height=1.5) for t in scenes]
+        assert result.tolist() == expected
+        assert 0 < result.sum() < len(scenes)
+
 
 class TestMaskIntegration:
     """Integration tests for mask module functions."""
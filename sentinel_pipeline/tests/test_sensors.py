@@ -0,0 +1,100 @@
+"""Tests for the sensor registry and sensor-keyed FAI."""
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.indices import compute_indices, fai, indices_from_dn
+from sentinel_pipeline.sensors import SENSORS, fai_ratios, get_sensor
+
+
+def manual_fai(nir, swir, red, sensor):
+    """Reference FAI from the registry wavelengths."""
+    wl = SENSORS[sensor].wavelengths
+    return nir - (
+        red + (swir - red) * (wl["nir"] - wl["red"]) / (wl["swir"] - wl["red"])
+    )
+
+
+@pytest.fixture
+def bands():
+    """Random reflectance bands for a (3, 40, 30) scene stack."""
+    rng = np.random.default_rng(7)
+    return tuple(rng.uniform(0.01, 0.5, (3, 40, 30)) for _ in range(4))
+
+
+class TestSensorRegistry:
+    """Test cases for sensor lookup."""
+
+    def test_aliases_resolve(self):
+        """Test platform names and product prefixes resolve to registry keys."""
+        assert get_sensor("landsat-8").name == "L8"
+        assert get_sensor("LC09").name == "L9"
+        assert get_sensor("Sentinel-2B").name == "S2B"
+        assert get_sensor(SENSORS["S2A"]) is SENSORS["S2A"]
+
+    def test_unknown_sensor(self):
+        """Test unknown sensors raise KeyError listing known sensors."""
+        with pytest.raises(KeyError, match="L8"):
+            get_sensor("MODIS")
+
+    def test_precomputed_ratios(self):
+        """Test registry ratios match the wavelength formula."""
+        for sensor in SENSORS.values():
+            wl = sensor.wavelengths
+            expected = (wl["nir"] - wl["red"]) / (wl["swir"] - wl["red"])
+            assert sensor.fai_ratio == pytest.approx(expected)
+        assert SENSORS["L8"].fai_ratio != SENSORS["S2"].fai_ratio
+
+    def test_landsat_has_no_red_edge(self):
+        """Test Landsat marks its red-edge band as a substitute."""
+        assert SENSORS["L8"].red_edge_substitute
+        assert not SENSORS["S2A"].red_edge_substitute
+
+    def test_per_layer_ratio_length(self):
+        """Test per-layer sensor lists must match the leading axis."""
+        with pytest.raises(ValueError, match="one entry per"):
+            fai_ratios(["S2A", "L8"], (3, 4, 4))
+
+
+class TestSensorFAI:
+    """Test cases for FAI keyed by sensor."""
+
+    @pytest.mark.parametrize("sensor", ["S2A", "S2B", "L8", "L9"])
+    def test_fai_uses_sensor_wavelengths(self, bands, sensor):
+        """Test fai matches the formula with the sensor's band centres."""
+        red, _, nir, swir = bands
+
+        result = fai(nir, swir, red, sensor=sensor)
+
+        np.testing.assert_allclose(result, manual_fai(nir, swir, red, sensor))
+
+    def test_default_is_nominal_sentinel2(self, bands):
+        """Test omitting the sensor keeps the nominal Sentinel-2 ratio."""
+        red, _, nir, swir = bands
+
+        np.testing.assert_array_equal(
+            fai(nir, swir, red), fai(nir, swir, red, sensor="S2")
+        )
+
+    def test_mixed_sensor_stack(self, bands):
+        """Test a mixed-sensor stack equals per-scene computation."""
+        sensors = ["S2A", "L8", "L9"]
+
+        stacked = compute_indices(*bands, sensor=sensors, chunk_pixels=500)
+
+        for layer, sensor in enumerate(sensors):
+            single = compute_indices(*(band[layer] for band in bands), sensor=sensor)
+            np.testing.assert_allclose(stacked.fai[layer], single.fai, atol=1e-15)
+            np.testing.assert_array_equal(stacked.ndre[layer], single.ndre)
+
+    def test_mixed_sensor_stack_from_dn(self, bands):
+        """Test per-layer sensors also apply to DN inputs."""
+        dn = tuple(np.round(band * 10000).astype(np.uint16) for band in bands)
+        sensors = ["L8", "S2B", "S2A"]
+
+        result = indices_from_dn(*dn, 1 / 10000, sensor=sensors, dtype=np.float64)
+
+        red, _, nir, swir = (band / 10000 for band in dn)
+        for layer, sensor in enumerate(sensors):
+            expected = manual_fai(nir[layer], swir[layer], red[layer], sensor)
+            np.testing.assert_allclose(result.fai[layer], expected, atol=1e-12)
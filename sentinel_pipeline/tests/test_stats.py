@@ -0,0 +1,268 @@
+"""Tests for streaming index statistics."""
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.blocks import ArrayBandSource, process_blocks
+from sentinel_pipeline.indices import compute_indices, validate_spectral_index
+from sentinel_pipeline.stats import (
+    BlockStatistics,
+    IndexHistogram,
+    IndexStatistics,
+    percentile_stretch,
+)
+
+
+@pytest.fixture
+def values():
+    """Index-like values with NaN and inf, larger than one reduction chunk."""
+    rng = np.random.default_rng(5)
+    data = rng.normal(0.1, 0.3, (700, 500))
+    data[rng.random(data.shape) < 0.1] = np.nan
+    data[0, :3] = np.inf
+    return data
+
+
+def reference(data, expected_range=(-1, 1)):
+    """Statistics computed directly with numpy."""
+    finite = data[np.isfinite(data)]
+    in_range = (finite >= expected_range[0]) & (finite <= expected_range[1])
+    return finite, int(in_range.sum())
+
+
+class TestIndexStatistics:
+    """Test cases for the IndexStatistics accumulator."""
+
+    def test_single_update_matches_numpy(self, values):
+        """Test one streaming pass matches numpy statistics."""
+        finite, in_range = reference(values)
+
+        stats = IndexStatistics((-1, 1)).update(values)
+
+        assert stats.total == values.size
+        assert stats.count == finite.size
+        assert stats.mean == pytest.approx(finite.mean(), rel=1e-12)
+        assert stats.variance == pytest.approx(finite.var(), rel=1e-10)
+        assert stats.min == finite.min()
+        assert stats.max == finite.max()
+        assert stats.in_range == in_range
+
+    def test_merged_blocks_match_whole(self, values):
+        """Test merging per-block accumulators equals one accumulator."""
+        whole = IndexStatistics().update(values)
+        parts = [IndexStatistics().update(block) for block in np.array_split(values, 7)]
+
+        merged = IndexStatistics.combine(parts)
+
+        assert merged.total == whole.total
+        assert merged.count == whole.count
+        assert merged.mean == pytest.approx(whole.mean, rel=1e-12)
+        assert merged.variance == pytest.approx(whole.variance, rel=1e-10)
+        assert (merged.min, merged.max) == (whole.min, whole.max)
+        assert merged.in_range == whole.in_range
+
+    def test_merge_with_empty(self):
+        """Test empty and all-NaN partials do not disturb the result."""
+        stats = IndexStatistics().update(np.array([0.2, 0.4]))
+        stats.merge(IndexStatistics()).merge(
+            IndexStatistics().update(np.array([np.nan]))
+        )
+
+        assert stats.count == 2
+        assert stats.total == 3
+        assert stats.mean == pytest.approx(0.3)
+
+    def test_merge_range_mismatch(self):
+        """Test accumulators with different expected ranges cannot merge."""
+        with pytest.raises(ValueError, match="expected ranges"):
+            IndexStatistics((-1, 1)).merge(IndexStatistics((0, 1)))
+
+    def test_serialization_round_trip(self, values):
+        """Test accumulators survive pickle and JSON transport."""
+        stats = IndexStatistics((-0.5, 1.0)).update(values)
+
+        from_pickle = pickle.loads(pickle.dumps(stats))
+        from_json = IndexStatistics.from_dict(json.loads(json.dumps(stats.to_dict())))
+
+        for restored in (from_pickle, from_json):
+            assert restored.summary("X") == stats.summary("X")
+
+    def test_empty_round_trip(self):
+        """Test an empty accumulator serializes and summarizes."""
+        restored = IndexStatistics.from_dict(IndexStatistics().to_dict())
+
+        summary = restored.summary("EMPTY")
+
+        assert summary["valid_pixels"] == 0
+        assert np.isnan(summary["mean_value"])
+
+    def test_summary_matches_validate(self, values):
+        """Test validate_spectral_index reports the streaming summary."""
+        finite, in_range = reference(values, (-0.5, 0.5))
+
+        summary = validate_spectral_index(values, "FAI", (-0.5, 0.5))
+
+        assert summary["valid_pixels"] == finite.size
+        assert summary["std_value"] == pytest.approx(finite.std(), rel=1e-10)
+        assert summary["in_expected_range"] == in_range
+
+
+class TestIndexHistogram:
+    """Test cases for the histogram percentile sketch."""
+
+    def test_percentiles_within_one_bin(self, values):
+        """Test sketch percentiles are within one bin width of numpy."""
+        finite = values[np.isfinite(values)]
+        histogram = IndexHistogram((-1, 1), bins=400).update(values)
+        qs = [1, 2, 25, 50, 75, 98, 99]
+
+        approx = histogram.percentile(qs)
+
+        bin_width = 2 / 400
+        np.testing.assert_allclose(approx, np.percentile(finite, qs), atol=bin_width)
+        assert histogram.count == finite.size
+
+    def test_out_of_range_values_clamped_to_extremes(self):
+        """Test underflow/overflow bins are bounded by the observed extremes."""
+        data = np.array([-3.0, 0.1, 0.2, 0.3, 5.0])
+        histogram = IndexHistogram((0, 1), bins=10).update(data)
+
+        assert histogram.percentile(0) == -3.0
+        assert histogram.percentile(100) == 5.0
+        assert histogram.counts[0] == 1
+        assert histogram.counts[-1] == 1
+
+    def test_merge_equals_single_pass(self, values):
+        """Test merged per-tile sketches equal one sketch over everything."""
+        whole = IndexHistogram((-1, 1), 200).update(values)
+        merged = IndexHistogram((-1, 1), 200)
+        for tile in np.array_split(values, 5, axis=1):
+            merged.merge(IndexHistogram((-1, 1), 200).update(tile))
+
+        np.testing.assert_array_equal(merged.counts, whole.counts)
+        assert merged.percentile(50) == whole.percentile(50)
+
+    def test_merge_mismatched_bins(self):
+        """Test histograms with different bins cannot merge."""
+        with pytest.raises(ValueError, match="different bins"):
+            IndexHistogram((0, 1), 10).merge(IndexHistogram((0, 1), 20))
+
+    def test_empty_and_invalid_queries(self):
+        """Test empty sketches return NaN and bad percentiles raise."""
+        histogram = IndexHistogram()
+
+        assert np.isnan(histogram.percentile(50))
+        with pytest.raises(ValueError):
+            histogram.percentile(101)
+
+    def test_round_trip(self, values):
+        """Test serialization preserves counts and extremes."""
+        histogram = IndexHistogram((-1, 1), 50).update(values)
+
+        restored = IndexHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+
+        np.testing.assert_array_equal(restored.counts, histogram.counts)
+        assert restored.percentile(90) == histogram.percentile(90)
+
+    def test_validate_spectral_index_percentiles(self, values):
+        """Test percentiles are reported by validate_spectral_index."""
+        finite = values[np.isfinite(values)]
+
+        summary = validate_spectral_index(
+            values, "FAI", (-1, 1), percentiles=[5, 50, 95], histogram_bins=2000
+        )
+
+        assert set(summary["percentiles"]) == {"p5", "p50", "p95"}
+        assert summary["percentiles"]["p50"] == pytest.approx(
+            np.percentile(finite, 50), abs=1e-3
+        )
+        assert "percentiles" not in validate_spectral_index(values, "FAI")
+
+    def test_statistics_histogram_merges(self, values):
+        """Test histograms inside IndexStatistics merge and serialize."""
+        parts = [
+            IndexStatistics((-1, 1), histogram_bins=100).update(block)
+            for block in np.array_split(values, 3)
+        ]
+        merged = IndexStatistics.combine(parts)
+        restored = IndexStatistics.from_dict(merged.to_dict())
+
+        assert merged.histogram.count == merged.count
+        assert restored.summary("X", [50]) == merged.summary("X", [50])
+        with pytest.raises(ValueError, match="histogram"):
+            IndexStatistics().summary("X", [50])
+
+
+class TestPercentileStretch:
+    """Test cases for the histogram-based RGB stretch."""
+
+    def test_matches_numpy_stretch(self):
+        """Test the stretch matches an exact np.percentile stretch closely."""
+        rng = np.random.default_rng(2)
+        band = rng.gamma(2.0, 1000.0, (300, 200))
+        p2, p98 = np.percentile(band, [2, 98])
+        expected = np.clip((band - p2) / (p98 - p2), 0, 1)
+
+        result = percentile_stretch(band, 2, 98)
+
+        np.testing.assert_allclose(result, expected, atol=0.01)
+
+    def test_invalid_pixels_zeroed(self):
+        """Test masked and NaN pixels are set to zero."""
+        band = np.array([[0.0, 10.0, 20.0], [30.0, np.nan, 40.0]])
+
+        result = percentile_stretch(band, 0, 100, valid=band > 0)
+
+        assert result[0, 0] == 0
+        assert result[1, 1] == 0
+        assert result[1, 2] == pytest.approx(1.0)
+        assert result[0, 1] == pytest.approx(0.0)
+
+    def test_fill_none_keeps_nan(self):
+        """Test fill=None stretches masked pixels and propagates NaN."""
+        band = np.array([[0.0, 10.0, 20.0], [30.0, np.nan, 40.0]])
+
+        result = percentile_stretch(band, 0, 100, valid=band > 0, fill=None)
+
+        assert np.isnan(result[1, 1])
+        assert result[0, 0] == 0
+        assert result[1, 0] == pytest.approx(2 / 3)
+
+    def test_bounded_memory(self):
+        """Test only the output is allocated at full size."""
+        import tracemalloc
+
+        band = np.random.default_rng(5).random((2000, 2000)).astype(np.float32)
+        valid = band > 0.01
+
+        tracemalloc.start()
+        result = percentile_stretch(band, 2, 98, valid=valid)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert result.dtype == np.float32
+        assert peak < result.nbytes * 1.5
+
+
+class TestBlockStatistics:
+    """Test cases for the block statistics sink."""
+
+    def test_block_sink_matches_full_raster(self):
+        """Test scene statistics from blocks equal full-raster statistics."""
+        rng = np.random.default_rng(9)
+        bands = [rng.uniform(0.0, 0.6, (90, 70)) for _ in range(4)]
+        full = compute_indices(*bands)
+
+        sink = process_blocks(
+            ArrayBandSource(*bands), BlockStatistics(), (25, 25), max_workers=2
+        )
+
+        expected = validate_spectral_index(full.fai, "FAI", (-0.5, 1.0))
+        actual = sink.fai.summary("FAI")
+        assert actual["valid_pixels"] == expected["valid_pixels"]
+        assert actual["mean_value"] == pytest.approx(expected["mean_value"])
+        assert actual["std_value"] == pytest.approx(expected["std_value"])
+        assert sink.ndre.count == np.isfinite(full.ndre).sum()
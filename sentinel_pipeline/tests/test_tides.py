@@ -0,0 +1,185 @@
+"""Tests for tide time series."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.mask import filter_by_tide, filter_by_tide_many
+from sentinel_pipeline.tides import (
+    CONSTITUENTS,
+    STATIONS,
+    HarmonicTidePredictor,
+    TideSeries,
+    TideStation,
+    _astronomical_arguments,
+    epoch_seconds,
+)
+
+
+@pytest.fixture
+def series():
+    """Unsorted high/low tide observations over one day."""
+    return TideSeries.from_json(
+        {
+            "data": [
+                {"datetime": "2023-10-15T18:00:00Z", "height": 0.5, "type": "low"},
+                {"datetime": "2023-10-15T06:00:00Z", "height": 0.8, "type": "low"},
+                {"datetime": "2023-10-15T12:00:00Z", "height": 3.2, "type": "high"},
+            ],
+            "station": "Victoria_Harbour_BC",
+        }
+    )
+
+
+class TestTideSeries:
+    """Test cases for TideSeries interpolation."""
+
+    def test_sorted_on_construction(self, series):
+        """Test observations are sorted by time."""
+        assert np.all(np.diff(series.times) > 0)
+        assert series.heights.tolist() == [0.8, 3.2, 0.5]
+        assert series.station == "Victoria_Harbour_BC"
+
+    def test_linear_interpolation(self, series):
+        """Test heights are interpolated between observations."""
+        assert series.height_at(datetime(2023, 10, 15, 9)) == pytest.approx(2.0)
+        assert series.height_at("2023-10-15T12:00:00Z") == pytest.approx(3.2)
+        assert series.height_at(datetime(2023, 10, 15, 18)) == pytest.approx(0.5)
+
+    def test_cosine_interpolation(self):
+        """Test cosine interpolation between turning points."""
+        series = TideSeries([0.0, 6 * 3600.0], [1.0, 3.0], method="cosine")
+
+        heights = series.height_at(np.array([0.0, 1.5 * 3600, 3 * 3600]))
+
+        np.testing.assert_allclose(
+            heights, [1.0, 1.0 + 2 * (1 - np.sqrt(0.5)) / 2, 2.0]
+        )
+
+    def test_outside_series_is_nan(self, series):
+        """Test times outside the observations interpolate to NaN."""
+        heights = series.height_at(
+            [datetime(2023, 10, 15, 5), datetime(2023, 10, 16, 0)]
+        )
+
+        assert np.isnan(heights).all()
+
+    def test_vectorized_matches_scalar(self, series):
+        """Test array lookups equal one-at-a-time lookups."""
+        times = [
+            datetime(2023, 10, 15, 6) + timedelta(minutes=7 * i) for i in range(150)
+        ]
+
+        heights = series.height_at(times)
+
+        assert heights.shape == (150,)
+        np.testing.assert_allclose(heights, [series.height_at(t) for t in times])
+
+    def test_time_conversions_agree(self):
+        """Test naive, aware, string and datetime64 times convert alike."""
+        naive = datetime(2023, 10, 15, 12)
+        aware = naive.replace(tzinfo=timezone.utc)
+
+        values = [
+            epoch_seconds(naive),
+            epoch_seconds(aware),
+            epoch_seconds("2023-10-15T12:00:00Z"),
+            epoch_seconds(np.datetime64("2023-10-15T12:00:00")),
+            epoch_seconds(np.array(["2023-10-15T12:00"], dtype="datetime64[m]"))[0],
+        ]
+
+        assert len(set(float(v) for v in values)) == 1
+
+    def test_empty_and_invalid(self):
+        """Test empty series return NaN and bad inputs raise."""
+        assert np.isnan(TideSeries.from_json({"data": []}).height_at("2023-01-01"))
+        with pytest.raises(KeyError, match="data"):
+            TideSeries.from_json({})
+        with pytest.raises(ValueError):
+            TideSeries([0.0, 1.0], [1.0])
+
+
+class TestHarmonicTidePredictor:
+    """Test cases for offline harmonic tide prediction."""
+
+    @pytest.fixture
+    def predictor(self):
+        """Predictor for the stored Victoria Harbour constituents."""
+        return HarmonicTidePredictor("victoria_harbour")
+
+    @pytest.mark.parametrize(
+        "name, speed", [("M2", 28.9841042), ("S2", 30.0), ("K1", 15.0410686)]
+    )
+    def test_constituent_speeds(self, name, speed):
+        """Test equilibrium arguments advance at the constituent speed."""
+        doodson = np.array(CONSTITUENTS[name].doodson, dtype=float)
+        t = np.array([1.7e9, 1.7e9 + 3600.0])
+
+        angles = doodson @ _astronomical_arguments(t)
+
+        assert angles[1] - angles[0] == pytest.approx(speed, abs=1e-5)
+
+    def test_s2_zero_at_midnight(self):
+        """Test the solar semidiurnal argument is zero at 00:00 UTC."""
+        midnight = epoch_seconds(datetime(2024, 3, 1, tzinfo=timezone.utc))
+        doodson = np.array(CONSTITUENTS["S2"].doodson, dtype=float)
+
+        angle = doodson @ _astronomical_arguments(np.atleast_1d(midnight))
+
+        assert np.mod(angle[0] + 1e-9, 360.0) == pytest.approx(0.0, abs=1e-6)
+
+    def test_single_constituent_cosine(self):
+        """Test a one-constituent station predicts a pure S2 cosine."""
+        station = TideStation("test", 0.0, 0.0, 1.0, {"S2": (0.5, 0.0)})
+        predictor = HarmonicTidePredictor(station)
+        start = epoch_seconds(datetime(2024, 3, 1, tzinfo=timezone.utc))
+        hours = np.arange(0, 24, 0.5)
+
+        heights = predictor.predict(start + hours * 3600)
+
+        np.testing.assert_allclose(
+            heights, 1.0 + 0.5 * np.cos(np.radians(30 * hours)), atol=1e-9
+        )
+
+    def test_victoria_range(self, predictor):
+        """Test a month of predictions stays in Victoria's tidal range."""
+        times = epoch_seconds(datetime(2024, 6, 1)) + np.arange(0, 30 * 86400, 600)
+
+        heights = predictor.predict(times)
+
+        assert heights.shape == times.shape
+        assert 0.0 < heights.min() < 1.0
+        assert 3.0 < heights.max() < 4.0
+        assert heights.mean() == pytest.approx(
+            STATIONS["victoria_harbour"].datum_offset, abs=0.05
+        )
+
+    def test_vectorized_matches_scalar(self, predictor):
+        """Test batch prediction equals per-time prediction."""
+        times = [datetime(2024, 1, 1) + timedelta(hours=7 * i) for i in range(20)]
+
+        batch = predictor.predict(times)
+
+        np.testing.assert_allclose(batch, [predictor.predict(t) for t in times])
+
+    def test_filters_offline(self, predictor):
+        """Test predictors, sampled series and JSON plug into the tide filter."""
+        times = [datetime(2024, 1, 1) + timedelta(minutes=37 * i) for i in range(300)]
+        series = predictor.series(times[0], times[-1], step_minutes=5)
+        tide_json = predictor.to_json(times)
+
+        direct = filter_by_tide_many(times, predictor, max_height=1.5)
+        sampled = filter_by_tide_many(times[1:-1], series, max_height=1.5)
+
+        assert 0 < direct.sum() < len(times)
+        assert np.mean(direct[1:-1] == sampled) > 0.95
+        assert filter_by_tide(times[5], tide_json, max_height=10.0)
+        assert tide_json["station"] == "Victoria_Harbour_BC"
+
+    def test_unknown_station(self):
+        """Test unknown stations and constituents raise KeyError."""
+        with pytest.raises(KeyError, match="station"):
+            HarmonicTidePredictor("atlantis")
+        with pytest.raises(KeyError, match="constituents"):
+            HarmonicTidePredictor(TideStation("x", 0, 0, 0, {"ZZ9": (1.0, 0.0)}))
@@ -0,0 +1,107 @@
+"""Tests for WRS-2 / MGRS tile lookup."""
+
+import time
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.tiles import (
+    TileIndex,
+    mgrs_index,
+    mgrs_tiles,
+    wrs2_center,
+    wrs2_footprint,
+    wrs2_tiles,
+)
+
+VICTORIA = (-123.40, 48.41, -123.33, 48.45)
+SAN_FRANCISCO = (-122.50, 37.70, -122.35, 37.82)
+
+
+class TestWRS2:
+    """Test cases for WRS-2 path/row lookup."""
+
+    def test_known_scenes(self):
+        """Test AOIs map to the scenes known to cover them."""
+        assert (47, 26) in wrs2_tiles(VICTORIA)
+        assert (44, 34) in wrs2_tiles(SAN_FRANCISCO)
+
+    def test_candidates_are_local(self):
+        """Test only a handful of neighbouring scenes are returned."""
+        tiles = wrs2_tiles(VICTORIA)
+
+        assert 1 <= len(tiles) <= 6
+        assert all(abs(path - 47) <= 1 and abs(row - 26) <= 1 for path, row in tiles)
+
+    def test_equator_crossing(self):
+        """Test path 1 crosses the equator at row 60, 64.6 degrees W."""
+        lon, lat = wrs2_center(1, 60)
+
+        assert lon == pytest.approx(-64.6)
+        assert lat == pytest.approx(0.0, abs=1e-9)
+
+    def test_footprint_contains_center(self):
+        """Test footprints are centred on the scene centre."""
+        corners = wrs2_footprint(47, 26)
+        lon, lat = wrs2_center(47, 26)
+
+        assert corners.shape == (4, 2)
+        np.testing.assert_allclose(corners.mean(axis=0), [lon, lat], atol=1e-6)
+
+    def test_open_ocean_far_south(self):
+        """Test AOIs beyond the daytime rows return no scenes."""
+        assert wrs2_tiles((10.0, -89.0, 11.0, -88.5)) == []
+
+
+class TestMGRS:
+    """Test cases for Sentinel-2 MGRS tile lookup."""
+
+    def test_known_tiles(self):
+        """Test AOIs map to their Sentinel-2 tiles."""
+        assert "10UDU" in mgrs_tiles(VICTORIA)
+        assert mgrs_tiles(SAN_FRANCISCO) == ["10SEG"]
+
+    def test_band_edge_duplicates(self):
+        """Test squares straddling a latitude band yield a tile per band."""
+        assert {"10TDU", "10UDU"} <= set(mgrs_tiles(VICTORIA))
+
+    def test_zone_edge_overlap(self):
+        """Test AOIs on a UTM zone edge match tiles of both zones."""
+        zones = {tile[:2] for tile in mgrs_tiles((-120.05, 45.0, -119.95, 45.1))}
+
+        assert zones == {"10", "11"}
+
+    def test_antimeridian(self):
+        """Test AOIs crossing the antimeridian match zones 60 and 01."""
+        zones = {tile[:2] for tile in mgrs_tiles((179.8, -17.0, -179.8, -16.8))}
+
+        assert zones == {"01", "60"}
+
+    def test_lookup_speed(self):
+        """Test a lookup on the built index takes well under a millisecond."""
+        index = mgrs_index()
+        start = time.perf_counter()
+        for _ in range(200):
+            index.query(VICTORIA)
+        assert (time.perf_counter() - start) / 200 < 1e-3
+
+
+class TestTileIndex:
+    """Test cases for the grid-hash TileIndex."""
+
+    def test_rotated_footprint_exact(self):
+        """Test boxes inside a rotated square's bounds but outside it miss."""
+        diamond = np.array([[[0.0, -1.0], [1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]]])
+        index = TileIndex(["d"], diamond)
+
+        assert index.query((-0.1, -0.1, 0.1, 0.1)) == ["d"]
+        assert index.query((0.8, 0.8, 0.9, 0.9)) == []
+
+    def test_wrapped_cells(self):
+        """Test footprints past 180 degrees are found from both sides."""
+        square = np.array([[[179.5, 0.0], [180.5, 0.0], [180.5, 1.0], [179.5, 1.0]]])
+        index = TileIndex(["x"], square)
+
+        assert index.query((-179.9, 0.2, -179.6, 0.4)) == ["x"]
+        assert index.query((179.6, 0.2, 179.9, 0.4)) == ["x"]
+        assert index.query((-179.0, 0.2, -178.0, 0.4)) == []
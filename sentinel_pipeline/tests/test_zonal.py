@@ -0,0 +1,219 @@
+"""Tests for polygon rasterization and zonal statistics."""
+
+import time
+
+import numpy as np
+import pytest
+
+from sentinel_pipeline.zonal import (
+    parse_wkt_polygons,
+    polygon_mask,
+    polygons_bounds,
+    rasterize_polygons,
+    zonal_statistics,
+)
+
+# 1 unit pixels, y up, covering x 0-100 and y 0-100
+TRANSFORM = (1.0, 0.0, 0.0, 0.0, -1.0, 100.0)
+
+
+def centers(shape, transform=TRANSFORM):
+    """x/y of every pixel center of a north-up grid."""
+    rows, cols = np.mgrid[0 : shape[0], 0 : shape[1]]
+    x = transform[2] + (cols + 0.5) * transform[0]
+    y = transform[5] + (rows + 0.5) * transform[4]
+    return x, y
+
+
+def inside_ring(ring, x, y):
+    """Reference even-odd point-in-polygon test, one point at a time."""
+    inside = np.zeros(x.shape, dtype=bool)
+    for index in np.ndindex(x.shape):
+        px, py = x[index], y[index]
+        hit = False
+        for (x0, y0), (x1, y1) in zip(ring, np.roll(ring, -1, axis=0)):
+            if (y0 > py) != (y1 > py):
+                if px < x0 + (py - y0) * (x1 - x0) / (y1 - y0):
+                    hit = not hit
+        inside[index] = hit
+    return inside
+
+
+class TestParseWkt:
+    """Test cases for WKT polygon parsing."""
+
+    def test_polygon_with_hole(self):
+        """Test exterior and hole rings are returned in order."""
+        polygons = parse_wkt_polygons(
+            "POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0), (2 2, 4 2, 4 4, 2 2))"
+        )
+
+        assert len(polygons) == 1
+        assert [ring.shape for ring in polygons[0]] == [(5, 2), (4, 2)]
+
+    def test_multipolygon(self):
+        """Test every member polygon keeps its own rings."""
+        polygons = parse_wkt_polygons(
+            "multipolygon (((0 0, 1 0, 1 1, 0 0)), "
+            "((5 5, 9 5, 9 9, 5 5), (6 6, 7 6, 7 7, 6 6)))"
+        )
+
+        assert [len(polygon) for polygon in polygons] == [1, 2]
+        assert polygons_bounds(polygons) == (0.0, 0.0, 9.0, 9.0)
+
+    def test_z_ordinates_dropped(self):
+        """Test 3-D coordinates parse to x/y."""
+        polygons = parse_wkt_polygons("POLYGON Z ((0 0 1, 1 0 1, 1 1 1, 0 0 1))")
+
+        assert polygons[0][0].shape == (4, 2)
+
+    def test_invalid_geometry(self):
+        """Test non-polygon geometries raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_wkt_polygons("POINT (1 2)")
+        with pytest.raises(ValueError):
+            parse_wkt_polygons("POLYGON ((0 0, 1 1))")
+
+
+class TestRasterizePolygons:
+    """Test cases for the scanline rasterizer."""
+
+    def test_rectangle(self):
+        """Test an axis-aligned rectangle covers exactly its pixels."""
+        polygons = parse_wkt_polygons("POLYGON ((10 20, 30 20, 30 50, 10 50, 10 20))")
+
+        mask = rasterize_polygons(polygons, TRANSFORM, (100, 100))
+
+        expected = np.zeros((100, 100), dtype=bool)
+        expected[50:80, 10:30] = True
+        np.testing.assert_array_equal(mask, expected)
+
+    def test_matches_point_in_polygon(self):
+        """Test an irregular polygon matches a per-pixel reference test."""
+        rng = np.random.default_rng(1)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 40))
+        radius = rng.uniform(10, 45, 40)
+        ring = np.column_stack(
+            [50 + radius * np.cos(angles), 50 + radius * np.sin(angles)]
+        )
+
+        mask = rasterize_polygons([[ring]], TRANSFORM, (100, 100))
+
+        x, y = centers((100, 100))
+        np.testing.assert_array_equal(mask, inside_ring(ring, x, y))
+
+    def test_hole_and_multipolygon(self):
+        """Test holes are excluded and all members are filled."""
+        polygons = parse_wkt_polygons(
+            "MULTIPOLYGON (((0 0, 40 0, 40 40, 0 40, 0 0), "
+            "(10 10, 30 10, 30 30, 10 30, 10 10)), "
+            "((60 60, 90 60, 90 90, 60 90, 60 60)))"
+        )
+
+        mask = rasterize_polygons(polygons, TRANSFORM, (100, 100))
+
+        assert mask.sum() == 40 * 40 - 20 * 20 + 30 * 30
+        assert not mask[100 - 20, 20]  # inside the hole
+        assert mask[100 - 5, 5] and mask[100 - 75, 75]
+
+    def test_partially_outside_grid(self):
+        """Test polygons extending past the grid are clipped to it."""
+        polygons = parse_wkt_polygons(
+            "POLYGON ((-50 -50, 50 -50, 50 150, -50 150, -50 -50))"
+        )
+
+        mask = rasterize_polygons(polygons, TRANSFORM, (100, 100))
+
+        assert mask[:, :50].all() and not mask[:, 50:].any()
+
+    def test_rotated_transform(self):
+        """Test grids with a rotated affine transform."""
+        angle = np.radians(30)
+        transform = (
+            np.cos(angle),
+            -np.sin(angle),
+            0.0,
+            np.sin(angle),
+            np.cos(angle),
+            0.0,
+        )
+        ring = np.array([[5.0, 5.0], [40.0, 10.0], [20.0, 45.0]])
+
+        mask = rasterize_polygons([[ring]], transform, (60, 60))
+
+        rows, cols = np.mgrid[0:60, 0:60] + 0.5
+        a, b, c, d, e, f = transform
+        x, y = a * cols + b * rows + c, d * cols + e * rows + f
+        np.testing.assert_array_equal(mask, inside_ring(ring, x, y))
+
+    def test_many_vertices_fast(self):
+        """Test polygons with thousands of vertices rasterize quickly."""
+        angles = np.linspace(0, 2 * np.pi, 20000, endpoint=False)
+        radius = 400 + 80 * np.sin(13 * angles)
+        ring = np.column_stack(
+            [500 + radius * np.cos(angles), 500 + radius * np.sin(angles)]
+        )
+        transform = (1.0, 0.0, 0.0, 0.0, -1.0, 1000.0)
+
+        start = time.perf_counter()
+        mask = rasterize_polygons([[ring]], transform, (1000, 1000))
+        elapsed = time.perf_counter() - start
+
+        area = 0.5 * abs(
+            np.dot(ring[:, 0], np.roll(ring[:, 1], 1))
+            - np.dot(ring[:, 1], np.roll(ring[:, 0], 1))
+        )
+        assert mask.sum() == pytest.approx(area, rel=0.01)
+        assert elapsed < 1.0
+
+    def test_polygon_mask_reprojects(self):
+        """Test geographic WKT is reprojected onto a UTM grid."""
+        pytest.importorskip("rasterio")
+        from rasterio.transform import from_origin
+        from rasterio.warp import transform_bounds
+
+        transform = from_origin(470000.0, 5365000.0, 30.0, 30.0)
+        west, south, east, north = transform_bounds(
+            "EPSG:32610", "EPSG:4326", 470300.0, 5362000.0, 471500.0, 5364400.0
+        )
+        wkt = (
+            f"POLYGON (({west} {south}, {east} {south}, {east} {north}, "
+            f"{west} {north}, {west} {south}))"
+        )
+
+        mask = polygon_mask(wkt, transform, (120, 120), crs="EPSG:32610")
+
+        rows, cols = np.nonzero(mask)
+        # The lon/lat box encloses the UTM box, slightly enlarged
+        assert rows.min() <= 20 and rows.max() >= 99
+        assert cols.min() <= 10 and cols.max() >= 49
+        assert mask.sum() < 1.2 * 80 * 40
+
+
+class TestZonalStatistics:
+    """Test cases for zonal_statistics."""
+
+    def test_only_inside_valid_pixels(self):
+        """Test statistics ignore pixels outside the zone or invalid."""
+        fai = np.arange(16, dtype=np.float64).reshape(4, 4)
+        zone = np.zeros((4, 4), dtype=bool)
+        zone[:2, :2] = True  # values 0, 1, 4, 5
+        valid = np.ones((4, 4), dtype=bool)
+        valid[0, 0] = False
+        fai[1, 1] = np.nan
+
+        result = zonal_statistics({"fai": fai}, zone, valid, percentiles=[50])
+
+        assert result["fai"]["count"] == 2
+        assert result["fai"]["mean"] == 2.5
+        assert result["fai"]["percentiles"] == {"p50": 2.5}
+
+    def test_empty_zone(self):
+        """Test an empty zone reports zero count and NaN statistics."""
+        result = zonal_statistics(
+            {"ndre": np.ones((3, 3))}, np.zeros((3, 3), dtype=bool)
+        )
+
+        assert result["ndre"]["count"] == 0
+        assert np.isnan(result["ndre"]["mean"])
+        assert np.isnan(result["ndre"]["percentiles"]["p50"])
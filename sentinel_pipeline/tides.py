@@ -0,0 +1,420 @@
+"""Tide time series and harmonic tide prediction for scene filtering."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+TimeLike = Union[datetime, str, np.datetime64]
+
+
+def _parse_time(value: TimeLike) -> float:
+    """Seconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if isinstance(value, np.datetime64):
+        return float(value.astype("datetime64[us]").astype(np.int64)) / 1e6
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if not isinstance(value, datetime):
+        raise ValueError(f"Unsupported time value: {value!r}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def epoch_seconds(times: Union[TimeLike, Iterable[TimeLike]]) -> np.ndarray:
+    """
+    Convert times to float seconds since the Unix epoch.
+
+    Args:
+        times: A datetime, ISO 8601 string or numpy datetime64, or an
+            iterable/array of them. Naive datetimes are taken as UTC
+
+    Returns:
+        float64 array (0-d for a single time)
+    """
+    if isinstance(times, np.ndarray) and np.issubdtype(times.dtype, np.datetime64):
+        return times.astype("datetime64[us]").astype(np.int64) / 1e6
+    if isinstance(times, (datetime, str, np.datetime64)):
+        return np.asarray(_parse_time(times))
+    return np.fromiter((_parse_time(t) for t in times), dtype=np.float64)
+
+
+class TideSeries:
+    """
+    Tide heights at sorted timestamps, interpolated by binary search.
+
+    Build once per station and reuse: each lookup is O(log n) and lookups for
+    many scene times are a single vectorized ``searchsorted``. Times outside
+    the series interpolate to NaN.
+    """
+
+    def __init__(
+        self,
+        times: Union[np.ndarray, Iterable[TimeLike]],
+        heights: Iterable[float],
+        station: Optional[str] = None,
+        units: str = "meters",
+        method: str = "linear",
+    ):
+        """
+        Args:
+            times: Timestamps as epoch seconds or datetime-like values
+            heights: Tide height at each timestamp
+            station: Station name, for reporting
+            units: Height units
+            method: "linear", or "cosine" for high/low tide tables, where a
+                half-cosine between turning points follows the tide curve
+        """
+        if method not in ("linear", "cosine"):
+            raise ValueError(f"Unknown interpolation method {method!r}")
+        times = np.asarray(times)
+        if not np.issubdtype(times.dtype, np.number):
+            times = epoch_seconds(times)
+        times = times.astype(np.float64)
+        heights = np.asarray(heights, dtype=np.float64)
+        if times.shape != heights.shape or times.ndim != 1:
+            raise ValueError("times and heights must be 1-D arrays of equal length")
+
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.heights = heights[order]
+        self.station = station
+        self.units = units
+        self.method = method
+
+    @classmethod
+    def from_json(
+        cls, tide_json: Dict[str, Any], method: str = "linear"
+    ) -> "TideSeries":
+        """
+        Build a series from a tide API response.
+
+        Args:
+            tide_json: Mapping with a "data" list of {"datetime", "height"}
+                entries, plus optional "station" and "units"
+            method: Interpolation method, see ``TideSeries``
+
+        Returns:
+            TideSeries over the response's observations
+
+        Raises:
+            KeyError: If the "data" field is missing
+            ValueError: If an entry lacks a valid datetime or height
+        """
+        if "data" not in tide_json:
+            raise KeyError("Missing 'data' field in tide JSON")
+        try:
+            times = [_parse_time(entry["datetime"]) for entry in tide_json["data"]]
+            heights = [float(entry["height"]) for entry in tide_json["data"]]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid tide data entry: {e}") from e
+        return cls(
+            np.asarray(times, dtype=np.float64),
+            heights,
+            station=tide_json.get("station"),
+            units=tide_json.get("units", "meters"),
+            method=method,
+        )
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def height_at(self, times: Union[TimeLike, Iterable[TimeLike]]) -> np.ndarray:
+        """
+        Interpolate tide heights at one or many times.
+
+        Args:
+            times: Time or times (datetime, ISO string, datetime64 or epoch
+                seconds array)
+
+        Returns:
+            Heights, NaN outside the series; 0-d for a single time
+        """
+        if isinstance(times, np.ndarray) and np.issubdtype(times.dtype, np.number):
+            t = times.astype(np.float64)
+        else:
+            t = epoch_seconds(times)
+        result = np.full(t.shape, np.nan)
+        if len(self.times) == 0:
+            return result
+
+        inside = (t >= self.times[0]) & (t <= self.times[-1])
+        if len(self) == 1:
+            result[inside] = self.heights[0]
+            return result
+        ti = t[inside]
+        right = np.clip(np.searchsorted(self.times, ti, side="right"), 1, len(self) - 1)
+        left = right - 1
+        t0, t1 = self.times[left], self.times[right]
+        h0, h1 = self.heights[left], self.heights[right]
+        span = t1 - t0
+        fraction = np.divide(ti - t0, span, out=np.zeros_like(ti), where=span > 0)
+        if self.method == "cosine":
+            fraction = (1 - np.cos(np.pi * fraction)) / 2
+        result[inside] = h0 + (h1 - h0) * fraction
+        return result
+
+
+# Unix time of the J2000.0 epoch (2000-01-01T12:00:00 UTC)
+_J2000_EPOCH_SECONDS = 946728000.0
+
+
+class Constituent(NamedTuple):
+    """Tidal constituent defined by its Doodson numbers."""
+
+    name: str
+    # Multipliers of (tau, s, h, p, N', p1) in the equilibrium argument
+    doodson: Tuple[int, int, int, int, int, int]
+    # Constant phase added to the equilibrium argument (degrees)
+    phase: float
+    # Key of the nodal modulation applied (see ``_nodal_corrections``)
+    nodal: str
+
+
+CONSTITUENTS: Dict[str, Constituent] = {
+    "M2": Constituent("M2", (2, 0, 0, 0, 0, 0), 0.0, "M2"),
+    "S2": Constituent("S2", (2, 2, -2, 0, 0, 0), 0.0, "none"),
+    "N2": Constituent("N2", (2, -1, 0, 1, 0, 0), 0.0, "M2"),
+    "K2": Constituent("K2", (2, 2, 0, 0, 0, 0), 0.0, "K2"),
+    "K1": Constituent("K1", (1, 1, 0, 0, 0, 0), 90.0, "K1"),
+    "O1": Constituent("O1", (1, -1, 0, 0, 0, 0), -90.0, "O1"),
+    "P1": Constituent("P1", (1, 1, -2, 0, 0, 0), -90.0, "none"),
+    "Q1": Constituent("Q1", (1, -2, 0, 1, 0, 0), -90.0, "O1"),
+}
+
+
+class TideStation(NamedTuple):
+    """Harmonic constants for a tide station."""
+
+    name: str
+    latitude: float
+    longitude: float
+    # Mean water level above chart datum (Z0)
+    datum_offset: float
+    # Constituent name -> (amplitude, Greenwich phase lag in degrees, UTC)
+    constituents: Dict[str, Tuple[float, float]]
+    units: str = "meters"
+    datum: str = "LAT"
+
+
+STATIONS: Dict[str, TideStation] = {
+    # Victoria Harbour, BC (CHS station 7120). Approximate major constituents
+    # for screening scenes; substitute the official CHS harmonics where
+    # centimetre accuracy matters.
+    "victoria_harbour": TideStation(
+        name="Victoria_Harbour_BC",
+        latitude=48.4284,
+        longitude=-123.3656,
+        datum_offset=1.89,
+        constituents={
+            "K1": (0.629, 265.0),
+            "O1": (0.372, 247.0),
+            "P1": (0.194, 262.0),
+            "Q1": (0.068, 240.0),
+            "M2": (0.373, 80.0),
+            "S2": (0.101, 101.0),
+            "N2": (0.086, 55.0),
+            "K2": (0.028, 98.0),
+        },
+    ),
+}
+
+
+def _astronomical_arguments(seconds: np.ndarray) -> np.ndarray:
+    """
+    Mean astronomical arguments (tau, s, h, p, N', p1) in degrees.
+
+    Args:
+        seconds: Unix times, shape (n,)
+
+    Returns:
+        Array of shape (6, n)
+    """
+    days = (seconds - _J2000_EPOCH_SECONDS) / 86400.0
+    centuries = days / 36525.0
+    s = 218.3165 + 481267.8813 * centuries  # Moon mean longitude
+    h = 280.4661 + 36000.7698 * centuries  # Sun mean longitude
+    p = 83.3535 + 4069.0137 * centuries  # Lunar perigee
+    node = 125.0445 - 1934.1363 * centuries  # Lunar ascending node
+    p1 = 282.9400 + 1.7192 * centuries  # Solar perigee
+    hours = np.mod(seconds, 86400.0) / 3600.0
+    tau = 15.0 * hours + 180.0 + h - s  # Mean lunar time
+    # Doodson's fifth argument is the negated node longitude
+    return np.stack([tau, s, h, p, -node, p1])
+
+
+def _nodal_corrections(node: np.ndarray) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Nodal amplitude factors f and phase corrections u (degrees).
+
+    Args:
+        node: Lunar node longitude N in degrees
+
+    Returns:
+        Mapping of nodal key to (f, u)
+    """
+    n = np.radians(node)
+    return {
+        "none": (1.0, 0.0),
+        "M2": (
+            1.0004 - 0.0373 * np.cos(n) + 0.0002 * np.cos(2 * n),
+            -2.14 * np.sin(n),
+        ),
+        "K1": (
+            1.0060
+            + 0.1150 * np.cos(n)
+            - 0.0088 * np.cos(2 * n)
+            + 0.0006 * np.cos(3 * n),
+            -8.86 * np.sin(n) + 0.68 * np.sin(2 * n) - 0.07 * np.sin(3 * n),
+        ),
+        "O1": (
+            1.0089
+            + 0.1871 * np.cos(n)
+            - 0.0147 * np.cos(2 * n)
+            + 0.0014 * np.cos(3 * n),
+            10.80 * np.sin(n) - 1.34 * np.sin(2 * n) + 0.19 * np.sin(3 * n),
+        ),
+        "K2": (
+            1.0241
+            + 0.2863 * np.cos(n)
+            + 0.0083 * np.cos(2 * n)
+            - 0.0015 * np.cos(3 * n),
+            -17.74 * np.sin(n) + 0.68 * np.sin(2 * n) - 0.04 * np.sin(3 * n),
+        ),
+    }
+
+
+class HarmonicTidePredictor:
+    """
+    Offline tide prediction from a station's harmonic constituents.
+
+    Heights are Z0 + sum(f * A * cos(V + u - g)) over the constituents, with
+    equilibrium arguments V and nodal corrections (f, u) evaluated for every
+    requested time in one numpy expression. Thousands of scene times cost a
+    few array operations and no network calls.
+    """
+
+    def __init__(self, station: Union[str, TideStation] = "victoria_harbour"):
+        """
+        Args:
+            station: Key of ``STATIONS`` or a TideStation
+
+        Raises:
+            KeyError: If the station or one of its constituents is unknown
+        """
+        if isinstance(station, str):
+            if station not in STATIONS:
+                raise KeyError(
+                    f"Unknown tide station {station!r}. "
+                    f"Known stations: {', '.join(STATIONS)}"
+                )
+            station = STATIONS[station]
+        unknown = [name for name in station.constituents if name not in CONSTITUENTS]
+        if unknown:
+            raise KeyError(f"Unknown tidal constituents: {unknown}")
+        self.station = station
+
+        names = list(station.constituents)
+        constituents = [CONSTITUENTS[name] for name in names]
+        self._doodson = np.array([c.doodson for c in constituents], dtype=np.float64)
+        self._phase = np.array([c.phase for c in constituents])[:, None]
+        self._nodal = [c.nodal for c in constituents]
+        self._amplitude = np.array([station.constituents[n][0] for n in names])[:, None]
+        self._lag = np.array([station.constituents[n][1] for n in names])[:, None]
+
+    def predict(self, times: Union[TimeLike, Iterable[TimeLike]]) -> np.ndarray:
+        """
+        Predict tide heights above chart datum.
+
+        Args:
+            times: Time or times (datetime, ISO string, datetime64, or an
+                array of epoch seconds)
+
+        Returns:
+            Heights in station units; 0-d for a single time
+        """
+        if isinstance(times, np.ndarray) and np.issubdtype(times.dtype, np.number):
+            seconds = times.astype(np.float64)
+        else:
+            seconds = epoch_seconds(times)
+        flat = seconds.reshape(-1)
+
+        arguments = _astronomical_arguments(flat)
+        corrections = _nodal_corrections(-arguments[4])
+        f = np.vstack(
+            [np.broadcast_to(corrections[k][0], flat.shape) for k in self._nodal]
+        )
+        u = np.vstack(
+            [np.broadcast_to(corrections[k][1], flat.shape) for k in self._nodal]
+        )
+
+        # (k, 6) @ (6, n) -> equilibrium argument of every constituent and time
+        angle = self._doodson @ arguments + self._phase + u - self._lag
+        heights = self.station.datum_offset + np.sum(
+            f * self._amplitude * np.cos(np.radians(angle)), axis=0
+        )
+        return heights.reshape(seconds.shape)
+
+    height_at = predict
+
+    def series(
+        self,
+        start: TimeLike,
+        end: TimeLike,
+        step_minutes: float = 10.0,
+        method: str = "linear",
+    ) -> TideSeries:
+        """
+        Sample the prediction into a TideSeries for ``filter_by_tide``.
+
+        Args:
+            start: First time
+            end: Last time (inclusive if on the step grid)
+            step_minutes: Sampling interval
+            method: Interpolation method of the returned series
+
+        Returns:
+            TideSeries of predicted heights
+        """
+        t0, t1 = float(epoch_seconds(start)), float(epoch_seconds(end))
+        times = np.arange(t0, t1 + 1e-6, step_minutes * 60.0)
+        return TideSeries(
+            times,
+            self.predict(times),
+            station=self.station.name,
+            units=self.station.units,
+            method=method,
+        )
+
+    def to_json(self, times: Iterable[TimeLike]) -> Dict[str, Any]:
+        """
+        Predicted heights in the tide API response format.
+
+        Args:
+            times: Times to predict
+
+        Returns:
+            Mapping with "data" entries of {"datetime", "height", "type"}
+            plus station metadata, accepted wherever tide JSON is
+        """
+        seconds = epoch_seconds(list(times))
+        heights = self.predict(seconds)
+        return {
+            "data": [
+                {
+                    "datetime": datetime.fromtimestamp(t, tz=timezone.utc)
+                    .isoformat()
+                    .replace("+00:00", "Z"),
+                    "height": round(float(height), 3),
+                    "type": "predicted",
+                }
+                for t, height in zip(seconds, heights)
+            ],
+            "station": self.station.name,
+            "location": {
+                "latitude": self.station.latitude,
+                "longitude": self.station.longitude,
+            },
+            "units": self.station.units,
+            "datum": self.station.datum,
+        }
@@ -0,0 +1,366 @@
+"""Landsat WRS-2 and Sentinel-2 MGRS tile lookup for AOI bounding boxes."""
+
+import functools
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+BBox = Tuple[float, float, float, float]
+
+# WGS84 ellipsoid
+_A = 6378137.0
+_E2 = 0.00669438
+_EP2 = _E2 / (1 - _E2)
+_KM_PER_DEG = 111.32
+
+# UTM scale factor at the central meridian
+_K0 = 0.9996
+
+# WRS-2: 233 paths, 248 rows per orbit; rows 1-122 are the daytime
+# (descending) half. Path 1 crosses the equator at row 60, 64.60 degrees W,
+# and each following path 360/233 degrees further west.
+WRS2_PATHS = 233
+WRS2_ROWS = 248
+WRS2_DAYTIME_ROWS = 122
+_WRS2_INCLINATION = np.radians(98.2)
+_WRS2_EQUATOR_ROW = 60
+_WRS2_PATH1_LON = -64.60
+_WRS2_PERIOD_MIN = 16 * 1440 / WRS2_PATHS
+
+# Earth rotation relative to the sun-synchronous orbit plane, degrees/minute
+_EARTH_RATE = 360 / 1440
+
+# Nominal scene size (across x along track, km) and the allowance added on
+# every side, which covers the approximation of the orbit model
+WRS2_SCENE_KM = (185.0, 180.0)
+WRS2_MARGIN_KM = 15.0
+
+# Sentinel-2 tiles are 109.8 km squares anchored at the 100 km MGRS grid,
+# overlapping their eastern and southern neighbours
+MGRS_TILE_M = 109800.0
+_MGRS_SQUARE_M = 100000.0
+_MGRS_COLUMNS = ("ABCDEFGH", "JKLMNPQR", "STUVWXYZ")
+_MGRS_ROWS = "ABCDEFGHJKLMNPQRSTUV"
+_MGRS_BANDS = "CDEFGHJKLMNPQRSTUVWX"
+
+# Cell size (degrees) of the grid hash behind TileIndex
+DEFAULT_CELL_DEGREES = 1.0
+
+
+def _utm_inverse(
+    easting: np.ndarray, northing: np.ndarray, zone: np.ndarray, south: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """UTM to (lon, lat) degrees (Snyder's series, good to ~1 m in-zone)."""
+    e1 = (1 - np.sqrt(1 - _E2)) / (1 + np.sqrt(1 - _E2))
+    m = (northing - np.where(south, 10_000_000.0, 0.0)) / _K0
+    mu = m / (_A * (1 - _E2 / 4 - 3 * _E2**2 / 64 - 5 * _E2**3 / 256))
+    phi1 = (
+        mu
+        + (3 * e1 / 2 - 27 * e1**3 / 32) * np.sin(2 * mu)
+        + (21 * e1**2 / 16 - 55 * e1**4 / 32) * np.sin(4 * mu)
+        + (151 * e1**3 / 96) * np.sin(6 * mu)
+        + (1097 * e1**4 / 512) * np.sin(8 * mu)
+    )
+    sin1, cos1, tan1 = np.sin(phi1), np.cos(phi1), np.tan(phi1)
+    c1 = _EP2 * cos1**2
+    t1 = tan1**2
+    n1 = _A / np.sqrt(1 - _E2 * sin1**2)
+    r1 = _A * (1 - _E2) / (1 - _E2 * sin1**2) ** 1.5
+    d = (easting - 500000.0) / (n1 * _K0)
+    lat = phi1 - (n1 * tan1 / r1) * (
+        d**2 / 2
+        - (5 + 3 * t1 + 10 * c1 - 4 * c1**2 - 9 * _EP2) * d**4 / 24
+        + (61 + 90 * t1 + 298 * c1 + 45 * t1**2 - 252 * _EP2 - 3 * c1**2)
+        * d**6
+        / 720
+    )
+    lon = (
+        d
+        - (1 + 2 * t1 + c1) * d**3 / 6
+        + (5 - 2 * c1 + 28 * t1 - 3 * c1**2 + 8 * _EP2 + 24 * t1**2) * d**5 / 120
+    ) / cos1
+    return 6.0 * zone - 183.0 + np.degrees(lon), np.degrees(lat)
+
+
+class TileIndex:
+    """
+    Grid hash of tile footprints for fast AOI lookups.
+
+    Footprints are registered in every ``cell_degrees`` lon/lat cell their
+    bounds touch; the (cell, tile) pairs are kept sorted by cell so a query
+    is a few binary searches followed by an exact separating-axis test on
+    the handful of candidates, whose edge normals and projections are
+    precomputed. Footprints crossing the antimeridian keep
+    continuous longitudes (e.g. 179 to 181) and cells wrap around.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence,
+        polygons: np.ndarray,
+        cell_degrees: float = DEFAULT_CELL_DEGREES,
+    ):
+        """
+        Args:
+            ids: Tile identifiers, one per polygon
+            polygons: (n, k, 2) lon/lat vertices of convex footprints
+            cell_degrees: Grid cell size
+        """
+        self.ids = list(ids)
+        self.polygons = np.asarray(polygons, dtype=np.float64)
+        self.cell_degrees = cell_degrees
+        self._columns = int(round(360 / cell_degrees))
+        lo, hi = self.polygons.min(axis=1), self.polygons.max(axis=1)
+        self._bounds = np.concatenate([lo, hi], axis=1)
+        edges = np.roll(self.polygons, -1, axis=1) - self.polygons
+        self._normals = np.stack([-edges[..., 1], edges[..., 0]], axis=-1)
+        projections = np.einsum("nad,nvd->nav", self._normals, self.polygons)
+        self._extent = np.stack(
+            [projections.min(axis=2), projections.max(axis=2)], axis=-1
+        )
+        col0, row0 = self._cell(lo[:, 0], lo[:, 1])
+        col1, row1 = self._cell(hi[:, 0], hi[:, 1])
+        ncols, nrows = col1 - col0 + 1, row1 - row0 + 1
+        tiles = np.repeat(np.arange(len(self.ids)), ncols * nrows)
+        # Position of each pair within its tile's block of cells
+        offset = np.arange(len(tiles)) - np.repeat(
+            np.cumsum(ncols * nrows) - ncols * nrows, ncols * nrows
+        )
+        cols = (col0[tiles] + offset % ncols[tiles]) % self._columns
+        rows = row0[tiles] + offset // ncols[tiles]
+        keys = rows * self._columns + cols
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._tiles = tiles[order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell(self, lon: np.ndarray, lat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        col = np.floor(np.asarray(lon) / self.cell_degrees).astype(np.int64)
+        row = np.floor((np.asarray(lat) + 90) / self.cell_degrees).astype(np.int64)
+        return col, row
+
+    def _overlaps(self, candidates: np.ndarray, bbox: BBox) -> np.ndarray:
+        """Which candidate footprints intersect ``bbox`` (separating axes)."""
+        west, south, east, north = bbox
+        bounds = self._bounds[candidates]
+        hit = (bounds[:, 0] <= east) & (bounds[:, 2] >= west)
+        hit &= (bounds[:, 1] <= north) & (bounds[:, 3] >= south)
+        corners = np.array([[west, south], [east, south], [east, north], [west, north]])
+        box = np.einsum("nad,cd->nac", self._normals[candidates], corners)
+        extent = self._extent[candidates]
+        separated = (box.max(axis=2) < extent[..., 0]) | (
+            box.min(axis=2) > extent[..., 1]
+        )
+        return hit & ~separated.any(axis=1)
+
+    def query(self, bbox: BBox) -> List:
+        """
+        Tiles whose footprint intersects ``bbox``.
+
+        Args:
+            bbox: (west, south, east, north) in degrees; west > east crosses
+                the antimeridian
+
+        Returns:
+            Matching tile ids in index order
+        """
+        west, south, east, north = bbox
+        if west > east:
+            east += 360
+        (col0, col1), (row0, row1) = self._cell(
+            np.array([west, east]), np.array([south, north])
+        )
+        cols = np.arange(col0, col1 + 1) % self._columns
+        keys = (np.arange(row0, row1 + 1)[:, None] * self._columns + cols).ravel()
+        starts = np.searchsorted(self._keys, keys, side="left")
+        ends = np.searchsorted(self._keys, keys, side="right")
+        candidates = np.unique(
+            np.concatenate([self._tiles[s:e] for s, e in zip(starts, ends)])
+        )
+        if candidates.size == 0:
+            return []
+        lon_min = self._bounds[candidates, 0].min()
+        lon_max = self._bounds[candidates, 2].max()
+        hit = np.zeros(candidates.size, dtype=bool)
+        for shift in (0.0, -360.0, 360.0):
+            # Other turns of the globe only matter next to the antimeridian
+            if west + shift <= lon_max and east + shift >= lon_min:
+                box = (west + shift, south, east + shift, north)
+                hit |= self._overlaps(candidates, box)
+        return [self.ids[i] for i in candidates[hit]]
+
+
+def _wrs2_ground_track(
+    path: np.ndarray, u: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(lon, geodetic lat) of the WRS-2 nadir at argument of latitude ``u``."""
+    lat_gc = np.arcsin(np.sin(_WRS2_INCLINATION) * np.sin(u))
+    lat = np.degrees(np.arctan(np.tan(lat_gc) / (1 - _E2)))
+    # Longitude east of the descending node, inertial then Earth-fixed
+    orbit = np.arctan2(np.cos(_WRS2_INCLINATION) * np.sin(u), np.cos(u))
+    inertial = np.degrees(np.mod(orbit, 2 * np.pi)) - 180.0
+    minutes_to_node = (np.pi - u) / (2 * np.pi) * _WRS2_PERIOD_MIN
+    node_lon = _WRS2_PATH1_LON - (path - 1) * 360.0 / WRS2_PATHS
+    lon = node_lon + inertial + _EARTH_RATE * minutes_to_node
+    return (lon + 180.0) % 360.0 - 180.0, lat
+
+
+def wrs2_center(path, row) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Approximate scene centre of WRS-2 path/row (daytime rows).
+
+    Computed from the WRS-2 orbit (98.2 degree inclination, 233 orbits in
+    16 days, row 60 at the equator) rather than the USGS shapefile; centres
+    agree with it to within a few kilometres.
+
+    Args:
+        path: Path number(s), 1-233
+        row: Row number(s), 1-248
+
+    Returns:
+        (lon, lat) in degrees
+    """
+    path = np.asarray(path, dtype=np.float64)
+    row = np.asarray(row, dtype=np.float64)
+    u = np.pi - (_WRS2_EQUATOR_ROW - row) * 2 * np.pi / WRS2_ROWS
+    return _wrs2_ground_track(path, u)
+
+
+def wrs2_footprint(path, row, margin_km: float = 0.0) -> np.ndarray:
+    """
+    Scene footprint(s) as lon/lat quadrilaterals aligned with the ground track.
+
+    Args:
+        path: Path number(s)
+        row: Row number(s)
+        margin_km: Distance added on every side of the nominal scene
+
+    Returns:
+        (..., 4, 2) lon/lat corners
+    """
+    path = np.asarray(path, dtype=np.float64)
+    row = np.asarray(row, dtype=np.float64)
+    lon, lat = wrs2_center(path, row)
+    # Heading from the track a tenth of a row either side of the centre
+    du = 0.1 * 2 * np.pi / WRS2_ROWS
+    u = np.pi - (_WRS2_EQUATOR_ROW - row) * 2 * np.pi / WRS2_ROWS
+    lon0, lat0 = _wrs2_ground_track(path, u - du)
+    lon1, lat1 = _wrs2_ground_track(path, u + du)
+    scale = np.cos(np.radians(lat))
+    along = np.stack([((lon1 - lon0 + 180) % 360 - 180) * scale, lat1 - lat0], axis=-1)
+    along /= np.linalg.norm(along, axis=-1, keepdims=True)
+    across = np.stack([along[..., 1], -along[..., 0]], axis=-1)
+    half_across = (WRS2_SCENE_KM[0] / 2 + margin_km) / _KM_PER_DEG
+    half_along = (WRS2_SCENE_KM[1] / 2 + margin_km) / _KM_PER_DEG
+    signs = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=np.float64)
+    offsets = (
+        signs[:, 0, None] * half_across * across[..., None, :]
+        + signs[:, 1, None] * half_along * along[..., None, :]
+    )
+    corners_lon = lon[..., None] + offsets[..., 0] / scale[..., None]
+    corners_lat = lat[..., None] + offsets[..., 1]
+    return np.stack([corners_lon, corners_lat], axis=-1)
+
+
+@functools.lru_cache(maxsize=None)
+def wrs2_index(margin_km: float = WRS2_MARGIN_KM) -> TileIndex:
+    """Index of daytime WRS-2 scenes, ids (path, row), built on first use."""
+    paths, rows = np.meshgrid(
+        np.arange(1, WRS2_PATHS + 1), np.arange(1, WRS2_DAYTIME_ROWS + 1)
+    )
+    paths, rows = paths.ravel(), rows.ravel()
+    polygons = wrs2_footprint(paths, rows, margin_km)
+    return TileIndex(zip(paths.tolist(), rows.tolist()), polygons)
+
+
+def wrs2_tiles(bbox: BBox) -> List[Tuple[int, int]]:
+    """
+    WRS-2 (path, row) scenes that may cover an AOI.
+
+    Args:
+        bbox: (west, south, east, north) in degrees
+
+    Returns:
+        Candidate (path, row) pairs, sorted
+    """
+    return sorted(wrs2_index().query(bbox))
+
+
+def _mgrs_letters(zone: int, easting: float, northing: float) -> str:
+    """100 km square letters of the square whose SW corner is given."""
+    column = _MGRS_COLUMNS[(zone - 1) % 3][int(easting // _MGRS_SQUARE_M) - 1]
+    offset = 5 if zone % 2 == 0 else 0
+    row = _MGRS_ROWS[(int(northing // _MGRS_SQUARE_M) + offset) % 20]
+    return column + row
+
+
+@functools.lru_cache(maxsize=None)
+def mgrs_index() -> TileIndex:
+    """
+    Index of Sentinel-2 MGRS tiles, ids like "10UDU", built on first use.
+
+    Tiles are enumerated from the MGRS grid: every 100 km square of every
+    UTM zone that overlaps the zone, once per latitude band it overlaps
+    (as Sentinel-2 does for squares straddling a band edge). The Norway and
+    Svalbard zone exceptions are not modelled.
+    """
+    ids, polygons = [], []
+    # Square rows (100 km northing steps) spanning 80S-84N; southern
+    # hemisphere northings include the 10,000 km false northing
+    for south, square_rows in ((False, range(0, 95)), (True, range(10, 100))):
+        zone, col, north_row = np.meshgrid(
+            np.arange(1, 61), np.arange(1, 9), np.array(square_rows), indexing="ij"
+        )
+        zone, col, north_row = zone.ravel(), col.ravel(), north_row.ravel()
+        easting = col * _MGRS_SQUARE_M
+        northing = north_row * _MGRS_SQUARE_M
+        top = northing + _MGRS_SQUARE_M
+        # Tile outline: corners and edge midpoints, in order from the SW corner
+        xs = easting[:, None] + MGRS_TILE_M * np.array([0, 0.5, 1, 1, 1, 0.5, 0, 0])
+        ys = top[:, None] - MGRS_TILE_M * np.array([1, 1, 1, 0.5, 0, 0, 0, 0.5])
+        lon, lat = _utm_inverse(xs, ys, zone[:, None], np.full(xs.shape, south))
+        # The square itself decides zone and band membership
+        sq_lon, sq_lat = _utm_inverse(
+            easting[:, None] + _MGRS_SQUARE_M * np.array([0, 1, 1, 0]),
+            northing[:, None] + _MGRS_SQUARE_M * np.array([0, 0, 1, 1]),
+            zone[:, None],
+            np.full((len(zone), 4), south),
+        )
+        central = 6.0 * zone - 183.0
+        in_zone = (sq_lon.min(axis=1) < central + 3) & (
+            sq_lon.max(axis=1) > central - 3
+        )
+        lat_min, lat_max = sq_lat.min(axis=1), sq_lat.max(axis=1)
+        if south:
+            in_hemisphere = lat_max <= 0
+        else:
+            in_hemisphere = lat_min >= 0
+        keep = np.flatnonzero(
+            in_zone & in_hemisphere & (lat_max > -80) & (lat_min < 84)
+        )
+        letters = [_mgrs_letters(int(zone[i]), easting[i], northing[i]) for i in keep]
+        outlines = np.stack([lon[keep], lat[keep]], axis=-1)
+        for b, band in enumerate(_MGRS_BANDS):
+            band_south = -80.0 + 8 * b
+            band_north = 84.0 if band == "X" else band_south + 8
+            # Squares straddling a band edge get a tile in each band
+            in_band = (lat_min[keep] < band_north) & (lat_max[keep] > band_south)
+            for j in np.flatnonzero(in_band):
+                ids.append(f"{zone[keep[j]]:02d}{band}{letters[j]}")
+            polygons.append(outlines[in_band])
+    return TileIndex(ids, np.concatenate(polygons))
+
+
+def mgrs_tiles(bbox: BBox) -> List[str]:
+    """
+    Sentinel-2 MGRS tile ids that may cover an AOI.
+
+    Args:
+        bbox: (west, south, east, north) in degrees
+
+    Returns:
+        Candidate tile ids (e.g. "10UDU"), sorted
+    """
+    return sorted(mgrs_index().query(bbox))
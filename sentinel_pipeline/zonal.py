@@ -0,0 +1,250 @@
+"""Polygon rasterization and zonal statistics over index rasters."""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# A polygon is its exterior ring followed by any hole rings, each (N, 2) x/y
+Polygon = List[np.ndarray]
+
+# Percentiles reported by ``zonal_statistics`` unless others are requested
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+_RING = re.compile(r"\(([^()]*)\)")
+
+
+def _parse_ring(text: str) -> np.ndarray:
+    """Parse "x y, x y, ..." into an (N, 2) array (Z/M ordinates dropped)."""
+    points = [pair.split() for pair in text.split(",")]
+    ring = np.array([[float(p[0]), float(p[1])] for p in points], dtype=np.float64)
+    if len(ring) < 3:
+        raise ValueError("Polygon rings need at least 3 vertices")
+    return ring
+
+
+def parse_wkt_polygons(wkt: str) -> List[Polygon]:
+    """
+    Parse a WKT POLYGON or MULTIPOLYGON into rings.
+
+    Args:
+        wkt: WKT geometry string (case-insensitive, optional Z/M ordinates)
+
+    Returns:
+        List of polygons, each a list of rings: the exterior first, then holes
+
+    Raises:
+        ValueError: If the string is not a (multi)polygon with valid rings
+    """
+    text = wkt.strip()
+    match = re.match(r"(?i)(MULTI)?POLYGON\s*(?:Z|M|ZM)?\s*\(", text)
+    if not match:
+        raise ValueError(f"Unsupported WKT geometry: {text[:40]!r}")
+    body = text[match.end() - 1 :]
+
+    if not match.group(1):
+        return [[_parse_ring(ring) for ring in _RING.findall(body)]]
+
+    # Split the multipolygon body into its top-level "((...), (...))" members
+    polygons: List[Polygon] = []
+    depth = 0
+    start = 0
+    for position, char in enumerate(body):
+        if char == "(":
+            depth += 1
+            if depth == 2:
+                start = position
+        elif char == ")":
+            depth -= 1
+            if depth == 1:
+                rings = _RING.findall(body[start : position + 1])
+                polygons.append([_parse_ring(ring) for ring in rings])
+    if not polygons or not all(polygons):
+        raise ValueError("MULTIPOLYGON has no polygons")
+    return polygons
+
+
+def polygons_bounds(polygons: Sequence[Polygon]) -> Tuple[float, float, float, float]:
+    """(minx, miny, maxx, maxy) of the polygons' exterior rings."""
+    exteriors = np.concatenate([polygon[0] for polygon in polygons])
+    minx, miny = exteriors.min(axis=0)
+    maxx, maxy = exteriors.max(axis=0)
+    return float(minx), float(miny), float(maxx), float(maxy)
+
+
+def _edges(polygons: Sequence[Polygon]) -> np.ndarray:
+    """(E, 4) array of x0, y0, x1, y1 for every ring edge, rings closed."""
+    edges = []
+    for polygon in polygons:
+        for ring in polygon:
+            closed = np.vstack([ring, ring[:1]])
+            edges.append(np.hstack([closed[:-1], closed[1:]]))
+    return np.concatenate(edges)
+
+
+def _to_pixels(points: np.ndarray, transform: Sequence[float]) -> np.ndarray:
+    """Map x/y points to fractional (col, row) with an inverted affine."""
+    a, b, c, d, e, f = (float(v) for v in tuple(transform)[:6])
+    determinant = a * e - b * d
+    if determinant == 0:
+        raise ValueError("Transform is not invertible")
+    x = points[:, 0] - c
+    y = points[:, 1] - f
+    col = (e * x - b * y) / determinant
+    row = (a * y - d * x) / determinant
+    return np.column_stack([col, row])
+
+
+def rasterize_polygons(
+    polygons: Sequence[Polygon],
+    transform: Sequence[float],
+    shape: Tuple[int, int],
+) -> np.ndarray:
+    """
+    Mask of the pixels whose centers fall inside the polygons.
+
+    A vectorized even-odd scanline fill: every edge is intersected with the
+    pixel-center rows it spans, the crossings are sorted per row, and each
+    consecutive pair of crossings marks one inside span. Spans are written
+    as +1/-1 into a difference array whose cumulative sum is the mask, so
+    the cost is O(edges + crossings + pixels) with no per-pixel Python.
+    Holes and multipolygon parts need no special handling under the
+    even-odd rule (parts are assumed not to overlap, as in valid WKT).
+
+    Args:
+        polygons: Output of ``parse_wkt_polygons``, in the grid's CRS
+        transform: Affine transform of the grid (rasterio ``Affine`` or its
+            first six coefficients)
+        shape: (rows, cols) of the grid
+
+    Returns:
+        Boolean array of ``shape``, True inside
+    """
+    rows, cols = shape
+    mask = np.zeros(shape, dtype=bool)
+    if not polygons or rows == 0 or cols == 0:
+        return mask
+
+    edges = _edges(polygons)
+    start = _to_pixels(edges[:, :2], transform)
+    end = _to_pixels(edges[:, 2:], transform)
+    x0, y0 = start[:, 0], start[:, 1]
+    x1, y1 = end[:, 0], end[:, 1]
+
+    # Pixel-center rows r + 0.5 crossed by each edge, half-open in y so a
+    # vertex shared by two edges is counted once
+    low = np.minimum(y0, y1)
+    high = np.maximum(y0, y1)
+    first = np.clip(np.ceil(low - 0.5), 0, rows).astype(np.intp)
+    last = np.clip(np.ceil(high - 0.5), 0, rows).astype(np.intp)
+    counts = np.maximum(last - first, 0)
+    if not counts.any():
+        return mask
+
+    edge = np.repeat(np.arange(len(edges)), counts)
+    offsets = np.arange(edge.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    row = first[edge] + offsets
+    center = row + 0.5
+    slope = (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+    x = x0[edge] + (center - y0[edge]) * slope
+
+    order = np.lexsort((x, row))
+    row = row[order].reshape(-1, 2)[:, 0]
+    x = x[order].reshape(-1, 2)
+
+    # Columns whose centers c + 0.5 lie in [x_in, x_out)
+    col_in = np.clip(np.ceil(x[:, 0] - 0.5), 0, cols).astype(np.intp)
+    col_out = np.clip(np.ceil(x[:, 1] - 0.5), 0, cols).astype(np.intp)
+    spans = col_out > col_in
+    row, col_in, col_out = row[spans], col_in[spans], col_out[spans]
+
+    difference = np.zeros((rows, cols + 1), dtype=np.int32)
+    np.add.at(difference, (row, col_in), 1)
+    np.add.at(difference, (row, col_out), -1)
+    np.cumsum(difference[:, :cols], axis=1, out=difference[:, :cols])
+    return difference[:, :cols] > 0
+
+
+def polygon_mask(
+    geometry: Union[str, Sequence[Polygon]],
+    transform: Sequence[float],
+    shape: Tuple[int, int],
+    crs: Optional[Any] = None,
+    geometry_crs: str = "EPSG:4326",
+) -> np.ndarray:
+    """
+    Rasterize a WKT (multi)polygon onto a raster grid.
+
+    Args:
+        geometry: WKT string or parsed polygons
+        transform: Affine transform of the grid
+        shape: (rows, cols) of the grid
+        crs: CRS of the grid; vertices are reprojected from ``geometry_crs``
+            when given (requires rasterio)
+        geometry_crs: CRS of the geometry's coordinates
+
+    Returns:
+        Boolean array of ``shape``, True inside the geometry
+    """
+    polygons = parse_wkt_polygons(geometry) if isinstance(geometry, str) else geometry
+    if crs is not None:
+        from rasterio.warp import transform as transform_points
+
+        projected = []
+        for polygon in polygons:
+            rings = []
+            for ring in polygon:
+                xs, ys = transform_points(geometry_crs, crs, ring[:, 0], ring[:, 1])
+                rings.append(np.column_stack([xs, ys]))
+            projected.append(rings)
+        polygons = projected
+    return rasterize_polygons(polygons, transform, shape)
+
+
+def zonal_statistics(
+    values: Dict[str, np.ndarray],
+    zone: np.ndarray,
+    valid: Optional[np.ndarray] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Count, mean, spread and percentiles of index rasters inside a zone.
+
+    Args:
+        values: Index name -> array on the zone's grid
+        zone: Boolean mask of the zone (e.g. from ``polygon_mask``)
+        valid: Optional boolean mask of usable pixels (e.g. cloud-free);
+            non-finite values are always excluded
+        percentiles: Percentiles in [0, 100], reported keyed like "p50"
+
+    Returns:
+        Index name -> {"count", "mean", "std", "min", "max", "percentiles"};
+        statistics are NaN when no pixel qualifies
+    """
+    selected = zone if valid is None else zone & valid
+    result = {}
+    for name, array in values.items():
+        inside = np.asarray(array)[selected]
+        inside = inside[np.isfinite(inside)].astype(np.float64)
+        if inside.size == 0:
+            result[name] = {
+                "count": 0,
+                "mean": np.nan,
+                "std": np.nan,
+                "min": np.nan,
+                "max": np.nan,
+                "percentiles": {f"p{p:g}": np.nan for p in percentiles},
+            }
+            continue
+        quantiles = np.percentile(inside, percentiles) if len(percentiles) else []
+        result[name] = {
+            "count": int(inside.size),
+            "mean": float(inside.mean()),
+            "std": float(inside.std()),
+            "min": float(inside.min()),
+            "max": float(inside.max()),
+            "percentiles": {
+                f"p{p:g}": float(q) for p, q in zip(percentiles, quantiles)
+            },
+        }
+    return result
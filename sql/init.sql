@@ -42,14 +42,16 @@ CREATE TABLE IF NOT EXISTS carbon_analysis.spectral_cache (
     id SERIAL PRIMARY KEY,
     geometry_hash VARCHAR(64) NOT NULL,
     analysis_date DATE NOT NULL,
+    data_source VARCHAR(32) NOT NULL DEFAULT 'landsat_real',
     mean_fai DOUBLE PRECISION,
     mean_ndre DOUBLE PRECISION,
     pixel_count INTEGER,
     valid_pixel_percentage DOUBLE PRECISION,
+    metadata JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
-    -- Cache key
-    UNIQUE(geometry_hash, analysis_date)
+    -- Cache key (geometry_hash is the API's canonical geometry hash)
+    UNIQUE(geometry_hash, analysis_date, data_source)
 );
 
 -- Create spatial index on geometries
@@ -0,0 +1,15 @@
+"""
+Shared fixtures for the API tests.
+"""
+
+import pytest
+
+from api import main
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Keep cached /carbon responses from leaking between tests."""
+    main.result_cache.clear()
+    yield
+    main.result_cache.clear()
@@ -0,0 +1,226 @@
+"""
+Tests for the batch carbon analysis endpoint.
+"""
+
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.main import app
+
+AOI_A = "POLYGON((-123.5 48.4, -123.4 48.4, -123.4 48.5, -123.5 48.5, -123.5 48.4))"
+AOI_B = "POLYGON((-123.3 48.4, -123.2 48.4, -123.2 48.5, -123.3 48.5, -123.3 48.4))"
+AOI_C = "POLYGON((-125.0 49.0, -124.9 49.0, -124.9 49.1, -125.0 49.1, -125.0 49.0))"
+
+
+@pytest.fixture
+def client():
+    """Test client for the app."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def mock_model():
+    """Mock model predicting a density from FAI for every row."""
+    mock = MagicMock()
+    mock.predict.side_effect = lambda features: 2.0 + 10 * np.asarray(features)[:, 0]
+    return mock
+
+
+def post_batch(client, items, **options):
+    """POST a batch and parse the NDJSON lines."""
+    response = client.post("/carbon/batch", json={"items": items, **options})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestCarbonBatch:
+    """Test suite for POST /carbon/batch."""
+
+    def test_synthetic_batch(self, client, mock_model):
+        """Test every item gets a result and prediction is vectorized."""
+        items = [
+            {"aoi": AOI_A, "date": "2024-06-15", "id": "a"},
+            {"aoi": AOI_B, "date": "2024-07-15", "id": "b"},
+            {"aoi": AOI_C, "date": "2024-08-15", "id": "c"},
+        ]
+
+        with patch.object(main, "model", mock_model):
+            lines = post_batch(client, items)
+            single = client.get(f"/carbon?date=2024-07-15&aoi={AOI_B}").json()
+
+        assert sorted(line["id"] for line in lines) == ["a", "b", "c"]
+        assert all(line["status"] == "ok" for line in lines)
+        # One predict for the batch, one for the single request
+        assert mock_model.predict.call_count == 2
+        assert mock_model.predict.call_args_list[0].args[0].shape == (3, 2)
+        result = next(line for line in lines if line["id"] == "b")
+        for field in ("area_m2", "mean_fai", "mean_ndre", "biomass_t", "co2e_t"):
+            assert result[field] == pytest.approx(single[field])
+        assert result["data_source"] == "synthetic"
+
+    def test_per_item_errors(self, client, mock_model):
+        """Test invalid items are reported without failing the batch."""
+        items = [
+            {"aoi": AOI_A, "date": "2024-06-15"},
+            {"aoi": "POLYGON((bad))", "date": "2024-06-15"},
+            {"aoi": AOI_B, "date": "15/06/2024"},
+            {"aoi": "POLYGON((1 1, 2 1, 3 1, 1 1))", "date": "2024-06-15"},
+            {"aoi": AOI_C, "date": "2024-06-15"},
+        ]
+
+        with patch.object(main, "model", mock_model):
+            lines = post_batch(client, items)
+
+        by_index = {line["index"]: line for line in lines}
+        assert by_index[0]["status"] == "ok"
+        assert by_index[1]["status"] == "error" and "WKT" in by_index[1]["error"]
+        assert by_index[2]["status"] == "error" and "date" in by_index[2]["error"]
+        assert by_index[3]["status"] == "error" and "zero area" in by_index[3]["error"]
+        # Items after the bad ones are still reported
+        assert by_index[4]["status"] == "ok"
+
+    def test_result_errors_do_not_end_stream(self, client, mock_model):
+        """Test a failure building one result only affects that item."""
+        items = [
+            {"aoi": AOI_A, "date": "2024-06-15"},
+            {"aoi": AOI_C, "date": "2024-06-15"},
+        ]
+        original = main.biomass_from_density
+
+        def flaky(raw_density, area_m2):
+            if area_m2 == main.polygon_area(AOI_A):
+                raise ZeroDivisionError("float division by zero")
+            return original(raw_density, area_m2)
+
+        with patch.object(main, "model", mock_model), patch.object(
+            main, "biomass_from_density", flaky
+        ):
+            lines = post_batch(client, items)
+
+        by_index = {line["index"]: line for line in lines}
+        assert by_index[0]["status"] == "error"
+        assert "division" in by_index[0]["error"]
+        assert by_index[1]["status"] == "ok"
+
+    def test_prediction_errors_reported(self, client):
+        """Test a failing model marks its items as errors."""
+        model = MagicMock()
+        model.predict.side_effect = RuntimeError("model broken")
+
+        with patch.object(main, "model", model):
+            lines = post_batch(client, [{"aoi": AOI_A, "date": "2024-06-15"}])
+
+        assert lines[0]["status"] == "error"
+        assert "model broken" in lines[0]["error"]
+
+    def test_items_grouped_by_scene(self, client, mock_model):
+        """Test each scene is searched and processed once for all of its AOIs."""
+        scenes = {AOI_A: {"id": "S1"}, AOI_C: {"id": "S2"}}
+
+        def scene_search_key(aoi, date):
+            # Items 0 and 1 share a search, item 2 has its own, 3 has no scene
+            return ("A" if aoi in (AOI_A, AOI_B) else aoi, date)
+
+        def find_scene(aoi, date):
+            if date == "1999-01-01":
+                return None, {"error": "No Landsat scenes found for date/area"}
+            return scenes[aoi], None
+
+        def process_scene_aois(scene, aois):
+            results = [(0.05, 0.2, {"scene_id": scene["id"]}) for _ in aois]
+            if scene["id"] == "S2":
+                results[0] = (None, None, {"error": "No clear pixels in AOI"})
+            return results
+
+        search = MagicMock(side_effect=find_scene)
+        process = MagicMock(side_effect=process_scene_aois)
+        items = [
+            {"aoi": AOI_A, "date": "2024-06-15", "id": "a"},
+            {"aoi": AOI_B, "date": "2024-06-15", "id": "b"},
+            {"aoi": AOI_C, "date": "2024-06-15", "id": "c"},
+            {"aoi": AOI_C, "date": "1999-01-01", "id": "d"},
+        ]
+
+        with patch.object(main, "model", mock_model), patch.object(
+            main, "ENHANCED_FEATURES_AVAILABLE", True
+        ), patch.object(
+            main, "scene_search_key", scene_search_key, create=True
+        ), patch.object(
+            main, "find_scene", search, create=True
+        ), patch.object(
+            main, "process_scene_aois", process, create=True
+        ):
+            lines = post_batch(client, items, use_real_landsat=True)
+
+        by_id = {line["id"]: line for line in lines}
+        assert search.call_count == 3
+        assert process.call_count == 2
+        assert [AOI_A, AOI_B] in [c.args[1] for c in process.call_args_list]
+        assert by_id["a"]["data_source"] == by_id["b"]["data_source"] == "landsat_real"
+        assert by_id["a"]["landsat_metadata"] == {"scene_id": "S1"}
+        # Items without usable scene data fall back to synthetic values
+        assert by_id["c"]["data_source"] == "synthetic"
+        assert by_id["c"]["landsat_metadata"]["error"] == "No clear pixels in AOI"
+        assert by_id["d"]["data_source"] == "synthetic"
+        assert "No Landsat scenes" in by_id["d"]["landsat_metadata"]["error"]
+        # One predict for the shared scene, one for the synthetic fallbacks
+        assert [len(c.args[0]) for c in mock_model.predict.call_args_list] == [2, 2]
+
+    def test_scene_searches_run_concurrently(self, client, mock_model):
+        """Test one group's search does not wait for another's."""
+        # Each search waits for the other, so serial searches would time out
+        barrier = threading.Barrier(2, timeout=5)
+
+        def find_scene(aoi, date):
+            barrier.wait()
+            return {"id": aoi}, None
+
+        def process_scene_aois(scene, aois):
+            return [(0.05, 0.2, {"scene_id": scene["id"]}) for _ in aois]
+
+        items = [
+            {"aoi": AOI_A, "date": "2024-06-15", "id": "a"},
+            {"aoi": AOI_C, "date": "2024-06-15", "id": "c"},
+        ]
+
+        with patch.object(main, "model", mock_model), patch.object(
+            main, "ENHANCED_FEATURES_AVAILABLE", True
+        ), patch.object(
+            main, "scene_search_key", lambda aoi, date: (aoi, date), create=True
+        ), patch.object(
+            main, "find_scene", find_scene, create=True
+        ), patch.object(
+            main, "process_scene_aois", process_scene_aois, create=True
+        ):
+            lines = post_batch(client, items, use_real_landsat=True)
+
+        assert all(line["data_source"] == "landsat_real" for line in lines)
+
+    def test_batch_limits(self, client, mock_model):
+        """Test oversized and empty batches are rejected."""
+        items = [{"aoi": AOI_A, "date": "2024-06-15"}] * 3
+
+        with patch.object(main, "model", mock_model), patch.object(
+            main, "MAX_BATCH_ITEMS", 2
+        ):
+            too_many = client.post("/carbon/batch", json={"items": items})
+            empty = client.post("/carbon/batch", json={"items": []})
+
+        assert too_many.status_code == 413
+        assert empty.status_code == 422
+
+    def test_no_model(self, client):
+        """Test the batch endpoint needs the model."""
+        with patch.object(main, "model", None):
+            response = client.post(
+                "/carbon/batch", json={"items": [{"aoi": AOI_A, "date": "2024-06-15"}]}
+            )
+
+        assert response.status_code == 503
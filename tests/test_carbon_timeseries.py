@@ -0,0 +1,141 @@
+"""
+Tests for the carbon time series endpoint.
+"""
+
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.main import app
+
+AOI = "POLYGON((-123.5 48.4, -123.4 48.4, -123.4 48.5, -123.5 48.5, -123.5 48.4))"
+
+
+def make_scene(day, cloud=5.0):
+    """STAC item dict acquired on 2024-06-``day``."""
+    return {
+        "id": f"LC08_202406{day:02d}",
+        "properties": {
+            "datetime": f"2024-06-{day:02d}T19:00:00Z",
+            "eo:cloud_cover": cloud,
+        },
+    }
+
+
+@pytest.fixture
+def landsat():
+    """Patch the Landsat functions used by the endpoint."""
+    scenes = [make_scene(1), make_scene(9), make_scene(17)]
+    search = MagicMock(return_value=scenes)
+
+    def process(scene, aoi):
+        if scene["id"].endswith("9"):
+            return None, None, {"error": "Could not process Landsat scene"}
+        return 0.05, 0.2, {"scene_id": scene["id"], "cached": False}
+
+    process_mock = MagicMock(side_effect=process)
+    model = MagicMock()
+    model.predict.side_effect = lambda features: np.full(len(features), 3.0)
+    with patch.object(main, "model", model), patch.object(
+        main, "ENHANCED_FEATURES_AVAILABLE", True
+    ), patch.object(
+        main,
+        "extract_bbox_from_wkt",
+        lambda wkt: [-123.5, 48.4, -123.4, 48.5],
+        create=True,
+    ), patch.object(
+        main, "search_landsat_range", search, create=True
+    ), patch.object(
+        main, "process_scene_for_aoi", process_mock, create=True
+    ):
+        yield search, process_mock
+
+
+def get_series(client, **params):
+    """GET a time series and parse the NDJSON lines."""
+    query = {"aoi": AOI, "start": "2024-06-01", "end": "2024-06-30", **params}
+    response = client.get("/carbon/timeseries", params=query)
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestCarbonTimeseries:
+    """Test suite for GET /carbon/timeseries."""
+
+    def test_one_line_per_scene(self, landsat):
+        """Test every scene in the range yields a result or an error."""
+        search, process = landsat
+
+        lines = get_series(TestClient(app))
+
+        assert search.call_count == 1
+        assert search.call_args.args[1:3] == ("2024-06-01", "2024-06-30")
+        assert process.call_count == 3
+        by_date = {line["date"]: line for line in lines}
+        assert sorted(by_date) == ["2024-06-01", "2024-06-09", "2024-06-17"]
+        assert by_date["2024-06-09"]["status"] == "error"
+        ok = by_date["2024-06-01"]
+        assert ok["status"] == "ok" and ok["scene_id"] == "LC08_20240601"
+        assert ok["mean_fai"] == 0.05 and ok["biomass_t"] > 0 and ok["co2e_t"] > 0
+
+    def test_scenes_processed_concurrently(self, landsat):
+        """Test scenes are processed at the same time, not one by one."""
+        _, process = landsat
+        barrier = threading.Barrier(3, timeout=5)
+        original = process.side_effect
+
+        def wait_for_all(scene, aoi):
+            barrier.wait()
+            return original(scene, aoi)
+
+        process.side_effect = wait_for_all
+
+        lines = get_series(TestClient(app))
+
+        assert len(lines) == 3
+
+    def test_cloud_threshold_passed(self, landsat):
+        """Test the cloud cover threshold reaches the catalog search."""
+        search, _ = landsat
+
+        get_series(TestClient(app), max_cloud_cover=10)
+
+        assert search.call_args.args[4] == 10
+
+    def test_invalid_ranges(self, landsat):
+        """Test reversed or overlong ranges are rejected."""
+        client = TestClient(app)
+        reversed_range = client.get(
+            "/carbon/timeseries",
+            params={"aoi": AOI, "start": "2024-06-30", "end": "2024-06-01"},
+        )
+        with patch.object(main, "MAX_TIMESERIES_DAYS", 10):
+            too_long = client.get(
+                "/carbon/timeseries",
+                params={"aoi": AOI, "start": "2024-06-01", "end": "2024-06-30"},
+            )
+        bad_wkt = client.get(
+            "/carbon/timeseries",
+            params={"aoi": "POINT(1 2)", "start": "2024-06-01", "end": "2024-06-30"},
+        )
+
+        assert reversed_range.status_code == 400
+        assert too_long.status_code == 400
+        assert bad_wkt.status_code == 400
+
+    def test_requires_landsat(self):
+        """Test the endpoint needs the Landsat integration."""
+        with patch.object(main, "model", MagicMock()), patch.object(
+            main, "ENHANCED_FEATURES_AVAILABLE", False
+        ):
+            response = TestClient(app).get(
+                "/carbon/timeseries",
+                params={"aoi": AOI, "start": "2024-06-01", "end": "2024-06-30"},
+            )
+
+        assert response.status_code == 503
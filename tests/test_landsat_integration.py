@@ -0,0 +1,614 @@
+"""
+Tests for STAC client reuse, scene search memoization and scene processing.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from api import landsat_integration
+from api.landsat_integration import (
+    calculate_spectral_indices,
+    choose_overview_level,
+    clear_scene_results,
+    clear_search_cache,
+    download_and_process_scene,
+    extract_bbox_from_wkt,
+    find_scene,
+    precompute_scene_tables,
+    process_scene_for_aoi,
+    process_scene_aois,
+    query_scene_tables,
+    scene_search_key,
+    search_cache_stats,
+    search_landsat_range,
+    search_landsat_scenes,
+    snap_bbox,
+)
+from sentinel_pipeline.indices import indices_from_dn
+from sentinel_pipeline.sensors import LANDSAT_C2_L2_SCALING
+
+pytestmark = pytest.mark.skipif(
+    not landsat_integration.LANDSAT_AVAILABLE, reason="Landsat dependencies missing"
+)
+
+BBOX = [-123.47, 48.42, -123.41, 48.46]
+
+
+def make_item(item_id, day, cloud, platform="landsat-8"):
+    """Mock STAC item."""
+    item = MagicMock()
+    item.datetime = datetime(2024, 6, day, 19, 0, tzinfo=timezone.utc)
+    item.properties = {"eo:cloud_cover": cloud, "platform": platform}
+    item.to_dict.return_value = {"id": item_id, "properties": item.properties}
+    return item
+
+
+@pytest.fixture
+def scene(tmp_path):
+    """Landsat-like STAC item with local 30 m COG assets near Victoria."""
+    import rasterio
+    from rasterio.transform import from_origin
+
+    rng = np.random.default_rng(3)
+    shape = (96, 96)
+    # Reflectance-like DNs (reflectance = DN * 2.75e-5 - 0.2)
+    dn = {
+        "red": rng.integers(9000, 11000, shape),
+        "nir08": rng.integers(13000, 16000, shape),
+        "swir16": rng.integers(8000, 10000, shape),
+    }
+    qa = np.full(shape, 1 << 7, dtype=np.uint16)  # clear water
+    qa[:20, :] = 1 << 3  # cloud
+    qa[-5:, -5:] = 1  # fill
+    dn["qa_pixel"] = qa
+    assets = {}
+    for key, data in dn.items():
+        path = tmp_path / f"{key}.tif"
+        with rasterio.open(
+            path,
+            "w",
+            driver="GTiff",
+            height=shape[0],
+            width=shape[1],
+            count=1,
+            dtype="uint16",
+            crs="EPSG:32610",
+            transform=from_origin(470000.0, 5365000.0, 30.0, 30.0),
+            tiled=True,
+            blockxsize=32,
+            blockysize=32,
+        ) as dst:
+            dst.write(data.astype(np.uint16), 1)
+            dst.build_overviews([2, 4])
+        assets[key] = {"href": str(path)}
+    item = {
+        "id": "LC08_L2SP_047026_TEST",
+        "properties": {"platform": "landsat-8", "datetime": "2024-06-15T19:00:00Z"},
+        "assets": assets,
+    }
+    bbox = list(
+        rasterio.warp.transform_bounds(
+            "EPSG:32610", "EPSG:4326", 470000.0, 5362120.0, 472880.0, 5365000.0
+        )
+    )
+    # Shrink slightly so the window stays inside the rasters
+    pad = 0.002
+    bbox = [bbox[0] + pad, bbox[1] + pad, bbox[2] - pad, bbox[3] - pad]
+    return item, bbox, dn
+
+
+@pytest.fixture
+def client():
+    """Mock STAC client installed as the shared client."""
+    mock = MagicMock()
+    mock.search.return_value.items.side_effect = lambda: iter(
+        [make_item("far", 1, 5.0), make_item("near", 15, 10.0)]
+    )
+    clear_search_cache()
+    with patch.object(landsat_integration, "_stac_client", mock):
+        yield mock
+    clear_search_cache()
+
+
+class TestSceneSearch:
+    """Test suite for memoized Landsat scene searches."""
+
+    def test_snap_bbox_outward(self):
+        """Test bboxes snap outward to the search grid."""
+        assert snap_bbox(BBOX, 0.05) == [-123.5, 48.4, -123.4, 48.5]
+
+    def test_results_ranked(self, client):
+        """Test scenes closest to the date come first."""
+        scenes = search_landsat_scenes(BBOX, "2024-06-15")
+
+        assert [scene["id"] for scene in scenes] == ["near", "far"]
+
+    def test_nearby_aois_share_search(self, client):
+        """Test AOIs snapping to the same grid cell reuse one search."""
+        first = search_landsat_scenes(BBOX, "2024-06-15")
+        second = search_landsat_scenes([-123.46, 48.43, -123.42, 48.47], "2024-06-15")
+
+        assert first == second
+        assert client.search.call_count == 1
+        assert client.search.call_args.kwargs["bbox"] == snap_bbox(BBOX)
+        assert search_cache_stats["hits"] == 1
+
+    def test_search_prefiltered_by_wrs2(self, client):
+        """Test the catalog query is restricted to covering path/rows."""
+        search_landsat_scenes(BBOX, "2024-06-15")
+
+        query = client.search.call_args.kwargs["query"]
+        assert "047" in query["landsat:wrs_path"]["in"]
+        assert "026" in query["landsat:wrs_row"]["in"]
+
+    def test_unsupported_platforms_skipped(self, client):
+        """Test a Landsat 7 scene ranked first is not returned."""
+        client.search.return_value.items.side_effect = lambda: iter(
+            [make_item("le07", 15, 0.0, "landsat-7"), make_item("lc08", 14, 10.0)]
+        )
+
+        scenes = search_landsat_scenes(BBOX, "2024-06-15")
+        in_range = search_landsat_range(BBOX, "2024-06-01", "2024-06-30")
+
+        assert [scene["id"] for scene in scenes] == ["lc08"]
+        assert [scene["id"] for scene in in_range] == ["lc08"]
+        query = client.search.call_args.kwargs["query"]
+        assert query["platform"] == {"in": ["landsat-8", "landsat-9"]}
+
+    def test_search_outside_victoria(self, client):
+        """Test AOIs elsewhere on the coast get their own path/rows."""
+        search_landsat_scenes([-122.5, 37.7, -122.35, 37.82], "2024-06-15")
+
+        query = client.search.call_args.kwargs["query"]
+        assert "044" in query["landsat:wrs_path"]["in"]
+        assert "047" not in query["landsat:wrs_path"]["in"]
+
+    def test_key_includes_filters(self, client):
+        """Test dates, collections and cloud thresholds are separate entries."""
+        search_landsat_scenes(BBOX, "2024-06-15")
+        search_landsat_scenes(BBOX, "2024-06-16")
+        search_landsat_scenes(BBOX, "2024-06-15", max_cloud_cover=10)
+        search_landsat_scenes(BBOX, "2024-06-15", collection="landsat-c2-l1")
+
+        assert client.search.call_count == 4
+
+    def test_entries_expire(self, client):
+        """Test memoized searches are repeated after the TTL."""
+        with patch.object(landsat_integration, "SEARCH_CACHE_TTL", 0):
+            search_landsat_scenes(BBOX, "2024-06-15")
+            search_landsat_scenes(BBOX, "2024-06-15")
+
+        assert client.search.call_count == 2
+
+    def test_concurrent_searches_collapse(self, client):
+        """Test concurrent identical searches run one catalog query."""
+        items = client.search.return_value.items.side_effect
+
+        def slow_items():
+            time.sleep(0.2)
+            return items()
+
+        client.search.return_value.items.side_effect = slow_items
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(search_landsat_scenes(BBOX, "2024-06-15"))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert client.search.call_count == 1
+        assert len(results) == 5 and all(r == results[0] for r in results)
+        assert search_cache_stats["shared"] == 4
+
+    def test_errors_not_cached(self, client):
+        """Test a failed search returns no scenes and is retried next time."""
+        client.search.side_effect = [RuntimeError("catalog down"), MagicMock()]
+
+        assert search_landsat_scenes(BBOX, "2024-06-15") == []
+        search_landsat_scenes(BBOX, "2024-06-15")
+
+        assert client.search.call_count == 2
+
+    def test_client_opened_once(self):
+        """Test the STAC client is opened once and reused."""
+        with patch.object(landsat_integration, "_stac_client", None), patch.object(
+            landsat_integration.pystac_client.Client, "open"
+        ) as open_client:
+            first = landsat_integration.get_stac_client()
+            second = landsat_integration.get_stac_client()
+
+        assert first is second
+        assert open_client.call_count == 1
+
+
+class TestSceneProcessing:
+    """Test suite for windowed Landsat scene processing."""
+
+    def test_indices_from_window(self, scene):
+        """Test indices are per-pixel means over clear pixels of the window."""
+        item, bbox, dn = scene
+
+        result = download_and_process_scene(item, bbox)
+
+        assert result is not None
+        assert result["overview_level"] is None
+        assert result["resolution_m"] == 30.0
+        assert result["cloud_pixels"] > 0
+        assert result["valid_pixels"] > 0
+        assert result["sensor"] == "landsat-8"
+        # Reflectance means follow the Landsat C2 L2 scaling
+        scale, offset, _ = LANDSAT_C2_L2_SCALING
+        assert 9000 * scale + offset < result["red"] < 11000 * scale + offset
+        assert result["red_edge"] == result["red"]
+
+    def test_matches_full_resolution_reference(self, scene):
+        """Test scene means lie within the clear pixels' per-pixel indices."""
+        item, bbox, dn = scene
+        result = download_and_process_scene(item, bbox)
+        rows, cols = result["shape"]
+
+        reference = indices_from_dn(
+            dn["red"],
+            dn["red"],
+            dn["nir08"],
+            dn["swir16"],
+            *LANDSAT_C2_L2_SCALING,
+            sensor="landsat-8",
+            dtype=np.float64,
+        )
+        clear = dn["qa_pixel"] == 1 << 7
+        assert reference.fai[clear].min() <= result["fai"] <= reference.fai[clear].max()
+        assert (
+            reference.ndre[clear].min() <= result["ndre"] <= reference.ndre[clear].max()
+        )
+        assert rows * cols >= result["valid_pixels"] + result["cloud_pixels"]
+
+    def test_calculate_uses_pixel_indices(self, scene):
+        """Test per-pixel index means are passed through."""
+        item, bbox, _ = scene
+        result = download_and_process_scene(item, bbox)
+
+        fai_value, ndre_value = calculate_spectral_indices(result)
+
+        assert fai_value == pytest.approx(np.clip(result["fai"], -0.1, 0.3))
+        assert ndre_value == pytest.approx(np.clip(result["ndre"], -0.2, 0.6))
+
+    def test_large_aoi_reads_overview(self, scene):
+        """Test AOIs larger than the window limit read a coarser overview."""
+        item, bbox, _ = scene
+        with patch.object(landsat_integration, "MAX_WINDOW_PIXELS", 2000):
+            result = download_and_process_scene(item, bbox)
+
+        assert result["overview_level"] == 0
+        assert result["resolution_m"] == 60.0
+
+    def test_choose_overview_level(self):
+        """Test the overview level grows with AOI size."""
+        small = [-123.40, 48.41, -123.39, 48.42]
+        large = [-124.5, 48.0, -123.0, 49.0]
+
+        assert choose_overview_level(small) is None
+        assert choose_overview_level(large) == 1
+        assert choose_overview_level([-140, 40, -100, 60]) == 4
+
+    def test_latency_budget(self, scene):
+        """Test a read slower than the budget gives up in time."""
+        item, bbox, _ = scene
+
+        def slow_read(*args, **kwargs):
+            time.sleep(1.0)
+
+        with patch("sentinel_pipeline.fetch.read_bands", slow_read):
+            start = time.monotonic()
+            result = download_and_process_scene(item, bbox, latency_budget=0.1)
+
+        assert result is None
+        assert time.monotonic() - start < 0.9
+
+    def test_budget_excludes_queueing(self, scene):
+        """Test scenes queued behind other reads do not time out."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from sentinel_pipeline import fetch
+
+        item, bbox, _ = scene
+        read = fetch.read_bands
+
+        def slow_read(*args, **kwargs):
+            time.sleep(0.3)
+            return read(*args, **kwargs)
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        with patch.object(fetch, "read_bands", slow_read), patch.object(
+            landsat_integration, "_scene_executor", executor
+        ), ThreadPoolExecutor(max_workers=3) as callers:
+            # Three dates, one read worker: the last waits ~0.6 s in the queue
+            results = list(
+                callers.map(
+                    lambda _: download_and_process_scene(
+                        item, bbox, latency_budget=0.5
+                    ),
+                    range(3),
+                )
+            )
+        executor.shutdown()
+
+        assert all(result is not None for result in results)
+
+    def test_fully_clouded_scene(self, scene, tmp_path):
+        """Test a scene without clear pixels is rejected."""
+        import rasterio
+
+        item, bbox, _ = scene
+        with rasterio.open(item["assets"]["qa_pixel"]["href"], "r+") as dst:
+            dst.write(np.full(dst.shape, 1 << 3, dtype=np.uint16), 1)
+
+        assert download_and_process_scene(item, bbox) is None
+
+    def test_polygon_restricts_pixels(self, scene):
+        """Test only pixels inside the AOI polygon are used."""
+        item, bbox, _ = scene
+        west, south, east, north = bbox
+        mid = (west + east) / 2
+        # Triangle over the western half of the window
+        wkt = (
+            f"POLYGON (({west} {south}, {mid} {south}, {west} {north}, "
+            f"{west} {south}))"
+        )
+
+        full = download_and_process_scene(item, bbox)
+        result = download_and_process_scene(item, bbox, geometry=wkt)
+
+        rows, cols = result["shape"]
+        assert 0 < result["aoi_pixels"] < rows * cols / 3
+        assert result["valid_pixels"] < full["valid_pixels"]
+        zonal = result["zonal"]["fai"]
+        assert zonal["count"] == result["valid_pixels"]
+        assert zonal["mean"] == pytest.approx(result["fai"])
+        assert zonal["percentiles"]["p10"] <= zonal["percentiles"]["p90"]
+
+    def test_bbox_from_multipolygon(self):
+        """Test AOI bboxes cover every member of a multipolygon."""
+        bbox = extract_bbox_from_wkt(
+            "MULTIPOLYGON (((-123.5 48.4, -123.4 48.4, -123.4 48.5, -123.5 48.4)), "
+            "((-123.3 48.6, -123.2 48.6, -123.2 48.7, -123.3 48.6)))"
+        )
+
+        assert bbox == [-123.5, 48.4, -123.2, 48.7]
+        assert extract_bbox_from_wkt("not a polygon") is None
+
+    def test_scene_tables_answer_rectangles(self, scene, tmp_path):
+        """Test stored summed-area tables match a direct rectangle read."""
+        item, bbox, _ = scene
+        directory = str(tmp_path / "tables")
+
+        path = precompute_scene_tables(item, bbox, directory=directory)
+        west, south, east, north = bbox
+        rectangle = [west, (south + north) / 2, (west + east) / 2, north]
+        result = query_scene_tables(item["id"], rectangle, directory=directory)
+        direct = download_and_process_scene(
+            item,
+            bbox,
+            geometry=(
+                f"POLYGON (({west} {south}, {east} {south}, {east} {north}, "
+                f"{west} {north}, {west} {south}))"
+            ),
+        )
+
+        assert os.path.dirname(path) == os.path.join(directory, item["id"])
+        assert 0 < result["fai"]["count"] < direct["valid_pixels"]
+        assert result["fai"]["std"] > 0
+        assert query_scene_tables("missing", rectangle, directory=directory) is None
+
+    def test_reads_store_and_reuse_tables(self, scene, tmp_path, monkeypatch):
+        """Test rectangle AOIs inside a read window are answered from tables."""
+        item, bbox, _ = scene
+        west, south, east, north = bbox
+        mid_x, mid_y = (west + east) / 2, (south + north) / 2
+
+        def rectangle(x0, y0, x1, y1):
+            return f"POLYGON (({x0} {y0}, {x1} {y0}, {x1} {y1}, {x0} {y1}, {x0} {y0}))"
+
+        inner = [west, mid_y, mid_x, north]
+        direct = process_scene_aois(item, [rectangle(*inner)])[0]
+        monkeypatch.setattr(landsat_integration, "SCENE_TABLE_DIR", str(tmp_path))
+        first = download_and_process_scene(item, bbox, geometry=rectangle(*bbox))
+        read = landsat_integration.read_scene_window
+        with patch.object(
+            landsat_integration, "read_scene_window", side_effect=read
+        ) as counted:
+            tabled = download_and_process_scene(item, inner, geometry=rectangle(*inner))
+            batch = process_scene_aois(item, [rectangle(*inner)])
+            assert counted.call_count == 0
+            # Other polygons and areas outside the stored window are read
+            triangle = (
+                f"POLYGON (({west} {south}, {east} {south}, {west} {north}, "
+                f"{west} {south}))"
+            )
+            download_and_process_scene(item, bbox, geometry=triangle)
+            assert counted.call_count == 1
+
+        assert os.listdir(os.path.join(tmp_path, item["id"]))
+        assert first.get("from_tables") is None
+        assert tabled["from_tables"] is True
+        assert tabled["fai"] == pytest.approx(direct[0], abs=0.01)
+        assert tabled["valid_pixels"] == pytest.approx(
+            direct[2]["valid_pixels"], rel=0.2
+        )
+        assert batch[0][0] == pytest.approx(tabled["fai"])
+        assert batch[0][2]["valid_pixels"] == tabled["valid_pixels"]
+
+    def test_disjoint_windows_keep_their_tables(self, scene, tmp_path, monkeypatch):
+        """Test reads of other windows do not evict a scene's stored tables."""
+        item, bbox, _ = scene
+        west, south, east, north = bbox
+        mid_x, mid_y = (west + east) / 2, (south + north) / 2
+        left, right = [west, south, mid_x, mid_y], [mid_x, mid_y, east, north]
+
+        def rectangle(x0, y0, x1, y1):
+            return f"POLYGON (({x0} {y0}, {x1} {y0}, {x1} {y1}, {x0} {y1}, {x0} {y0}))"
+
+        monkeypatch.setattr(landsat_integration, "SCENE_TABLE_DIR", str(tmp_path))
+        for aoi in (left, right):
+            download_and_process_scene(item, aoi, geometry=rectangle(*aoi))
+        read = landsat_integration.read_scene_window
+        with patch.object(
+            landsat_integration, "read_scene_window", side_effect=read
+        ) as counted:
+            results = [
+                download_and_process_scene(item, aoi, geometry=rectangle(*aoi))
+                for aoi in (left, right, left, right)
+            ]
+
+        assert counted.call_count == 0
+        assert all(result["from_tables"] is True for result in results)
+        assert len(os.listdir(os.path.join(tmp_path, item["id"]))) == 2
+
+    def test_scene_aois_share_one_read(self, scene):
+        """Test several AOIs of a scene are reduced from one window read."""
+        item, bbox, _ = scene
+        west, south, east, north = bbox
+        mid_x, mid_y = (west + east) / 2, (south + north) / 2
+        left = (
+            f"POLYGON (({west} {south}, {mid_x} {south}, {mid_x} {mid_y}, "
+            f"{west} {mid_y}, {west} {south}))"
+        )
+        right = (
+            f"POLYGON (({mid_x} {south}, {east} {south}, {east} {mid_y}, "
+            f"{mid_x} {mid_y}, {mid_x} {south}))"
+        )
+        read = landsat_integration.read_scene_window
+
+        with patch.object(
+            landsat_integration, "read_scene_window", side_effect=read
+        ) as counted:
+            results = process_scene_aois(item, [left, right, "POLYGON((bad))"])
+
+        assert counted.call_count == 1
+        assert results[2][0] is None and "WKT" in results[2][2]["error"]
+        for aoi, (fai_value, ndre_value, metadata) in zip([left, right], results):
+            single = download_and_process_scene(item, bbox, geometry=aoi)
+            assert metadata["scene_id"] == item["id"]
+            assert metadata["valid_pixels"] == single["valid_pixels"]
+            assert fai_value == pytest.approx(np.clip(single["fai"], -0.1, 0.3))
+
+    def test_distant_aois_match_single_reads(self, scene):
+        """Test distant batch AOIs keep the resolution of single requests."""
+        item, bbox, _ = scene
+        west, south, east, north = bbox
+        width, height = east - west, north - south
+
+        def rectangle(x0, x1, y0, y1):
+            # Fractions of the scene, y measured down from the north edge
+            w, e = west + x0 * width, west + x1 * width
+            s, n = north - y1 * height, north - y0 * height
+            return f"POLYGON (({w} {s}, {e} {s}, {e} {n}, {w} {n}, {w} {s}))"
+
+        aois = [rectangle(0.0, 0.25, 0.35, 0.6), rectangle(0.7, 0.95, 0.7, 0.95)]
+        read = landsat_integration.read_scene_window
+
+        with patch.object(landsat_integration, "MAX_WINDOW_PIXELS", 2000):
+            with patch.object(
+                landsat_integration, "read_scene_window", side_effect=read
+            ) as counted:
+                results = process_scene_aois(item, aois)
+            singles = [
+                download_and_process_scene(
+                    item, extract_bbox_from_wkt(aoi), geometry=aoi
+                )
+                for aoi in aois
+            ]
+
+        assert counted.call_count == 2
+        for (fai_value, ndre_value, metadata), single in zip(results, singles):
+            assert metadata["resolution_m"] == single["resolution_m"] == 30.0
+            assert metadata["valid_pixels"] == single["valid_pixels"]
+            assert fai_value == pytest.approx(np.clip(single["fai"], -0.1, 0.3))
+            assert ndre_value == pytest.approx(np.clip(single["ndre"], -0.2, 0.6))
+
+    def test_find_scene(self, client):
+        """Test AOIs resolve to their best scene through one shared search."""
+        wkt = "POLYGON((-123.47 48.42, -123.41 48.42, -123.41 48.46, -123.47 48.42))"
+        nearby = "POLYGON((-123.46 48.42, -123.42 48.42, -123.42 48.47, -123.46 48.42))"
+
+        scene, error = find_scene(wkt, "2024-06-15")
+
+        assert scene["id"] == "near" and error is None
+        assert scene_search_key(wkt, "2024-06-15") == scene_search_key(
+            nearby, "2024-06-15"
+        )
+        assert scene_search_key(wkt, "2024-06-16") != scene_search_key(
+            wkt, "2024-06-15"
+        )
+        assert scene_search_key("bad", "2024-06-15") is None
+        assert "WKT" in find_scene("bad", "2024-06-15")[1]["error"]
+
+    def test_scene_results_cached(self, scene):
+        """Test a scene is processed once per AOI across calls."""
+        item, bbox, _ = scene
+        west, south, east, north = bbox
+        wkt = (
+            f"POLYGON (({west} {south}, {east} {south}, {east} {north}, "
+            f"{west} {north}, {west} {south}))"
+        )
+        clear_scene_results()
+
+        first = process_scene_for_aoi(item, wkt)
+        with patch.object(landsat_integration, "download_and_process_scene") as process:
+            second = process_scene_for_aoi(item, "  " + wkt.replace(", ", ",  "))
+
+        process.assert_not_called()
+        assert first[:2] == second[:2]
+        assert first[2]["cached"] is False and second[2]["cached"] is True
+        assert landsat_integration.scene_result_stats == {"hits": 1, "misses": 1}
+        clear_scene_results()
+
+    def test_failures_not_cached(self, scene):
+        """Test failed scenes are retried on the next call."""
+        item, bbox, _ = scene
+        wkt = "POLYGON((-123.4 48.4, -123.3 48.4, -123.3 48.5, -123.4 48.4))"
+        clear_scene_results()
+
+        with patch.object(
+            landsat_integration, "download_and_process_scene", return_value=None
+        ) as process:
+            process_scene_for_aoi(item, wkt)
+            result = process_scene_for_aoi(item, wkt)
+
+        assert process.call_count == 2
+        assert result[0] is None and "error" in result[2]
+
+
+class TestRangeSearch:
+    """Test suite for date range scene searches."""
+
+    def test_one_search_one_scene_per_day(self, client):
+        """Test a range is one catalog query keeping the clearest scene per day."""
+        client.search.return_value.items.side_effect = lambda: iter(
+            [
+                make_item("b", 20, 20.0),
+                make_item("a", 4, 10.0),
+                make_item("a_clearer", 4, 2.0),
+            ]
+        )
+
+        scenes = search_landsat_range(BBOX, "2024-06-01", "2024-06-30")
+        again = search_landsat_range(BBOX, "2024-06-01", "2024-06-30")
+
+        assert [scene["id"] for scene in scenes] == ["a_clearer", "b"]
+        assert again == scenes
+        assert client.search.call_count == 1
+        kwargs = client.search.call_args.kwargs
+        assert kwargs["datetime"] == "2024-06-01/2024-06-30"
+        assert "landsat:wrs_path" in kwargs["query"]
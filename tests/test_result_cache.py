@@ -0,0 +1,197 @@
+"""
+Tests for the /carbon result cache.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.main import ResultCache, SQLiteSpectralCache, app, canonical_geometry_hash
+
+AOI = "POLYGON((-123.5 48.4, -123.4 48.4, -123.4 48.5, -123.5 48.5, -123.5 48.4))"
+# Same square starting elsewhere, drawn clockwise, with float noise
+AOI_REWRITTEN = (
+    "POLYGON ((-123.4 48.5, -123.4 48.4000000001, -123.5 48.4, "
+    "-123.5 48.5, -123.4 48.5))"
+)
+
+
+@pytest.fixture
+def mock_model():
+    """Mock biomass model."""
+    mock = MagicMock()
+    mock.predict.return_value = [2.5]
+    return mock
+
+
+class TestCanonicalGeometryHash:
+    """Test suite for canonical_geometry_hash."""
+
+    def test_invariant_to_how_the_polygon_is_written(self):
+        """Test start vertex, orientation and float noise do not matter."""
+        assert canonical_geometry_hash(AOI) == canonical_geometry_hash(AOI_REWRITTEN)
+
+    def test_holes_and_parts_order_ignored(self):
+        """Test holes and multipolygon parts are compared as sets."""
+        shell = "(0 0, 10 0, 10 10, 0 10, 0 0)"
+        hole_1, hole_2 = "(1 1, 2 1, 2 2, 1 1)", "(5 5, 6 5, 6 6, 5 5)"
+        a = f"({shell}, {hole_1}, {hole_2})"
+        b = f"({shell}, {hole_2}, {hole_1})"
+        c = "((20 20, 21 20, 21 21, 20 20))"
+
+        assert canonical_geometry_hash(f"POLYGON{a}") == canonical_geometry_hash(
+            f"POLYGON{b}"
+        )
+        assert canonical_geometry_hash(
+            f"MULTIPOLYGON({a}, {c})"
+        ) == canonical_geometry_hash(f"MULTIPOLYGON({c}, {b})")
+
+    def test_different_shapes_differ(self):
+        """Test a moved polygon gets a different hash."""
+        moved = AOI.replace("48.5", "48.6")
+        assert canonical_geometry_hash(AOI) != canonical_geometry_hash(moved)
+
+
+class TestResultCache:
+    """Test suite for the in-memory and SQLite tiers."""
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted."""
+        cache = ResultCache(2)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        cache.get("a")
+        cache.put("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+    def test_sqlite_round_trip(self, tmp_path):
+        """Test spectral values are shared through the SQLite file."""
+        path = str(tmp_path / "cache.db")
+        metadata = {"scene_id": "LC08_X", "aoi_pixels": 200, "valid_pixels": 150}
+        SQLiteSpectralCache(path).put(
+            "h", "2024-06-15", "landsat_real", 0.05, 0.2, metadata
+        )
+
+        other_worker = SQLiteSpectralCache(path)
+        row = other_worker.get("h", "2024-06-15", "landsat_real")
+
+        assert row["mean_fai"] == 0.05 and row["mean_ndre"] == 0.2
+        assert row["metadata"] == metadata
+        assert row["pixel_count"] == 200 and row["valid_pixel_percentage"] == 75.0
+        assert other_worker.get("h", "2024-06-16", "landsat_real") is None
+        assert other_worker.stats()["hits"] == 1
+
+
+class TestCarbonCaching:
+    """Test suite for caching in GET /carbon."""
+
+    def test_repeat_requests_hit_cache(self, mock_model):
+        """Test the same shape and date are only computed once."""
+        client = TestClient(app)
+
+        with patch.object(main, "model", mock_model):
+            first = client.get("/carbon", params={"date": "2024-06-15", "aoi": AOI})
+            second = client.get(
+                "/carbon", params={"date": "2024-06-15", "aoi": AOI_REWRITTEN}
+            )
+
+        assert mock_model.predict.call_count == 1
+        assert second.json()["aoi_wkt"] == AOI_REWRITTEN
+        assert second.json()["co2e_t"] == first.json()["co2e_t"]
+        stats = client.get("/metrics/cache").json()["memory"]
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def test_ewkt_accepted(self, mock_model):
+        """Test AOIs the polygon parser rejects are still analyzed and cached."""
+        client = TestClient(app)
+        params = {"date": "2024-06-15", "aoi": f"SRID=4326;{AOI}"}
+
+        with patch.object(main, "model", mock_model):
+            first = client.get("/carbon", params=params)
+            second = client.get("/carbon", params=params)
+
+        assert first.status_code == second.status_code == 200
+        assert mock_model.predict.call_count == 1
+
+    def test_key_includes_date_map_and_model(self, mock_model):
+        """Test other dates, map types and model versions miss."""
+        client = TestClient(app)
+
+        with patch.object(main, "model", mock_model):
+            client.get("/carbon", params={"date": "2024-06-15", "aoi": AOI})
+            client.get("/carbon", params={"date": "2024-06-16", "aoi": AOI})
+            client.get(
+                "/carbon",
+                params={"date": "2024-06-15", "aoi": AOI, "include_map": False},
+            )
+            with patch.object(main, "model_version", "retrained"):
+                client.get("/carbon", params={"date": "2024-06-15", "aoi": AOI})
+
+        assert mock_model.predict.call_count == 4
+
+    def test_fallbacks_not_cached(self, mock_model):
+        """Test synthetic fallbacks for real-data requests are retried."""
+        landsat = MagicMock(return_value=(None, None, {"error": "No scenes"}))
+        params = {"date": "2024-06-15", "aoi": AOI, "use_real_landsat": True}
+
+        with patch.object(main, "model", mock_model), patch.object(
+            main, "ENHANCED_FEATURES_AVAILABLE", True
+        ), patch.object(main, "get_real_landsat_data", landsat, create=True):
+            client = TestClient(app)
+            client.get("/carbon", params=params)
+            client.get("/carbon", params=params)
+
+        assert landsat.call_count == 2
+
+    def test_shared_tier_skips_landsat(self, mock_model, tmp_path):
+        """Test a fresh worker reuses spectral values from the shared tier."""
+        shared = SQLiteSpectralCache(str(tmp_path / "cache.db"))
+        landsat = MagicMock(return_value=(0.05, 0.2, {"scene_id": "LC08_X"}))
+        params = {"date": "2024-06-15", "aoi": AOI, "use_real_landsat": True}
+
+        with patch.object(main, "model", mock_model), patch.object(
+            main, "ENHANCED_FEATURES_AVAILABLE", True
+        ), patch.object(
+            main, "get_real_landsat_data", landsat, create=True
+        ), patch.object(
+            main, "spectral_cache", shared
+        ):
+            client = TestClient(app)
+            first = client.get("/carbon", params=params).json()
+            main.result_cache.clear()
+            second = client.get("/carbon", params=params).json()
+
+        assert landsat.call_count == 1
+        assert second["data_source"] == "landsat_real"
+        assert second["mean_fai"] == first["mean_fai"]
+        assert second["landsat_metadata"] == {"scene_id": "LC08_X"}
+        assert shared.stats()["hits"] == 1
+
+    def test_shared_tier_off_event_loop(self, mock_model, tmp_path):
+        """Test SQLite reads and writes run in a worker thread."""
+        shared = SQLiteSpectralCache(str(tmp_path / "cache.db"))
+        threads = []
+        get, put = shared.get, shared.put
+        shared.get = lambda *a: threads.append(threading.current_thread()) or get(*a)
+        shared.put = lambda *a: threads.append(threading.current_thread()) or put(*a)
+        landsat = MagicMock(return_value=(0.05, 0.2, {"scene_id": "LC08_X"}))
+        params = {"date": "2024-06-15", "aoi": AOI, "use_real_landsat": True}
+
+        with patch.object(main, "model", mock_model), patch.object(
+            main, "ENHANCED_FEATURES_AVAILABLE", True
+        ), patch.object(
+            main, "get_real_landsat_data", landsat, create=True
+        ), patch.object(
+            main, "spectral_cache", shared
+        ):
+            TestClient(app).get("/carbon", params=params)
+
+        assert len(threads) == 2
+        assert all(thread.name.startswith("kelpie-compute") for thread in threads)
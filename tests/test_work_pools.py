@@ -0,0 +1,133 @@
+"""
+Tests for the work pools that keep blocking work off the event loop.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.main import WorkPool, app
+
+AOI = "POLYGON((-123.5 48.4, -123.4 48.4, -123.4 48.5, -123.5 48.5, -123.5 48.4))"
+
+
+@pytest.fixture
+def mock_model():
+    """Mock biomass model."""
+    mock = MagicMock()
+    mock.predict.return_value = [2.5]
+    return mock
+
+
+class TestWorkPool:
+    """Test suite for WorkPool."""
+
+    def test_queue_depth_reported(self):
+        """Test calls beyond the concurrency limit are reported as queued."""
+        pool = WorkPool("test", 1)
+        observed = []
+
+        async def scenario():
+            calls = [pool.run(time.sleep, 0.1) for _ in range(3)]
+            task = asyncio.gather(*calls)
+            await asyncio.sleep(0.05)
+            observed.append(pool.stats())
+            await task
+
+        asyncio.run(scenario())
+        pool.shutdown()
+
+        assert observed[0]["running"] == 1
+        assert observed[0]["queue_depth"] == 2
+        stats = pool.stats()
+        assert stats["peak_queue_depth"] == 2
+        assert stats["completed"] == 3 and stats["queue_depth"] == 0
+
+    def test_failures_counted(self):
+        """Test exceptions propagate and are counted."""
+        pool = WorkPool("test", 2)
+
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(pool.run(divmod, 1, 0))
+        pool.shutdown()
+
+        assert pool.stats()["failed"] == 1
+        assert pool.stats()["completed"] == 0
+
+    def test_process_pool(self):
+        """Test process pools run picklable work in another process."""
+        pool = WorkPool("test", 1, kind="process")
+
+        assert asyncio.run(pool.run(pow, 2, 10)) == 1024
+        pool.shutdown()
+
+    def test_configured_from_environment(self, monkeypatch):
+        """Test limits and kinds come from KELPIE_<NAME>_* variables."""
+        monkeypatch.setenv("KELPIE_RENDER_WORKERS", "3")
+        monkeypatch.setenv("KELPIE_RENDER_POOL", "thread")
+
+        pool = main._pool_from_env("render", "process", 2)
+
+        assert (pool.max_workers, pool.kind) == (3, "thread")
+        with pytest.raises(ValueError):
+            WorkPool("bad", 0)
+
+
+class TestCarbonOffloading:
+    """Test suite for /carbon running blocking stages in pools."""
+
+    def test_slow_landsat_does_not_block_loop(self, mock_model):
+        """Test other requests are served while a Landsat read is slow."""
+        started = threading.Event()
+
+        def slow_landsat(aoi, date):
+            started.set()
+            time.sleep(1.0)
+            return None, None, {"error": "slow"}
+
+        with TestClient(app) as client, patch.object(
+            main, "model", mock_model
+        ), patch.object(main, "ENHANCED_FEATURES_AVAILABLE", True), patch.object(
+            main, "get_real_landsat_data", slow_landsat, create=True
+        ):
+            slow = threading.Thread(
+                target=client.get,
+                args=(f"/carbon?date=2024-06-15&aoi={AOI}&use_real_landsat=true",),
+            )
+            slow.start()
+            assert started.wait(5)
+            start = time.monotonic()
+            response = client.get("/health")
+            elapsed = time.monotonic() - start
+            slow.join()
+
+        assert response.status_code == 200
+        assert elapsed < 0.5
+
+    def test_predict_and_map_run_in_pools(self, mock_model):
+        """Test inference and map rendering go through the pools."""
+        client = TestClient(app)
+        before = {name: pool.completed for name, pool in main.work_pools.items()}
+
+        with patch.object(main, "model", mock_model):
+            response = client.get(f"/carbon?date=2024-06-15&aoi={AOI}")
+
+        assert response.status_code == 200
+        assert response.json()["result_map"]["success"] is True
+        # One prediction and one GeoJSON map
+        assert main.work_pools["compute"].completed == before["compute"] + 2
+
+    def test_pool_metrics_endpoint(self):
+        """Test pool limits and queue depths are exposed."""
+        response = TestClient(app).get("/metrics/pools")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"landsat", "compute", "render"}
+        assert data["render"]["kind"] == "process"
+        assert {"max_workers", "queue_depth", "running"} <= set(data["compute"])
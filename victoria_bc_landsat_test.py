@@ -12,6 +12,7 @@ import io
 import json
 from typing import Dict, List, Optional, Tuple
 from sentinel_pipeline.mask import apply_cloud_mask, filter_by_tide
+from sentinel_pipeline.tides import HarmonicTidePredictor
 
 # Victoria, BC coordinates
 VICTORIA_BC = {
@@ -380,45 +381,18 @@ def create_victoria_cloud_mask(img_shape):
     return qa
 
 def get_victoria_tide_data():
-    """Get realistic tide data for Victoria, BC."""
+    """Get predicted tide data for Victoria, BC."""
     
     # Victoria, BC has mixed semi-diurnal tides
     # Typical range: 0.5m to 3.5m
+    # Heights come from the offline harmonic predictor (no tide API call)
     
     current_time = datetime.now()
+    predictor = HarmonicTidePredictor("victoria_harbour")
     
-    # Simulate realistic Victoria tide schedule
-    tide_data = {
-        "data": [
-            {
-                "datetime": (current_time - timedelta(hours=6)).isoformat() + "Z",
-                "height": 0.8,
-                "type": "low"
-            },
-            {
-                "datetime": current_time.isoformat() + "Z",
-                "height": 3.2,
-                "type": "high"
-            },
-            {
-                "datetime": (current_time + timedelta(hours=6)).isoformat() + "Z",
-                "height": 1.2,
-                "type": "low"
-            },
-            {
-                "datetime": (current_time + timedelta(hours=12)).isoformat() + "Z",
-                "height": 2.9,
-                "type": "high"
-            }
-        ],
-        "station": "Victoria_Harbour_BC",
-        "location": {
-            "latitude": 48.4284,
-            "longitude": -123.3656
-        },
-        "units": "meters",
-        "datum": "LAT"  # Lowest Astronomical Tide
-    }
+    # Hourly predictions from 12 hours before to 12 hours after now
+    times = [current_time + timedelta(hours=h) for h in range(-12, 13)]
+    tide_data = predictor.to_json(times)
     
     return tide_data
 
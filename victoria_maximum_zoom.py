@@ -9,7 +9,9 @@ import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import requests
 from typing import Tuple, Optional, Dict
+from sentinel_pipeline.blockcache import get_block_cache, open_raster
 from sentinel_pipeline.mask import apply_cloud_mask, filter_by_tide
+from sentinel_pipeline.stats import percentile_stretch
 
 # Landsat scene 047026 coordinates - covers Brentwood Bay/Saanich Peninsula area
 LANDSAT_SCENE_047026 = {
@@ -151,7 +153,6 @@ def download_maximum_resolution(item, bbox, zoom_level):
 def download_full_resolution_bands(item, bbox):
     """Download full resolution individual bands and create detailed composite."""
     
-    import rasterio
     import planetary_computer
     from rasterio.windows import from_bounds
     
@@ -166,7 +167,9 @@ def download_full_resolution_bands(item, bbox):
             signed_url = planetary_computer.sign(asset.href)
             
             try:
-                with rasterio.open(signed_url) as src:
+                # Range reads go through the shared block cache, so repeated
+                # or overlapping AOIs on this scene reuse downloaded tiles
+                with open_raster(signed_url) as src:
                     # Get window for our specific area
                     window = from_bounds(bbox[0], bbox[1], bbox[2], bbox[3], src.transform)
                     
@@ -187,6 +190,11 @@ def download_full_resolution_bands(item, bbox):
                 print(f"         ❌ {band} failed: {e}")
                 continue
     
+    block_stats = get_block_cache().stats()
+    print(f"         📦 Block cache: {block_stats['hit_ratio']:.0%} hits, "
+          f"{block_stats['requests']} requests, "
+          f"{block_stats['bytes_fetched'] / 1e6:.1f} MB fetched")
+    
     if len(band_data) >= 3:
         # Create enhanced RGB composite
         rgb_data = create_enhanced_rgb(band_data, bbox)
@@ -199,7 +207,8 @@ def download_full_resolution_bands(item, bbox):
             'cloud_cover': item.properties.get('eo:cloud_cover'),
             'platform': item.properties.get('platform'),
             'bands_used': list(band_data.keys()),
-            'native_resolution': band_data['red']['resolution'][0] if 'red' in band_data else 'Unknown'
+            'native_resolution': band_data['red']['resolution'][0] if 'red' in band_data else 'Unknown',
+            'block_cache': block_stats
         }
         
         return rgb_data, metadata
@@ -334,11 +343,8 @@ def create_enhanced_rgb(band_data, bbox):
         if not np.any(valid_mask):
             return np.zeros_like(band)
         
-        valid_data = band[valid_mask]
-        
         # Use more aggressive contrast stretching for urban details
-        p1, p99 = np.percentile(valid_data, [1, 99])
-        stretched = np.clip((band - p1) / (p99 - p1), 0, 1)
+        stretched = percentile_stretch(band, 1, 99, valid=valid_mask, fill=None)
         
         # Apply gamma correction for better urban feature visibility
         gamma = 0.7  # Enhance darker features
@@ -375,13 +381,12 @@ def create_detailed_rgb(red, green, blue):
     """Create detailed RGB composite with urban enhancement."""
     
     def enhance_band(band):
-        valid_data = band[band > 0]
-        if len(valid_data) == 0:
+        valid_mask = band > 0
+        if not np.any(valid_mask):
             return np.zeros_like(band)
         
         # Aggressive contrast stretching
-        p2, p98 = np.percentile(valid_data, [2, 98])
-        normalized = np.clip((band - p2) / (p98 - p2), 0, 1)
+        normalized = percentile_stretch(band, 2, 98, valid=valid_mask, fill=None)
         
         # Gamma correction for urban features
         enhanced = np.power(normalized, 0.8)
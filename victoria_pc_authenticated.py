@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 import requests
 from typing import Tuple, Optional, Dict
 from sentinel_pipeline.mask import apply_cloud_mask, filter_by_tide
+from sentinel_pipeline.stats import percentile_stretch
 
 def install_planetary_computer_sdk():
     """Install the official Planetary Computer SDK."""
@@ -250,13 +251,7 @@ def create_rgb_composite(red, green, blue):
         if not np.any(valid_mask):
             return np.zeros_like(band)
         
-        valid_data = band[valid_mask]
-        p2, p98 = np.percentile(valid_data, [2, 98])
-        
-        normalized = np.clip((band - p2) / (p98 - p2), 0, 1)
-        normalized[~valid_mask] = 0
-        
-        return normalized
+        return percentile_stretch(band, 2, 98, valid=valid_mask)
     
     red_norm = normalize_band(red)
     green_norm = normalize_band(green)
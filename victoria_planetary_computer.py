@@ -12,6 +12,7 @@ from PIL import Image
 import io
 from typing import Tuple, Optional, Dict, List
 from sentinel_pipeline.mask import apply_cloud_mask, filter_by_tide
+from sentinel_pipeline.stats import percentile_stretch as stretch_band
 
 # Victoria, BC coordinates and area of interest
 VICTORIA_AOI = {
@@ -189,8 +190,7 @@ def process_landsat_rgb(band_data):
         
         if percentile_stretch:
             # Use 2nd and 98th percentiles for better contrast
-            p2, p98 = np.percentile(valid_data, [2, 98])
-            normalized = np.clip((band_array - p2) / (p98 - p2), 0, 1)
+            normalized = stretch_band(band_array, 2, 98, fill=None)
         else:
             # Simple min-max normalization
             min_val, max_val = valid_data.min(), valid_data.max()